@@ -4,10 +4,14 @@ API Dependencies
 FastAPI dependencies для инъекции в эндпоинты.
 """
 
+import hashlib
+import ipaddress
+import re
+from functools import lru_cache
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import Depends, Header
+from fastapi import Depends, Header, Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -21,7 +25,7 @@ from app.core.exceptions import (
     UnverifiedEmailException,
 )
 from app.core.security import decode_token
-from app.db.redis import is_blacklisted
+from app.db.redis import get_tokens_revoked_at, is_blacklisted
 from app.db.session import get_db
 from app.models.user import User, UserRole
 
@@ -43,7 +47,7 @@ async def get_current_user(
     Проверяет:
     1. Наличие токена
     2. Валидность токена
-    3. Не в blacklist
+    3. Не в blacklist и не отозван вместе с остальными токенами пользователя
     4. Пользователь существует
     5. Пользователь активен
     
@@ -75,6 +79,11 @@ async def get_current_user(
     if user_id is None:
         raise CredentialsException("Invalid token payload")
     
+    # Все токены пользователя отозваны (блокировка аккаунта)
+    revoked_at = await get_tokens_revoked_at(user_id)
+    if revoked_at is not None and payload.get("iat", 0) <= revoked_at:
+        raise TokenBlacklistedException()
+    
     # Ищем пользователя
     try:
         user_uuid = UUID(user_id)
@@ -174,9 +183,80 @@ def get_optional_user(
     return _get_optional_user
 
 
+BOT_USER_AGENT_RE = re.compile(
+    r"bot|crawl|spider|slurp|preview|facebookexternalhit|curl|wget|python-requests|httpx",
+    re.IGNORECASE,
+)
+
+
+@lru_cache
+def _trusted_networks(proxies: tuple[str, ...]) -> list[ipaddress.IPv4Network | ipaddress.IPv6Network]:
+    return [ipaddress.ip_network(proxy, strict=False) for proxy in proxies]
+
+
+def _is_trusted_proxy(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in _trusted_networks(tuple(settings.trusted_proxies)))
+
+
+def client_ip(request: Request) -> str:
+    """
+    IP клиента.
+    
+    X-Forwarded-For учитывается, только если соединение пришло
+    от доверенного прокси (TRUSTED_PROXIES): цепочка читается справа
+    налево до первого недоверенного адреса. Иначе заголовок мог бы
+    подставить сам клиент.
+    """
+    peer = request.client.host if request.client else ""
+    if not _is_trusted_proxy(peer):
+        return peer
+    
+    forwarded = request.headers.get("x-forwarded-for", "")
+    chain = [address.strip() for address in forwarded.split(",") if address.strip()]
+    for address in reversed(chain):
+        if not _is_trusted_proxy(address):
+            return address
+    return chain[0] if chain else peer
+
+
+def get_viewer_key(
+    request: Request,
+    credentials: Annotated[
+        HTTPAuthorizationCredentials | None,
+        Depends(security)
+    ],
+) -> str | None:
+    """
+    Идентификатор читателя для подсчёта уникальных просмотров.
+    
+    - Авторизованный: user id из токена (без запроса к БД)
+    - Анонимный: хеш IP + User-Agent (сырые данные не сохраняются)
+    - Боты: None (не учитываются)
+    """
+    user_agent = request.headers.get("user-agent", "")
+    if not user_agent or BOT_USER_AGENT_RE.search(user_agent):
+        return None
+    
+    if credentials is not None:
+        payload = decode_token(credentials.credentials)
+        if payload is not None and payload.get("type") == "access" and payload.get("sub"):
+            return f"u:{payload['sub']}"
+    
+    digest = hashlib.sha256(
+        f"{settings.jwt_secret_key}:{client_ip(request)}:{user_agent}".encode()
+    ).hexdigest()[:24]
+    
+    return f"a:{digest}"
+
+
 # Type aliases для удобства
 CurrentUser = Annotated[User, Depends(get_current_user)]
 CurrentActiveUser = Annotated[User, Depends(get_current_active_user)]
 CurrentVerifiedUser = Annotated[User, Depends(get_current_verified_user)]
 CurrentAdmin = Annotated[User, Depends(get_current_admin)]
 DbSession = Annotated[AsyncSession, Depends(get_db)]
+ViewerKey = Annotated[str | None, Depends(get_viewer_key)]
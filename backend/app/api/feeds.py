@@ -0,0 +1,79 @@
+"""
+Feeds Routes
+============
+sitemap.xml и ленты RSS/Atom (вне /api: адреса ожидают краулеры и читалки).
+"""
+
+from typing import Literal
+
+from fastapi import APIRouter, Path, Query, Request, Response, status
+
+from app.api.deps import DbSession
+from app.services.feed_service import FeedService
+
+
+router = APIRouter(tags=["Feeds"])
+
+SITEMAP_CACHE_CONTROL = "public, max-age=3600"
+FEED_CACHE_CONTROL = "public, max-age=300"
+
+FEED_MEDIA_TYPES = {
+    "rss": "application/rss+xml",
+    "atom": "application/atom+xml",
+}
+
+
+def _xml_response(
+    request: Request,
+    document: dict[str, str],
+    media_type: str,
+    cache_control: str,
+) -> Response:
+    """Ответ с ETag; совпал If-None-Match -> 304 без тела."""
+    headers = {"ETag": document["etag"], "Cache-Control": cache_control}
+    
+    if request.headers.get("if-none-match") == document["etag"]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    return Response(document["xml"], media_type=media_type, headers=headers)
+
+
+@router.get("/sitemap.xml", summary="Индекс sitemap")
+async def get_sitemap_index(request: Request, db: DbSession):
+    """Ссылки на шарды sitemap (до 50 000 статей в каждом)."""
+    document = await FeedService(db).get_sitemap_index()
+    return _xml_response(request, document, "application/xml", SITEMAP_CACHE_CONTROL)
+
+
+@router.get("/sitemaps/{shard}.xml", summary="Шард sitemap")
+async def get_sitemap_shard(
+    request: Request,
+    db: DbSession,
+    shard: int = Path(..., ge=0),
+):
+    """Опубликованные статьи шарда с датой последнего изменения."""
+    document = await FeedService(db).get_sitemap_shard(shard)
+    return _xml_response(request, document, "application/xml", SITEMAP_CACHE_CONTROL)
+
+
+@router.get("/feed.xml", summary="Лента статей")
+async def get_feed(
+    request: Request,
+    db: DbSession,
+    format: Literal["rss", "atom"] = Query("rss", description="Формат ленты"),
+):
+    """Последние опубликованные статьи."""
+    document = await FeedService(db).get_feed(format)
+    return _xml_response(request, document, FEED_MEDIA_TYPES[format], FEED_CACHE_CONTROL)
+
+
+@router.get("/tags/{slug}/feed.xml", summary="Лента статей тега")
+async def get_tag_feed(
+    request: Request,
+    db: DbSession,
+    slug: str,
+    format: Literal["rss", "atom"] = Query("rss", description="Формат ленты"),
+):
+    """Последние опубликованные статьи с тегом."""
+    document = await FeedService(db).get_feed(format, slug)
+    return _xml_response(request, document, FEED_MEDIA_TYPES[format], FEED_CACHE_CONTROL)
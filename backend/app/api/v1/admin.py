@@ -0,0 +1,231 @@
+"""
+Admin API Routes
+================
+Эндпоинты для администраторов.
+"""
+
+from uuid import UUID
+
+from fastapi import APIRouter, BackgroundTasks, Query, Request, status
+from fastapi.responses import StreamingResponse
+
+from app.api.deps import CurrentAdmin, DbSession
+from app.db.events import event_buffer
+from app.jobs.post_transfer import export_posts, import_posts
+from app.jobs.queue import get_queue_metrics
+from app.jobs.tasks import process_account, rebuild_related_posts_index, update_related_posts
+from app.models.post import PostStatus
+from app.schemas.post import (
+    PostBulkRequest,
+    PostBulkResponse,
+    PostDuplicateListResponse,
+    PostImportResponse,
+)
+from app.schemas.user import AccountJobCreate, AccountJobResponse
+from app.services.account_service import AccountService
+from app.services.bulk_post_service import BulkPostService
+from app.services.duplicate_service import DuplicateService
+
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+# Больше статей — дешевле одна полная перестройка похожих статей
+RELATED_REBUILD_THRESHOLD = 50
+
+
+@router.get(
+    "/duplicates",
+    response_model=PostDuplicateListResponse,
+    summary="Почти-дубликаты статей",
+)
+async def get_duplicates(
+    admin: CurrentAdmin,
+    db: DbSession,
+    page: int = Query(1, ge=1, description="Номер страницы"),
+    per_page: int = Query(20, ge=1, le=100, description="Записей на странице"),
+):
+    """
+    Статьи, текст которых почти совпадает с уже существующими.
+    
+    Сходство оценивается по MinHash сигнатурам при сохранении статьи.
+    """
+    service = DuplicateService(db)
+    items, total = await service.get_flagged(page=page, per_page=per_page)
+    
+    pages = (total + per_page - 1) // per_page
+    
+    return PostDuplicateListResponse(
+        items=items,
+        total=total,
+        page=page,
+        per_page=per_page,
+        pages=pages,
+    )
+
+
+@router.post(
+    "/posts/bulk",
+    response_model=PostBulkResponse,
+    summary="Массовое действие над статьями",
+)
+async def bulk_posts(
+    data: PostBulkRequest,
+    admin: CurrentAdmin,
+    db: DbSession,
+    background_tasks: BackgroundTasks,
+):
+    """
+    Статьи выбираются списком **ids** или **filter** (статус, автор,
+    тег, период создания), не больше ADMIN_BULK_MAX_POSTS.
+    
+    Действия:
+    - **publish**: опубликовать черновики и отложенные статьи
+    - **unpublish**: вернуть в черновики
+    - **retag**: добавить **add_tags** и убрать **remove_tags**
+    - **delete**: удалить
+    
+    Всё выполняется в одной транзакции. **dry_run** только считает статьи.
+    """
+    service = BulkPostService(db)
+    result, related_ids, after_commit = await service.run(data)
+    
+    # Redis обновляется только после фиксации транзакции
+    await db.commit()
+    for action in after_commit:
+        await action()
+    
+    # В очередь после коммита
+    if len(related_ids) > RELATED_REBUILD_THRESHOLD:
+        background_tasks.add_task(rebuild_related_posts_index.enqueue)
+    else:
+        for post_id in related_ids:
+            background_tasks.add_task(update_related_posts.enqueue, post_id)
+    
+    return result
+
+
+@router.get(
+    "/posts/export",
+    summary="Экспорт статей (NDJSON)",
+)
+async def export_posts_ndjson(
+    admin: CurrentAdmin,
+    status: PostStatus | None = Query(None, description="Только статьи со статусом"),
+):
+    """
+    Все статьи (кроме удалённых) с тегами, автором и счётчиками,
+    по одной в строке. Ответ отдаётся потоком, память не зависит
+    от количества статей.
+    """
+    return StreamingResponse(
+        export_posts(status),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="posts.ndjson"'},
+    )
+
+
+@router.post(
+    "/posts/import",
+    response_model=PostImportResponse,
+    summary="Импорт статей (NDJSON)",
+)
+async def import_posts_ndjson(
+    request: Request,
+    admin: CurrentAdmin,
+    background_tasks: BackgroundTasks,
+):
+    """
+    Тело запроса — NDJSON в формате экспорта (Content-Type: application/x-ndjson).
+    
+    - Статьи с уже существующим id пропускаются (повторный импорт безопасен)
+    - Занятый slug получает суффикс -N
+    - Автор ищется по username, иначе — текущий администратор
+    - Недостающие теги создаются
+    
+    Импорт идёт пачками, каждая в своей транзакции: при ошибке
+    уже импортированные пачки остаются.
+    """
+    result = await import_posts(request.stream(), admin.id)
+    
+    if result.imported:
+        background_tasks.add_task(rebuild_related_posts_index.enqueue)
+    
+    return result
+
+
+@router.get(
+    "/metrics/events",
+    summary="Метрики буфера событий",
+)
+async def get_event_metrics(
+    admin: CurrentAdmin,
+):
+    """
+    Счётчики буфера событий текущего воркера:
+    принято, отброшено при переполнении, записано, ошибки записи.
+    **enabled**=false — запись событий выключена (EVENTS_ENABLED).
+    """
+    return event_buffer.metrics
+
+
+@router.get(
+    "/metrics/jobs",
+    summary="Метрики очередей задач",
+)
+async def get_job_metrics(
+    admin: CurrentAdmin,
+):
+    """
+    Очереди: ожидают, выполняются, отложены на повтор, в dead-letter.
+    Задачи: выполнено, повторов, в dead-letter, средние задержка и время выполнения.
+    """
+    return await get_queue_metrics()
+
+
+@router.post(
+    "/users/{user_id}/account-jobs",
+    response_model=AccountJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Заблокировать / удалить аккаунт",
+)
+async def create_account_job(
+    user_id: UUID,
+    data: AccountJobCreate,
+    admin: CurrentAdmin,
+    db: DbSession,
+    background_tasks: BackgroundTasks,
+):
+    """
+    Аккаунт блокируется сразу: вход запрещён, все токены отозваны.
+    
+    Режимы:
+    - **deactivate**: только блокировка
+    - **anonymize**: лайки удаляются, комментарии обезличиваются,
+      персональные данные стираются, статьи остаются
+    - **delete**: лайки, комментарии и статьи удаляются, затем аккаунт
+    
+    Контент обрабатывается в фоне небольшими пачками,
+    прогресс — GET /admin/account-jobs/{job_id}.
+    """
+    service = AccountService(db)
+    job = await service.start_job(user_id, data.mode, admin)
+    
+    # В очередь после коммита (фоновые задачи FastAPI идут после ответа)
+    background_tasks.add_task(process_account.enqueue, job.id)
+    
+    return job
+
+
+@router.get(
+    "/account-jobs/{job_id}",
+    response_model=AccountJobResponse,
+    summary="Прогресс обработки аккаунта",
+)
+async def get_account_job(
+    job_id: UUID,
+    admin: CurrentAdmin,
+    db: DbSession,
+):
+    """Статус задачи и количество обработанных статей, комментариев и лайков."""
+    service = AccountService(db)
+    return await service.get_job(job_id)
@@ -4,11 +4,12 @@ Auth API Routes
 Эндпоинты аутентификации.
 """
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, BackgroundTasks, Depends, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import DbSession, CurrentUser, get_current_user
 from app.core.security import decode_token
+from app.jobs.tasks import send_email
 from app.schemas.auth import (
     EmailVerification,
     TokenPair,
@@ -32,6 +33,7 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 async def register(
     data: UserRegister,
     db: DbSession,
+    background_tasks: BackgroundTasks,
 ):
     """
     Регистрация нового пользователя.
@@ -42,8 +44,13 @@ async def register(
     service = AuthService(db)
     user = await service.register(data)
     
-    # TODO: Отправить email verification
-    # await send_verification_email(user.email, user.verification_token)
+    # Письмо ставится в очередь после коммита, SMTP не ждём
+    background_tasks.add_task(
+        send_email.enqueue,
+        user.email,
+        "verify_email",
+        {"username": user.username, "token": user.verification_token},
+    )
     
     return user
 
@@ -142,15 +149,20 @@ async def verify_email(
 async def resend_verification(
     email: str,
     db: DbSession,
+    background_tasks: BackgroundTasks,
 ):
     """
     Повторно отправить письмо для подтверждения email.
     """
     service = AuthService(db)
-    token = await service.resend_verification(email)
+    user = await service.resend_verification(email)
     
-    # TODO: Отправить email
-    # await send_verification_email(email, token)
+    background_tasks.add_task(
+        send_email.enqueue,
+        user.email,
+        "verify_email",
+        {"username": user.username, "token": user.verification_token},
+    )
     
     return {"message": "Verification email sent"}
 
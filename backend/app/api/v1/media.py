@@ -0,0 +1,70 @@
+"""
+Media API Routes
+================
+Загрузка изображений.
+"""
+
+from typing import Literal
+
+from fastapi import APIRouter, File, Path, Query, Request, Response, UploadFile, status
+from fastapi.responses import FileResponse
+
+from app.api.deps import CurrentUser, DbSession
+from app.config import settings
+from app.schemas.media import MediaResponse
+from app.services.media_service import MediaService, get_derivative
+
+
+router = APIRouter(prefix="/media", tags=["Media"])
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@router.post(
+    "",
+    response_model=MediaResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Загрузить изображение",
+)
+async def upload_media(
+    current_user: CurrentUser,
+    db: DbSession,
+    file: UploadFile = File(..., description="JPEG, PNG, WebP или GIF"),
+):
+    """
+    Загрузить изображение (например, обложку статьи).
+    
+    Возвращает ссылки на варианты фиксированной ширины в WebP и JPEG.
+    Повторная загрузка того же файла возвращает уже готовые варианты.
+    """
+    service = MediaService(db)
+    return await service.upload(current_user, file)
+
+
+@router.get(
+    "/{sha256}",
+    response_class=FileResponse,
+    summary="Изображение произвольного размера",
+)
+async def get_media(
+    request: Request,
+    sha256: str = Path(..., pattern=r"^[0-9a-f]{64}$"),
+    w: int | None = Query(None, ge=1, le=settings.media_max_dimension, description="Ширина рамки"),
+    h: int | None = Query(None, ge=1, le=settings.media_max_dimension, description="Высота рамки"),
+    fmt: Literal["webp", "jpeg"] = Query("webp", description="Формат"),
+):
+    """
+    Изображение, вписанное в рамку w x h (без увеличения).
+    
+    Производные генерируются при первом запросе и кэшируются на диске.
+    Содержимое по URL никогда не меняется, поэтому ответ кэшируется
+    браузером и CDN без ревалидации.
+    """
+    etag = f'"{sha256}-{w or 0}x{h or 0}.{fmt}"'
+    headers = {"Cache-Control": IMMUTABLE_CACHE_CONTROL, "ETag": etag}
+    
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    path = await get_derivative(sha256, w, h, fmt)
+    return FileResponse(path, media_type=f"image/{fmt}", headers=headers)
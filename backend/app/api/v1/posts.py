@@ -4,20 +4,33 @@ Posts API Routes
 Эндпоинты для работы со статьями.
 """
 
+from datetime import date
+from typing import Literal
 from uuid import UUID
 
-from fastapi import APIRouter, Query, status
+from fastapi import APIRouter, BackgroundTasks, Query, status
 
-from app.api.deps import CurrentUser, DbSession
+from app.api.deps import CurrentUser, DbSession, ViewerKey
+from app.jobs.tasks import update_related_posts
 from app.models.post import PostStatus
+from app.schemas.analytics import PostStatsResponse
 from app.schemas.post import (
+    DraftPatch,
+    DraftResponse,
     PostCreate,
     PostDetailResponse,
     PostListResponse,
     PostResponse,
+    PostRevisionDetailResponse,
+    PostRevisionResponse,
+    PostUniqueViewsResponse,
     PostUpdate,
+    RelatedPostResponse,
 )
+from app.services.analytics_service import AnalyticsService
+from app.services.draft_service import DraftService
 from app.services.post_service import PostService
+from app.services.revision_service import RevisionService
 
 
 router = APIRouter(prefix="/posts", tags=["Posts"])
@@ -34,7 +47,10 @@ async def get_posts(
     per_page: int = Query(10, ge=1, le=50, description="Статей на странице"),
     status: PostStatus | None = Query(PostStatus.PUBLISHED, description="Статус"),
     author_id: UUID | None = Query(None, description="ID автора"),
-    tag: str | None = Query(None, description="Slug тега"),
+    tag: list[str] | None = Query(None, description="Slug тега (можно несколько)"),
+    tag_match: Literal["all", "any"] = Query(
+        "all", description="Несколько тегов: all — все (AND), any — любой (OR)"
+    ),
     search: str | None = Query(None, description="Поисковый запрос"),
 ):
     """
@@ -49,7 +65,8 @@ async def get_posts(
         per_page=per_page,
         status=status,
         author_id=author_id,
-        tag_slug=tag,
+        tag_slugs=tag,
+        tag_match_all=tag_match == "all",
         search=search,
     )
     
@@ -72,21 +89,97 @@ async def get_posts(
 async def get_post(
     slug: str,
     db: DbSession,
+    viewer_key: ViewerKey,
 ):
     """
     Получить статью по slug.
     
-    Автоматически увеличивает счётчик просмотров.
+    Автоматически увеличивает счётчик просмотров
+    и учитывает уникального читателя.
     """
     service = PostService(db)
     post = await service.get_post_by_slug(slug)
     
     # Увеличиваем просмотры
     await service.increment_views(post.id)
+    await service.record_unique_view(post.id, viewer_key)
     
     return post
 
 
+@router.get(
+    "/{slug}/unique-views",
+    response_model=PostUniqueViewsResponse,
+    summary="Уникальные читатели",
+)
+async def get_unique_views(
+    slug: str,
+    db: DbSession,
+    period: Literal["day", "week", "month", "all"] = Query(
+        "all", description="Период"
+    ),
+):
+    """
+    Оценка числа уникальных читателей статьи (погрешность ~1%).
+    """
+    service = PostService(db)
+    post_id, unique_viewers = await service.get_unique_views(slug, period)
+    
+    return PostUniqueViewsResponse(
+        post_id=post_id,
+        period=period,
+        unique_viewers=unique_viewers,
+    )
+
+
+@router.get(
+    "/{slug}/related",
+    response_model=list[RelatedPostResponse],
+    summary="Похожие статьи",
+)
+async def get_related_posts(
+    slug: str,
+    db: DbSession,
+):
+    """
+    Получить похожие статьи.
+    
+    Список предрассчитывается фоновой задачей (TF-IDF близость).
+    """
+    service = PostService(db)
+    return await service.get_related_posts(slug)
+
+
+@router.get(
+    "/{slug}/stats",
+    response_model=PostStatsResponse,
+    summary="Статистика статьи",
+)
+async def get_post_stats(
+    slug: str,
+    current_user: CurrentUser,
+    db: DbSession,
+    granularity: Literal["hour", "day", "month"] = Query("day", description="Шаг ряда"),
+    date_from: date | None = Query(None, description="Начало периода"),
+    date_to: date | None = Query(None, description="Конец периода (включительно)"),
+):
+    """
+    Просмотры, лайки и комментарии статьи по часам/дням/месяцам.
+    
+    Только автор статьи или администратор.
+    """
+    service = AnalyticsService(db)
+    post_id, items = await service.get_post_timeseries(
+        slug,
+        current_user,
+        granularity=granularity,
+        date_from=date_from,
+        date_to=date_to,
+    )
+    
+    return PostStatsResponse(post_id=post_id, granularity=granularity, items=items)
+
+
 @router.post(
     "",
     response_model=PostResponse,
@@ -103,6 +196,8 @@ async def create_post(
     """
     service = PostService(db)
     post = await service.create_post(current_user, data)
+    await db.commit()
+    await service.after_commit()
     
     return post
 
@@ -117,18 +212,67 @@ async def update_post(
     data: PostUpdate,
     current_user: CurrentUser,
     db: DbSession,
+    background_tasks: BackgroundTasks,
 ):
     """
     Обновить статью.
     
     Только автор статьи или администратор.
+    Похожие статьи пересчитываются в фоне после ответа.
     """
     service = PostService(db)
     post = await service.update_post(post_id, current_user, data)
+    await db.commit()
+    await service.after_commit()
+    
+    if {"title", "content", "status", "tag_ids", "tags"} & data.model_fields_set:
+        background_tasks.add_task(update_related_posts.enqueue, post.id)
     
     return post
 
 
+@router.get(
+    "/{post_id}/draft",
+    response_model=DraftResponse,
+    summary="Черновик для редактора",
+)
+async def get_draft(
+    post_id: UUID,
+    current_user: CurrentUser,
+    db: DbSession,
+):
+    """
+    Рабочая копия черновика и её версия.
+    
+    Может быть новее статьи в БД на несколько секунд автосохранения.
+    """
+    service = DraftService(db)
+    return await service.get_draft(post_id, current_user)
+
+
+@router.patch(
+    "/{post_id}/draft",
+    response_model=DraftResponse,
+    summary="Автосохранение черновика",
+)
+async def patch_draft(
+    post_id: UUID,
+    data: DraftPatch,
+    current_user: CurrentUser,
+    db: DbSession,
+):
+    """
+    Применить правки к черновику.
+    
+    Правки применяются к версии `version`; если черновик уже изменён
+    (другая вкладка, PUT), возвращается 409 — перечитайте черновик.
+    Только для статей в статусе draft. В БД черновик записывается
+    в фоне, не чаще раза в несколько секунд.
+    """
+    service = DraftService(db)
+    return await service.patch_draft(post_id, current_user, data)
+
+
 @router.delete(
     "/{post_id}",
     status_code=status.HTTP_204_NO_CONTENT,
@@ -146,6 +290,8 @@ async def delete_post(
     """
     service = PostService(db)
     await service.delete_post(post_id, current_user)
+    await db.commit()
+    await service.after_commit()
 
 
 @router.post(
@@ -166,3 +312,42 @@ async def toggle_like(
     liked = await service.toggle_like(post_id, current_user)
     
     return {"liked": liked}
+
+
+@router.get(
+    "/{post_id}/revisions",
+    response_model=list[PostRevisionResponse],
+    summary="История правок статьи",
+)
+async def get_post_revisions(
+    post_id: UUID,
+    current_user: CurrentUser,
+    db: DbSession,
+):
+    """
+    Ревизии статьи, новые первыми.
+    
+    Только автор статьи или администратор.
+    """
+    service = RevisionService(db)
+    return await service.list_revisions(post_id, current_user)
+
+
+@router.get(
+    "/{post_id}/revisions/{number}",
+    response_model=PostRevisionDetailResponse,
+    summary="Ревизия статьи",
+)
+async def get_post_revision(
+    post_id: UUID,
+    number: int,
+    current_user: CurrentUser,
+    db: DbSession,
+):
+    """
+    Заголовок и текст статьи в указанной ревизии.
+    
+    Для отката отправьте их в PUT /posts/{post_id}.
+    """
+    service = RevisionService(db)
+    return await service.get_revision(post_id, number, current_user)
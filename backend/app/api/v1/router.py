@@ -6,8 +6,12 @@ API v1 Router
 
 from fastapi import APIRouter
 
+from app.api.v1.admin import router as admin_router
 from app.api.v1.auth import router as auth_router
+from app.api.v1.media import router as media_router
 from app.api.v1.posts import router as posts_router
+from app.api.v1.tags import router as tags_router
+from app.api.v1.users import router as users_router
 
 
 router = APIRouter(prefix="/v1")
@@ -15,8 +19,10 @@ router = APIRouter(prefix="/v1")
 # Подключаем все роутеры
 router.include_router(auth_router)
 router.include_router(posts_router)
+router.include_router(users_router)
+router.include_router(tags_router)
+router.include_router(media_router)
+router.include_router(admin_router)
 
 # TODO: Добавить позже
-# router.include_router(users_router)
 # router.include_router(comments_router)
-# router.include_router(tags_router)
@@ -0,0 +1,98 @@
+"""
+Tags API Routes
+===============
+Эндпоинты для работы с тегами.
+"""
+
+from fastapi import APIRouter, Query, status
+
+from app.api.deps import CurrentAdmin, DbSession
+from app.schemas.tag import (
+    TagBulkCreate,
+    TagCloudResponse,
+    TagCreate,
+    TagListResponse,
+    TagResponse,
+)
+from app.services.tag_service import TagService
+
+
+router = APIRouter(prefix="/tags", tags=["Tags"])
+
+
+@router.get(
+    "",
+    response_model=TagListResponse,
+    summary="Список тегов",
+)
+async def get_tags(
+    db: DbSession,
+):
+    """
+    Получить все теги с количеством опубликованных статей.
+    """
+    service = TagService(db)
+    tags = await service.get_tags()
+    
+    return TagListResponse(items=tags, total=len(tags))
+
+
+@router.get(
+    "/cloud",
+    response_model=TagCloudResponse,
+    summary="Облако тегов",
+)
+async def get_tag_cloud(
+    db: DbSession,
+    limit: int = Query(50, ge=1, le=200, description="Максимум тегов"),
+):
+    """
+    Самые популярные теги с относительным весом 1-5.
+    """
+    service = TagService(db)
+    items = await service.get_tag_cloud(limit)
+    
+    return TagCloudResponse(items=items)
+
+
+@router.post(
+    "",
+    response_model=TagResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Создать тег",
+)
+async def create_tag(
+    data: TagCreate,
+    admin: CurrentAdmin,
+    db: DbSession,
+):
+    """
+    Создать новый тег.
+    
+    Только администратор.
+    """
+    service = TagService(db)
+    tag = await service.create_tag(data)
+    
+    return tag
+
+
+@router.post(
+    "/bulk",
+    response_model=TagListResponse,
+    summary="Получить или создать теги",
+)
+async def get_or_create_tags(
+    data: TagBulkCreate,
+    admin: CurrentAdmin,
+    db: DbSession,
+):
+    """
+    Получить теги по названиям, создав недостающие одним запросом.
+    
+    Только администратор, как и создание одного тега.
+    """
+    service = TagService(db)
+    tags = await service.get_or_create_by_names(data.names)
+    
+    return TagListResponse(items=tags, total=len(tags))
@@ -0,0 +1,52 @@
+"""
+Users API Routes
+================
+Эндпоинты пользователей.
+"""
+
+from fastapi import APIRouter, Query
+
+from app.api.deps import CurrentUser, DbSession
+from app.schemas.user import UserProfileResponse, UserStats
+from app.services.analytics_service import AnalyticsService
+from app.services.user_service import UserService
+
+
+router = APIRouter(prefix="/users", tags=["Users"])
+
+
+@router.get(
+    "/me/stats",
+    response_model=UserStats,
+    summary="Моя статистика",
+)
+async def get_my_stats(
+    current_user: CurrentUser,
+    db: DbSession,
+):
+    """
+    Статистика текущего пользователя как автора:
+    статьи, просмотры, полученные лайки и комментарии.
+    """
+    service = AnalyticsService(db)
+    return await service.get_user_stats(current_user.id)
+
+
+@router.get(
+    "/{username}",
+    response_model=UserProfileResponse,
+    summary="Профиль автора",
+)
+async def get_user_profile(
+    username: str,
+    db: DbSession,
+    recent: int = Query(5, ge=0, le=20, description="Количество последних статей"),
+):
+    """
+    Публичный профиль автора: данные, статистика и последние статьи.
+    
+    Статистика берётся из периодически обновляемого агрегата,
+    поэтому может отставать на несколько минут.
+    """
+    service = UserService(db)
+    return await service.get_profile(username, recent_limit=recent)
@@ -47,13 +47,115 @@ class Settings(BaseSettings):
     smtp_user: str = ""
     smtp_password: str = ""
     email_from: str = "noreply@example.com"
+    email_enabled: bool = True
+    smtp_use_tls: bool = False  # TLS сразу при подключении (порт 465)
+    smtp_start_tls: bool | None = None  # None — STARTTLS, если сервер поддерживает
+    smtp_timeout: int = 30
+    smtp_pool_size: int = 2
+    smtp_idle_timeout: int = 60
+    email_rate_per_second: float = 10.0
+    
+    # Weekly digest
+    digest_enabled: bool = False  # массовая рассылка включается явно
+    digest_send_hour: int = 9  # UTC, понедельник
+    digest_max_posts: int = 10
+    digest_batch_size: int = 200
+    digest_check_interval: int = 3600
+    digest_stale_after: int = 600
+    
+    # Media (загрузка изображений)
+    media_dir: str = "data/media"
+    media_url_prefix: str = "/media"
+    media_max_upload_bytes: int = 10 * 1024 * 1024
+    media_max_pixels: int = 40_000_000  # защита от decompression bomb
+    media_variant_widths: list[int] = [320, 640, 1280]
+    media_formats: list[str] = ["webp", "jpeg"]
+    media_process_workers: int = 2
+    media_max_dimension: int = 2560  # предел w/h для ресайза по запросу
+    media_cache_max_bytes: int = 1024 * 1024 * 1024  # общий лимит всех процессов
+    media_cache_sweep_interval: int = 60  # обход кэша на диске не чаще раза в N секунд
+    
+    # Post revisions
+    post_revision_snapshot_every: int = 20  # полный снимок каждые N ревизий
+    post_revision_max: int = 100  # хранится не меньше N последних ревизий
+    
+    # Draft autosave
+    draft_persist_interval: int = 10  # запись черновика в БД не чаще раза в N секунд
+    draft_max_length: int = 500_000
+    publish_check_interval: int = 30  # проверка отложенных публикаций, секунды
+    
+    # Admin bulk operations
+    admin_bulk_max_posts: int = 5000
     
     # Frontend
     frontend_url: str = "http://localhost:3000"
     
+    # Sitemap & feeds
+    public_url: str = "http://localhost:8000"  # адрес API в ссылках sitemap и лент
+    site_title: str = "Blog"
+    sitemap_shard_size: int = 50_000
+    feed_max_items: int = 20
+    feed_cache_ttl: int = 3600
+    
+    # Static export (снимок для CDN)
+    static_export_enabled: bool = False
+    static_export_dir: str = "data/static"
+    static_export_interval: int = 300
+    static_export_pages: int = 5  # первые N страниц ленты и каждого тега
+    static_export_per_page: int = 10
+    
     # Rate Limiting
     rate_limit_per_minute: int = 100
     
+    # Reverse proxy: X-Forwarded-For учитывается только от этих адресов (IP или подсети)
+    trusted_proxies: list[str] = []
+    
+    # Related posts
+    related_posts_top_k: int = 5
+    related_posts_min_score: float = 0.05
+    related_posts_index_dir: str = "data/related"
+    
+    # Near-duplicate detection (MinHash)
+    duplicate_similarity_threshold: float = 0.8
+    duplicate_block_publication: bool = False
+    
+    # Background jobs
+    scheduler_enabled: bool = True
+    unique_views_persist_interval: int = 300
+    analytics_compact_interval: int = 300
+    analytics_hourly_retention_days: int = 2
+    analytics_daily_retention_days: int = 90
+    user_stats_refresh_interval: int = 600
+    
+    # Deletion (soft delete + background purge)
+    soft_delete_enabled: bool = True
+    purge_interval: int = 3600
+    purge_retention_days: int = 7
+    purge_batch_size: int = 200
+    purge_batch_pause_ms: int = 100
+    
+    # Account jobs (batched deactivation / deletion)
+    account_job_batch_size: int = 500
+    account_job_peak_batch_size: int = 50
+    account_job_batch_pause_ms: int = 50
+    account_job_peak_pause_ms: int = 1_000
+    account_job_peak_hours: tuple[int, int] = (8, 23)  # UTC, [start, end)
+    account_job_resume_interval: int = 60
+    account_job_stale_after: int = 300
+    
+    # Job queue (Redis Streams)
+    job_queues: dict[str, int] = {"default": 4, "maintenance": 1, "email": 2}  # очередь -> параллельность
+    job_worker_in_process: bool = True  # False — только отдельный `python -m app.jobs.worker`
+    job_visibility_timeout: int = 60
+    job_block_ms: int = 2_000
+    job_stream_maxlen: int = 100_000
+    
+    # Event ingestion (COPY buffer)
+    events_enabled: bool = True
+    event_buffer_max_size: int = 100_000
+    event_batch_size: int = 5_000
+    event_flush_interval_ms: int = 1_000
+    
     @property
     def is_production(self) -> bool:
         return self.environment == "production"
@@ -0,0 +1,74 @@
+"""
+Text Delta
+==========
+Построчные дельты текста для хранения ревизий.
+
+Дельта — список операций над строками предыдущей версии:
+    [0, n]      скопировать n строк
+    [1, "..."]  вставить текст
+    [2, n]      пропустить n строк
+
+Дельта и снимок хранятся сжатыми (zlib).
+"""
+
+import json
+import zlib
+from difflib import SequenceMatcher
+
+COPY, INSERT, SKIP = 0, 1, 2
+
+
+def make_delta(old: str, new: str) -> list[list]:
+    """Дельта, превращающая old в new."""
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    
+    ops: list[list] = []
+    matcher = SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append([COPY, i2 - i1])
+            continue
+        if i2 > i1:
+            ops.append([SKIP, i2 - i1])
+        if j2 > j1:
+            ops.append([INSERT, "".join(new_lines[j1:j2])])
+    
+    return ops
+
+
+def apply_delta(old: str, ops: list[list]) -> str:
+    """Применить дельту к old."""
+    old_lines = old.splitlines(keepends=True)
+    parts: list[str] = []
+    position = 0
+    
+    for op, value in ops:
+        if op == COPY:
+            parts.extend(old_lines[position:position + value])
+            position += value
+        elif op == SKIP:
+            position += value
+        elif op == INSERT:
+            parts.append(value)
+        else:
+            raise ValueError(f"Unknown delta operation {op!r}")
+    
+    return "".join(parts)
+
+
+def compress_text(text: str) -> bytes:
+    return zlib.compress(text.encode(), 6)
+
+
+def decompress_text(data: bytes) -> str:
+    return zlib.decompress(data).decode()
+
+
+def compress_delta(ops: list[list]) -> bytes:
+    return zlib.compress(json.dumps(ops, ensure_ascii=False, separators=(",", ":")).encode(), 6)
+
+
+def decompress_delta(data: bytes) -> list[list]:
+    return json.loads(zlib.decompress(data))
@@ -110,6 +110,26 @@ class AlreadyExistsException(BlogException):
         )
 
 
+class VersionConflictException(BlogException):
+    """Изменение основано на устаревшей версии."""
+    
+    def __init__(self, current_version: int):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Version conflict, current version is {current_version}",
+        )
+
+
+class DuplicateContentException(BlogException):
+    """Содержимое статьи почти совпадает с существующей статьёй."""
+    
+    def __init__(self, slug: str):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Post content duplicates an existing post: {slug}",
+        )
+
+
 # === Validation Exceptions ===
 
 class ValidationException(BlogException):
@@ -122,6 +142,16 @@ class ValidationException(BlogException):
         )
 
 
+class PayloadTooLargeException(BlogException):
+    """Тело запроса превышает допустимый размер."""
+    
+    def __init__(self, max_bytes: int):
+        super().__init__(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Payload too large (max {max_bytes} bytes)",
+        )
+
+
 # === Rate Limiting ===
 
 class RateLimitExceededException(BlogException):
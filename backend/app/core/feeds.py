@@ -0,0 +1,128 @@
+"""
+XML Feeds
+=========
+Фрагменты XML для sitemap (sitemaps.org) и лент RSS 2.0 / Atom.
+
+Документы собираются по частям: строки из БД читаются потоком,
+и каждая сразу превращается в фрагмент, без промежуточного дерева.
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from xml.sax.saxutils import escape, quoteattr
+
+# Ограничение протокола sitemaps.org на один файл
+SITEMAP_MAX_URLS = 50_000
+
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>\n'
+
+URLSET_OPEN = '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+URLSET_CLOSE = "</urlset>\n"
+
+SITEMAPINDEX_OPEN = '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+SITEMAPINDEX_CLOSE = "</sitemapindex>\n"
+
+# Управляющие символы, недопустимые в XML 1.0
+INVALID_XML_RE = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+@dataclass
+class FeedItem:
+    """Запись ленты."""
+    
+    title: str
+    link: str
+    summary: str
+    content_html: str
+    author: str
+    published: datetime
+    updated: datetime
+
+
+def _utc(value: datetime) -> datetime:
+    """naive datetime считаем UTC."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _text(value: str) -> str:
+    return escape(INVALID_XML_RE.sub("", value))
+
+
+def w3c_datetime(value: datetime) -> str:
+    return _utc(value).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def sitemap_url(loc: str, lastmod: datetime) -> str:
+    return f"<url><loc>{escape(loc)}</loc><lastmod>{w3c_datetime(lastmod)}</lastmod></url>\n"
+
+
+def sitemap_entry(loc: str, lastmod: datetime | None) -> str:
+    """Ссылка на файл sitemap в индексе."""
+    if lastmod is None:
+        return f"<sitemap><loc>{escape(loc)}</loc></sitemap>\n"
+    return f"<sitemap><loc>{escape(loc)}</loc><lastmod>{w3c_datetime(lastmod)}</lastmod></sitemap>\n"
+
+
+def rss_feed(title: str, link: str, description: str, items: list[FeedItem]) -> str:
+    """Лента RSS 2.0 (полный текст — в content:encoded)."""
+    parts = [
+        XML_DECLARATION,
+        '<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/">\n',
+        "<channel>\n",
+        f"<title>{_text(title)}</title>\n",
+        f"<link>{escape(link)}</link>\n",
+        f"<description>{_text(description)}</description>\n",
+    ]
+    if items:
+        updated = max(item.updated for item in items)
+        parts.append(f"<lastBuildDate>{format_datetime(_utc(updated))}</lastBuildDate>\n")
+    
+    for item in items:
+        parts.append(
+            "<item>"
+            f"<title>{_text(item.title)}</title>"
+            f"<link>{escape(item.link)}</link>"
+            f'<guid isPermaLink="true">{escape(item.link)}</guid>'
+            f"<pubDate>{format_datetime(_utc(item.published))}</pubDate>"
+            f"<description>{_text(item.summary)}</description>"
+            f"<content:encoded>{_text(item.content_html)}</content:encoded>"
+            "</item>\n"
+        )
+    
+    parts.append("</channel>\n</rss>\n")
+    return "".join(parts)
+
+
+def atom_feed(title: str, link: str, feed_url: str, items: list[FeedItem]) -> str:
+    """Лента Atom 1.0."""
+    updated = max((item.updated for item in items), default=datetime.now(timezone.utc))
+    parts = [
+        XML_DECLARATION,
+        '<feed xmlns="http://www.w3.org/2005/Atom">\n',
+        f"<title>{_text(title)}</title>\n",
+        f"<id>{escape(feed_url)}</id>\n",
+        f"<link href={quoteattr(link)}/>\n",
+        f'<link rel="self" href={quoteattr(feed_url)}/>\n',
+        f"<updated>{w3c_datetime(updated)}</updated>\n",
+    ]
+    
+    for item in items:
+        parts.append(
+            "<entry>"
+            f"<title>{_text(item.title)}</title>"
+            f"<id>{escape(item.link)}</id>"
+            f"<link href={quoteattr(item.link)}/>"
+            f"<author><name>{_text(item.author)}</name></author>"
+            f"<published>{w3c_datetime(item.published)}</published>"
+            f"<updated>{w3c_datetime(item.updated)}</updated>"
+            f"<summary>{_text(item.summary)}</summary>"
+            f'<content type="html">{_text(item.content_html)}</content>'
+            "</entry>\n"
+        )
+    
+    parts.append("</feed>\n")
+    return "".join(parts)
@@ -0,0 +1,212 @@
+"""
+Image Processing
+================
+Декодирование и ресайз изображений в пуле процессов.
+
+Функции модуля выполняются в дочерних процессах (ProcessPoolExecutor),
+поэтому принимают и возвращают только простые типы. Event loop
+не декодирует и не кодирует изображения.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image, ImageOps
+
+from app.config import settings
+
+
+ORIENTATION_TAG = 0x0112
+
+# Форматы, которые принимаем на вход
+ALLOWED_FORMATS = {"JPEG", "PNG", "WEBP", "GIF"}
+
+# Параметры кодирования выходных форматов
+OUTPUT_FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+
+class ImageError(ValueError):
+    """Файл не является допустимым изображением."""
+
+
+def _open(path: str, max_pixels: int) -> Image.Image:
+    """
+    Открыть изображение с защитой от decompression bomb.
+    
+    Image.open читает только заголовок — размер проверяется
+    до декодирования пикселей.
+    """
+    Image.MAX_IMAGE_PIXELS = max_pixels
+    
+    try:
+        image = Image.open(path)
+    except (Image.DecompressionBombError, Image.DecompressionBombWarning):
+        raise ImageError("Image is too large")
+    except (OSError, SyntaxError):
+        raise ImageError("File is not a supported image")
+    
+    if image.format not in ALLOWED_FORMATS:
+        raise ImageError(f"Unsupported image format: {image.format}")
+    
+    if image.width * image.height > max_pixels:
+        raise ImageError("Image is too large")
+    
+    return image
+
+
+def _decode(image: Image.Image) -> Image.Image:
+    """
+    Повернуть по EXIF и декодировать пиксели.
+    
+    Повреждённый или обрезанный файл обнаруживается только здесь
+    (заголовок читается нормально), поэтому OSError тоже ImageError.
+    """
+    try:
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    except (OSError, SyntaxError):
+        raise ImageError("Image data is truncated or corrupt")
+    return image
+
+
+def _prepare(image: Image.Image, fmt: str) -> Image.Image:
+    """Привести режим к поддерживаемому форматом (JPEG без альфа-канала)."""
+    if fmt == "jpeg":
+        if image.mode in ("RGBA", "LA", "P"):
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel("A"))
+            return background
+        return image.convert("RGB") if image.mode != "RGB" else image
+    
+    return image.convert("RGBA") if image.mode in ("P", "LA") else image
+
+
+def _save(image: Image.Image, path: Path, fmt: str) -> int:
+    """Записать атомарно (tmp + rename), вернуть размер файла."""
+    pil_format, options = OUTPUT_FORMATS[fmt]
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    
+    _prepare(image, fmt).save(tmp, pil_format, **options)
+    os.replace(tmp, path)
+    
+    return path.stat().st_size
+
+
+def resize_to_box(image: Image.Image, width: int | None, height: int | None) -> Image.Image:
+    """Вписать в рамку width x height (без увеличения)."""
+    box = (width or image.width, height or image.height)
+    resized = image.copy()
+    resized.thumbnail(box, Image.Resampling.LANCZOS)
+    return resized
+
+
+def generate_variants(
+    source: str,
+    output_dir: str,
+    widths: list[int],
+    formats: list[str],
+    max_pixels: int,
+) -> dict:
+    """
+    Сгенерировать варианты изображения фиксированной ширины.
+    
+    Выполняется в дочернем процессе.
+    
+    Returns:
+        {"format", "width", "height", "variants": [{"width", "height", "format", "size"}]}
+    """
+    image = _open(source, max_pixels)
+    source_format = image.format
+    
+    # Размер оригинала с учётом поворота из EXIF
+    width, height = image.size
+    if image.getexif().get(ORIENTATION_TAG) in (5, 6, 7, 8):
+        width, height = height, width
+    
+    # JPEG декодируется сразу в уменьшенном масштабе (DCT scaling):
+    # обе стороны не меньше самой большой ширины — при любом повороте
+    largest = min(max(widths), width)
+    image.draft("RGB", (largest, largest))
+    
+    image = _decode(image)
+    
+    out = Path(output_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    
+    # Ширины больше оригинала не генерируем, но хотя бы один вариант нужен
+    targets = sorted({min(target, width) for target in widths})
+    
+    variants = []
+    for target in targets:
+        resized = resize_to_box(image, target, None)
+        for fmt in formats:
+            size = _save(resized, out / f"{resized.width}.{fmt}", fmt)
+            variants.append({
+                "width": resized.width,
+                "height": resized.height,
+                "format": fmt,
+                "size": size,
+            })
+    
+    return {
+        "format": source_format,
+        "width": width,
+        "height": height,
+        "variants": variants,
+    }
+
+
+def render_derivative(
+    source: str,
+    target: str,
+    width: int | None,
+    height: int | None,
+    fmt: str,
+    max_pixels: int,
+) -> int:
+    """
+    Вписать изображение в рамку width x height и сохранить в target.
+    
+    Выполняется в дочернем процессе. Возвращает размер файла.
+    """
+    image = _open(source, max_pixels)
+    
+    side = max(width or 0, height or 0)
+    if side:
+        image.draft("RGB", (side, side))
+    
+    image = _decode(image)
+    
+    path = Path(target)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    
+    return _save(resize_to_box(image, width, height), path, fmt)
+
+
+# === Пул процессов ===
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Пул процессов для обработки изображений (создаётся при первом вызове)."""
+    global _pool
+    
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=settings.media_process_workers)
+    
+    return _pool
+
+
+def shutdown_process_pool() -> None:
+    """Остановить пул процессов (вызывается в lifespan)."""
+    global _pool
+    
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
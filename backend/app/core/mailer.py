@@ -0,0 +1,139 @@
+"""
+SMTP Mailer
+===========
+Пул постоянных SMTP-соединений.
+
+Соединение открывается (TLS + AUTH) один раз и переиспользуется
+для последующих писем, пока не простоит SMTP_IDLE_TIMEOUT секунд.
+Количество одновременных соединений ограничено SMTP_POOL_SIZE,
+частота отправки — EMAIL_RATE_PER_SECOND (на процесс).
+
+Для локальной разработки подходит любой SMTP stand-in
+(mailpit в docker-compose: SMTP_HOST=mailpit, SMTP_PORT=1025).
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from email.message import EmailMessage
+
+import aiosmtplib
+
+from app.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class SMTPPool:
+    """Ограниченный пул аутентифицированных SMTP-соединений."""
+    
+    def __init__(
+        self,
+        size: int,
+        rate_per_second: float,
+        idle_timeout: float,
+    ):
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.min_interval = 1 / rate_per_second if rate_per_second > 0 else 0.0
+        
+        self._slots = asyncio.Semaphore(size)
+        self._idle: list[tuple[aiosmtplib.SMTP, float]] = []
+        self._rate_lock = asyncio.Lock()
+        self._next_send = 0.0
+    
+    async def _connect(self) -> aiosmtplib.SMTP:
+        smtp = aiosmtplib.SMTP(
+            hostname=settings.smtp_host,
+            port=settings.smtp_port,
+            use_tls=settings.smtp_use_tls,
+            start_tls=settings.smtp_start_tls,
+            timeout=settings.smtp_timeout,
+        )
+        await smtp.connect()
+        if settings.smtp_user:
+            await smtp.login(settings.smtp_user, settings.smtp_password)
+        return smtp
+    
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[aiosmtplib.SMTP]:
+        """
+        Взять соединение из пула (или открыть новое).
+        Сломанное соединение в пул не возвращается.
+        """
+        async with self._slots:
+            smtp = None
+            while self._idle:
+                candidate, idle_since = self._idle.pop()
+                if candidate.is_connected and time.monotonic() - idle_since < self.idle_timeout:
+                    smtp = candidate
+                    break
+                await _quit(candidate)
+            
+            if smtp is None:
+                smtp = await self._connect()
+            
+            try:
+                yield smtp
+            except BaseException:
+                await _quit(smtp)
+                raise
+            
+            if smtp.is_connected:
+                self._idle.append((smtp, time.monotonic()))
+    
+    async def _throttle(self) -> None:
+        """Не чаще EMAIL_RATE_PER_SECOND писем в секунду."""
+        if not self.min_interval:
+            return
+        
+        async with self._rate_lock:
+            now = time.monotonic()
+            wait = self._next_send - now
+            self._next_send = max(now, self._next_send) + self.min_interval
+        
+        if wait > 0:
+            await asyncio.sleep(wait)
+    
+    async def send(self, message: EmailMessage) -> None:
+        """
+        Отправить письмо через соединение из пула.
+        
+        Если сервер закрыл простаивавшее соединение, письмо
+        отправляется один раз повторно через новое соединение.
+        Остальные ошибки пробрасываются (повтор — на стороне очереди).
+        """
+        await self._throttle()
+        
+        try:
+            async with self.connection() as smtp:
+                await smtp.send_message(message)
+        except aiosmtplib.SMTPServerDisconnected:
+            logger.info("SMTP connection dropped, reconnecting")
+            async with self.connection() as smtp:
+                await smtp.send_message(message)
+    
+    async def close(self) -> None:
+        """Закрыть все простаивающие соединения."""
+        while self._idle:
+            smtp, _ = self._idle.pop()
+            await _quit(smtp)
+
+
+async def _quit(smtp: aiosmtplib.SMTP) -> None:
+    try:
+        if smtp.is_connected:
+            await smtp.quit()
+    except (aiosmtplib.SMTPException, OSError):
+        smtp.close()
+
+
+# Глобальный пул процесса
+mailer = SMTPPool(
+    size=settings.smtp_pool_size,
+    rate_per_second=settings.email_rate_per_second,
+    idle_timeout=settings.smtp_idle_timeout,
+)
@@ -0,0 +1,161 @@
+"""
+Derivative Cache
+================
+Ограниченный по размеру LRU-кэш производных изображений на диске.
+
+- Каталог кэша общий для всех процессов, поэтому размер и давность
+  берутся из самих файлов, а не из памяти процесса: попадание
+  обновляет mtime, обход каталога (не чаще MEDIA_CACHE_SWEEP_INTERVAL)
+  удаляет файлы с самым старым mtime сверх MEDIA_CACHE_MAX_BYTES
+- Недавно использованные файлы обход не трогает: путь, только что
+  отданный запросу, не исчезнет до отправки ответа
+- Файл, удалённый другим процессом, — обычный промах
+- Одновременные запросы одного ключа ждут одну генерацию
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# mtime обновляется не чаще раза в TOUCH_INTERVAL секунд на файл
+TOUCH_INTERVAL = 60
+
+# Файлы моложе SWEEP_GRACE секунд не удаляются
+SWEEP_GRACE = 2 * TOUCH_INTERVAL
+
+
+def _scan(directory: Path) -> list[tuple[float, Path, int]]:
+    """Файлы кэша (mtime, путь, размер) от старых к новым."""
+    entries = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.startswith("."):
+                continue  # незавершённая запись
+            path = Path(root) / name
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, path, stat.st_size))
+    
+    entries.sort()
+    return entries
+
+
+def _touch(path: Path) -> bool:
+    """Отметить использование файла; False — файла нет."""
+    try:
+        mtime = path.stat().st_mtime
+        if time.time() - mtime >= TOUCH_INTERVAL:
+            os.utime(path)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def _sweep(directory: Path, max_bytes: int) -> int:
+    """
+    Удалить давно не использованные файлы сверх max_bytes.
+    
+    Returns:
+        Количество удалённых файлов
+    """
+    entries = _scan(directory)
+    total = sum(size for _, _, size in entries)
+    oldest_allowed = time.time() - SWEEP_GRACE
+    removed = 0
+    
+    for mtime, path, size in entries:
+        if total <= max_bytes or mtime > oldest_allowed:
+            break
+        try:
+            # Файл могли использовать после обхода — тогда он остаётся
+            if path.stat().st_mtime != mtime:
+                continue
+            path.unlink()
+            removed += 1
+        except FileNotFoundError:
+            pass  # удалён другим процессом
+        total -= size
+    
+    return removed
+
+
+class DerivativeCache:
+    """LRU-кэш файлов с генерацией по требованию."""
+    
+    def __init__(self, directory: Path, max_bytes: int, sweep_interval: float):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        
+        self._pending: dict[str, asyncio.Task[Path]] = {}
+        self._sweeping: asyncio.Task | None = None
+        self._last_sweep = 0.0
+    
+    async def get(self, key: str, build: Callable[[Path], Awaitable[int]]) -> Path:
+        """
+        Путь к файлу кэша; при промахе файл создаётся через build(path).
+        
+        build записывает файл атомарно и возвращает его размер.
+        """
+        path = self.directory / key
+        
+        if await run_in_threadpool(_touch, path):
+            return path
+        
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.create_task(self._build(path, build))
+            self._pending[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        
+        # Отключившийся клиент не отменяет генерацию для остальных
+        return await asyncio.shield(task)
+    
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        self._pending.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # ошибка уже передана ожидающим, не логировать повторно
+    
+    async def _build(self, path: Path, build: Callable[[Path], Awaitable[int]]) -> Path:
+        await build(path)
+        self._schedule_sweep()
+        return path
+    
+    def _schedule_sweep(self) -> None:
+        """Запустить обход каталога в фоне, если прошёл интервал и обход не идёт."""
+        now = time.monotonic()
+        if self._sweeping is not None or now - self._last_sweep < self.sweep_interval:
+            return
+        
+        self._last_sweep = now
+        self._sweeping = asyncio.create_task(self._sweep())
+    
+    async def _sweep(self) -> None:
+        try:
+            removed = await run_in_threadpool(_sweep, self.directory, self.max_bytes)
+            if removed:
+                logger.info("Evicted %d cached derivatives", removed)
+        except Exception:
+            logger.exception("Derivative cache sweep failed")
+        finally:
+            self._sweeping = None
+
+
+# Глобальный кэш процесса (сам каталог общий для всех процессов)
+derivative_cache = DerivativeCache(
+    directory=Path(settings.media_dir) / "cache",
+    max_bytes=settings.media_cache_max_bytes,
+    sweep_interval=settings.media_cache_sweep_interval,
+)
@@ -0,0 +1,102 @@
+"""
+MinHash / LSH
+=============
+Сигнатуры MinHash для поиска почти-дубликатов текста.
+
+Сходство Жаккара двух множеств шинглов оценивается долей совпавших
+позиций сигнатур. LSH режет сигнатуру на полосы (bands): статьи,
+у которых совпала хотя бы одна полоса, становятся кандидатами.
+При 16 полосах по 8 строк порог срабатывания ≈ (1/16)^(1/8) ≈ 0.7.
+"""
+
+import hashlib
+import re
+import zlib
+
+import numpy as np
+
+
+NUM_PERM = 128
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+# Фиксированный seed: сигнатуры должны быть сравнимы между запусками
+_rng = np.random.RandomState(1)
+_A = _rng.randint(1, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.randint(0, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Ограничение размера промежуточной матрицы (NUM_PERM x chunk)
+_CHUNK = 8192
+
+
+def shingle_hashes(text: str, size: int = SHINGLE_SIZE) -> np.ndarray:
+    """
+    32-битные хеши словесных шинглов нормализованного текста.
+    
+    HTML-теги, регистр и пунктуация игнорируются,
+    поэтому переформатирование копии не меняет сигнатуру.
+    """
+    words = _WORD_RE.findall(_TAG_RE.sub(" ", text).lower())
+    if len(words) < size:
+        shingles = {" ".join(words)}
+    else:
+        shingles = {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+    
+    return np.fromiter(
+        (zlib.crc32(shingle.encode()) for shingle in shingles),
+        dtype=np.uint64,
+        count=len(shingles),
+    )
+
+
+def compute_signature(text: str) -> np.ndarray:
+    """
+    MinHash сигнатура текста (NUM_PERM значений uint32).
+    
+    CPU-bound: вызывать через run_in_executor.
+    """
+    hashes = shingle_hashes(text)
+    signature = np.full(NUM_PERM, _MAX_HASH, dtype=np.uint64)
+    
+    for start in range(0, len(hashes), _CHUNK):
+        chunk = hashes[start:start + _CHUNK]
+        permuted = (_A[:, None] * chunk[None, :] + _B[:, None]) % _MERSENNE_PRIME
+        np.minimum(signature, (permuted & _MAX_HASH).min(axis=1), out=signature)
+    
+    return signature.astype(np.uint32)
+
+
+def signature_to_bytes(signature: np.ndarray) -> bytes:
+    """Компактное хранение: NUM_PERM * 4 байта."""
+    return signature.astype("<u4").tobytes()
+
+
+def signature_from_bytes(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype="<u4")
+
+
+def band_hashes(signature: np.ndarray) -> list[int]:
+    """64-битные хеши полос LSH (signed, для BIGINT)."""
+    return [
+        int.from_bytes(
+            hashlib.blake2b(
+                signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].tobytes(),
+                digest_size=8,
+            ).digest(),
+            "big",
+            signed=True,
+        )
+        for band in range(BANDS)
+    ]
+
+
+def estimate_similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Оценка сходства Жаккара по двум сигнатурам."""
+    return float(np.mean(a == b))
@@ -0,0 +1,168 @@
+"""
+Content Rendering
+=================
+Рендеринг текста статьи при записи.
+
+Markdown (CommonMark + таблицы и зачёркивание) -> очищенный HTML,
+простой текст, анонс, количество слов, время чтения и оглавление.
+Результат сохраняется в колонках posts, чтение статьи ничего не парсит.
+
+При изменении правил рендеринга увеличьте RENDERER_VERSION и запустите
+перерендеринг: python -m app.jobs.render_posts
+"""
+
+import html
+import math
+import re
+from dataclasses import dataclass, field
+
+import nh3
+from markdown_it import MarkdownIt
+from markdown_it.token import Token
+from slugify import slugify
+
+
+# Версия правил рендеринга (posts.render_version)
+RENDERER_VERSION = 1
+
+WORDS_PER_MINUTE = 200
+
+# Уровни заголовков, попадающие в оглавление
+TOC_LEVELS = ("h2", "h3")
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+SPACE_RE = re.compile(r"\s+")
+BLANK_LINES_RE = re.compile(r"\n\s*\n")
+
+ALLOWED_TAGS = {
+    "a", "abbr", "b", "blockquote", "br", "code", "del", "em", "figcaption",
+    "figure", "h1", "h2", "h3", "h4", "h5", "h6", "hr", "i", "img", "kbd",
+    "li", "mark", "ol", "p", "pre", "s", "strong", "sub", "sup", "table",
+    "tbody", "td", "th", "thead", "tr", "u", "ul",
+}
+
+ALLOWED_ATTRIBUTES = {
+    "a": {"href", "title"},
+    "img": {"src", "alt", "title", "width", "height"},
+    "code": {"class"},
+    "h1": {"id"}, "h2": {"id"}, "h3": {"id"},
+    "h4": {"id"}, "h5": {"id"}, "h6": {"id"},
+}
+
+# Выравнивание ячеек таблиц из markdown
+_ALIGN_STYLES = {"text-align:left", "text-align:center", "text-align:right"}
+ALLOWED_ATTRIBUTE_VALUES = {
+    "td": {"style": _ALIGN_STYLES},
+    "th": {"style": _ALIGN_STYLES},
+}
+
+_markdown = MarkdownIt("commonmark", {"html": True}).enable(["table", "strikethrough"])
+
+
+@dataclass
+class RenderedContent:
+    """Результат рендеринга статьи."""
+    
+    html: str
+    text: str
+    word_count: int
+    reading_time: int  # минуты
+    toc: list[dict] = field(default_factory=list)  # [{"level", "id", "title"}]
+    
+    def excerpt(self, max_length: int = 200) -> str:
+        return make_excerpt(self.text, max_length)
+    
+    def columns(self) -> dict:
+        """Значения колонок posts."""
+        return {
+            "content_html": self.html,
+            "content_text": self.text,
+            "word_count": self.word_count,
+            "reading_time": self.reading_time,
+            "toc": self.toc,
+            "render_version": RENDERER_VERSION,
+        }
+
+
+def make_excerpt(text: str, max_length: int = 200) -> str:
+    """Анонс: начало текста, обрезанное по границе слова."""
+    clean = SPACE_RE.sub(" ", text).strip()
+    
+    if len(clean) <= max_length:
+        return clean
+    
+    return clean[:max_length].rsplit(" ", 1)[0] + "..."
+
+
+def _inline_text(token: Token) -> str:
+    parts = []
+    for child in token.children or []:
+        if child.type in ("text", "code_inline"):
+            parts.append(child.content)
+        elif child.type in ("softbreak", "hardbreak"):
+            parts.append(" ")
+        elif child.type == "image":
+            parts.append(_inline_text(child))
+    return "".join(parts)
+
+
+def _build_toc(tokens: list[Token]) -> list[dict]:
+    """
+    Оглавление по заголовкам.
+    
+    Заголовкам проставляется уникальный id (якорь оглавления).
+    """
+    toc: list[dict] = []
+    used_ids: set[str] = set()
+    
+    for index, token in enumerate(tokens):
+        if token.type == "heading_open":
+            title = _inline_text(tokens[index + 1])
+            anchor = base = slugify(title) or "section"
+            counter = 1
+            while anchor in used_ids:
+                anchor = f"{base}-{counter}"
+                counter += 1
+            used_ids.add(anchor)
+            token.attrSet("id", anchor)
+            
+            if token.tag in TOC_LEVELS:
+                toc.append({"level": int(token.tag[1]), "id": anchor, "title": title})
+    
+    return toc
+
+
+def render_content(content: str) -> RenderedContent:
+    """
+    Отрендерить текст статьи.
+    
+    Сырой HTML внутри markdown допускается, но проходит через
+    белый список тегов и атрибутов (nh3): скрипты, обработчики
+    событий и javascript:-ссылки удаляются.
+    """
+    env: dict = {}
+    tokens = _markdown.parse(content, env)
+    toc = _build_toc(tokens)
+    
+    rendered = _markdown.renderer.render(tokens, _markdown.options, env)
+    safe_html = nh3.clean(
+        rendered,
+        tags=ALLOWED_TAGS,
+        attributes=ALLOWED_ATTRIBUTES,
+        tag_attribute_values=ALLOWED_ATTRIBUTE_VALUES,
+        link_rel="noopener noreferrer nofollow",
+        url_schemes={"http", "https", "mailto"},
+    )
+    
+    # Блоки в HTML разделены переводами строк — текст сохраняет абзацы
+    text = html.unescape(nh3.clean(safe_html, tags=set()))
+    text = BLANK_LINES_RE.sub("\n", text).strip()
+    word_count = len(WORD_RE.findall(text))
+    
+    return RenderedContent(
+        html=safe_html,
+        text=text,
+        word_count=word_count,
+        reading_time=max(1, math.ceil(word_count / WORDS_PER_MINUTE)),
+        toc=toc,
+    )
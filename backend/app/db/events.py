@@ -0,0 +1,248 @@
+"""
+Event Buffer
+============
+Внутрипроцессный буфер событий с пакетной записью через COPY.
+
+Обработчики запросов вызывают event_buffer.record(...) — это
+O(1) добавление в deque без обращения к БД. Фоновая задача
+сбрасывает буфер через asyncpg copy_records_to_table каждые
+EVENT_BATCH_SIZE событий или EVENT_FLUSH_INTERVAL_MS миллисекунд.
+
+Память ограничена EVENT_BUFFER_MAX_SIZE:
+- record() при переполнении отбрасывает событие (счётчик dropped)
+- record_wait() ждёт освобождения места (backpressure для фоновых задач)
+- пока буфер не запущен (EVENTS_ENABLED=false), события не принимаются:
+  без фонового сброса они бы только копились и считались отброшенными
+
+Пачка, которую не удалось записать (ошибка БД или отмена посреди COPY),
+возвращается в начало буфера; stop() дожидается текущего сброса,
+а не отменяет его.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timezone
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.db.session import engine
+from app.models.event import EVENT_COLUMNS
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class EventBufferMetrics:
+    """Счётчики буфера (с момента запуска процесса)."""
+    
+    recorded: int = 0
+    dropped: int = 0
+    flushed: int = 0
+    flush_count: int = 0
+    flush_errors: int = 0
+    last_flush_ms: float = 0.0
+    buffered: int = 0
+    enabled: bool = False
+
+
+class EventBuffer:
+    """Ограниченный буфер событий с фоновой записью через COPY."""
+    
+    def __init__(
+        self,
+        max_size: int,
+        batch_size: int,
+        flush_interval_ms: int,
+    ):
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        
+        self._records: deque[tuple] = deque()
+        self._flush_requested = asyncio.Event()
+        self._space_available = asyncio.Event()
+        self._space_available.set()
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+        self._metrics = EventBufferMetrics()
+    
+    @property
+    def metrics(self) -> dict[str, Any]:
+        self._metrics.buffered = len(self._records)
+        self._metrics.enabled = self._task is not None
+        return asdict(self._metrics)
+    
+    def record(
+        self,
+        event_type: str,
+        post_id: UUID | None = None,
+        user_id: UUID | None = None,
+        data: dict[str, Any] | None = None,
+    ) -> bool:
+        """
+        Добавить событие без ожидания.
+        
+        Returns:
+            False если буфер не запущен или переполнен и событие отброшено
+        """
+        if self._task is None:
+            return False
+        
+        if len(self._records) >= self.max_size:
+            self._metrics.dropped += 1
+            self._space_available.clear()
+            return False
+        
+        self._records.append((
+            datetime.now(timezone.utc),
+            event_type,
+            post_id,
+            user_id,
+            json.dumps(data) if data is not None else None,
+        ))
+        self._metrics.recorded += 1
+        
+        if len(self._records) >= self.batch_size:
+            self._flush_requested.set()
+        
+        return True
+    
+    async def record_wait(
+        self,
+        event_type: str,
+        post_id: UUID | None = None,
+        user_id: UUID | None = None,
+        data: dict[str, Any] | None = None,
+    ) -> None:
+        """Добавить событие, дождавшись места в буфере (backpressure)."""
+        if self._task is None:
+            return
+        
+        while len(self._records) >= self.max_size:
+            self._space_available.clear()
+            self._flush_requested.set()
+            await self._space_available.wait()
+        
+        self.record(event_type, post_id, user_id, data)
+    
+    def start(self) -> None:
+        """Запустить фоновый сброс (вызывается в lifespan)."""
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run(), name="event-buffer")
+    
+    async def stop(self) -> None:
+        """Остановить фоновый сброс и записать остаток буфера."""
+        if self._task is not None:
+            # Без cancel: текущий COPY доводится до конца
+            self._stopping = True
+            self._flush_requested.set()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        
+        while self._records:
+            if not await self.flush():
+                break
+    
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(
+                    self._flush_requested.wait(), timeout=self.flush_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+            
+            self._flush_requested.clear()
+            while self._records:
+                if not await self.flush():
+                    # Ошибка БД: не крутимся в цикле, ждём следующего интервала
+                    break
+                if len(self._records) < self.batch_size:
+                    break
+    
+    async def flush(self) -> bool:
+        """
+        Записать до batch_size событий одним COPY.
+        
+        Returns:
+            True при успехе
+        """
+        records = self._records
+        batch = [records.popleft() for _ in range(min(self.batch_size, len(records)))]
+        self._space_available.set()
+        
+        if not batch:
+            return True
+        
+        started = time.perf_counter()
+        try:
+            async with engine.connect() as conn:
+                raw = await conn.get_raw_connection()
+                await raw.driver_connection.copy_records_to_table(
+                    "events",
+                    records=batch,
+                    columns=EVENT_COLUMNS,
+                )
+        except asyncio.CancelledError:
+            self._requeue(batch)
+            raise
+        except Exception:
+            self._metrics.flush_errors += 1
+            logger.exception("Failed to flush %d events", len(batch))
+            self._requeue(batch)
+            return False
+        
+        self._metrics.flushed += len(batch)
+        self._metrics.flush_count += 1
+        self._metrics.last_flush_ms = (time.perf_counter() - started) * 1000
+        return True
+    
+    def _requeue(self, batch: list[tuple]) -> None:
+        """Вернуть пачку в начало буфера, если есть место; иначе теряем."""
+        room = max(self.max_size - len(self._records), 0)
+        self._records.extendleft(reversed(batch[:room]))
+        self._metrics.dropped += len(batch) - min(room, len(batch))
+
+
+# Глобальный буфер процесса
+event_buffer = EventBuffer(
+    max_size=settings.event_buffer_max_size,
+    batch_size=settings.event_batch_size,
+    flush_interval_ms=settings.event_flush_interval_ms,
+)
+
+
+# === Секции таблицы events ===
+
+def _month_start(day: date, offset: int = 0) -> date:
+    month = day.month - 1 + offset
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+async def ensure_event_partitions(months_ahead: int = 2) -> None:
+    """
+    Создать месячные секции events на текущий и следующие месяцы
+    и секцию по умолчанию для событий вне диапазона.
+    """
+    today = datetime.now(timezone.utc).date()
+    
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS events_default PARTITION OF events DEFAULT"
+        ))
+        for offset in range(months_ahead + 1):
+            start = _month_start(today, offset)
+            end = _month_start(today, offset + 1)
+            await conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS events_y{start:%Y}m{start:%m} "
+                f"PARTITION OF events FOR VALUES FROM ('{start}') TO ('{end}')"
+            ))
@@ -4,8 +4,13 @@ Redis Client
 Асинхронный клиент Redis для кэширования и JWT blacklist.
 """
 
+import uuid
+from collections.abc import Iterable
+from datetime import date, datetime
+
 from redis import asyncio as aioredis
 from redis.asyncio import Redis
+from redis.exceptions import ResponseError
 
 from app.config import settings
 
@@ -60,6 +65,26 @@ async def is_blacklisted(token: str) -> bool:
     return result is not None
 
 
+async def revoke_user_tokens(user_id: str, revoked_at: float, ttl_seconds: int) -> None:
+    """
+    Отозвать все токены пользователя, выданные до revoked_at.
+    
+    Args:
+        user_id: ID пользователя
+        revoked_at: Unix timestamp отзыва
+        ttl_seconds: Время жизни записи (= время жизни refresh token)
+    """
+    redis = await get_redis()
+    await redis.setex(f"revoked:{user_id}", ttl_seconds, str(revoked_at))
+
+
+async def get_tokens_revoked_at(user_id: str) -> float | None:
+    """Время отзыва токенов пользователя (None — не отзывались)."""
+    redis = await get_redis()
+    result = await redis.get(f"revoked:{user_id}")
+    return float(result) if result is not None else None
+
+
 # === Кэширование постов ===
 
 async def cache_post(slug: str, data: str, ttl: int = 300) -> None:
@@ -80,6 +105,592 @@ async def invalidate_post_cache(slug: str) -> None:
     await redis.delete(f"post:{slug}")
 
 
+async def invalidate_post_caches(slugs: Iterable[str], chunk_size: int = 1000) -> None:
+    """Удалить из кэша много постов (UNLINK пачками, освобождение памяти — в фоне Redis)."""
+    keys = [f"post:{slug}" for slug in slugs]
+    if not keys:
+        return
+    
+    redis = await get_redis()
+    pipe = redis.pipeline(transaction=False)
+    for start in range(0, len(keys), chunk_size):
+        pipe.unlink(*keys[start:start + chunk_size])
+    await pipe.execute()
+
+
+# === Кэширование тегов ===
+
+TAGS_CACHE_KEY = "tags:all"
+
+
+async def cache_tags(data: str, ttl: int = 600) -> None:
+    """Кэшировать список тегов со счётчиками на 10 минут."""
+    redis = await get_redis()
+    await redis.setex(TAGS_CACHE_KEY, ttl, data)
+
+
+async def get_cached_tags() -> str | None:
+    """Получить список тегов со счётчиками из кэша."""
+    redis = await get_redis()
+    return await redis.get(TAGS_CACHE_KEY)
+
+
+async def invalidate_tags_cache() -> None:
+    """Сбросить кэш тегов (новый тег или изменились счётчики)."""
+    redis = await get_redis()
+    await redis.delete(TAGS_CACHE_KEY)
+
+
+# === Индексы постов по тегам ===
+# Для каждого тега храним sorted set: member = post_id, score = published_at.
+# Страница тега = ZREVRANGE + батчевый SELECT ... WHERE id IN (...).
+# Индекс создаётся только целиком (fill_tag_index), новые посты
+# добавляются лишь в существующие индексы: иначе холодный или
+# вытесненный индекс стал бы частичным и уже не перестраивался.
+
+# ZADD в те из KEYS, что существуют; ARGV — score и member для каждого ключа
+_TAG_INDEX_ADD = """
+local added = 0
+for i, key in ipairs(KEYS) do
+    if redis.call('EXISTS', key) == 1 then
+        redis.call('ZADD', key, ARGV[2 * i - 1], ARGV[2 * i])
+        added = added + 1
+    end
+end
+return added
+"""
+
+
+def _tag_index_key(tag_slug: str) -> str:
+    return f"tag_posts:{tag_slug}"
+
+
+async def index_post_tags(
+    post_id: str,
+    tag_slugs: Iterable[str],
+    published_ts: float,
+) -> None:
+    """Добавить опубликованный пост в уже построенные индексы его тегов."""
+    await index_posts_tags([(post_id, tag_slugs, published_ts)])
+
+
+async def unindex_post_tags(post_id: str, tag_slugs: Iterable[str]) -> None:
+    """Удалить пост из индексов тегов (снятие с публикации, смена тегов, удаление)."""
+    redis = await get_redis()
+    pipe = redis.pipeline(transaction=False)
+    for slug in tag_slugs:
+        pipe.zrem(_tag_index_key(slug), post_id)
+    await pipe.execute()
+
+
+async def index_posts_tags(entries: Iterable[tuple[str, Iterable[str], float]]) -> None:
+    """
+    Добавить много постов в индексы тегов одним pipeline: (post_id, теги, score).
+    
+    Непостроенные индексы пропускаются — их соберёт _rebuild_tag_index
+    при первом чтении тега, уже вместе с этими постами.
+    """
+    redis = await get_redis()
+    pipe = redis.pipeline(transaction=False)
+    for post_id, tag_slugs, published_ts in entries:
+        keys = [_tag_index_key(slug) for slug in tag_slugs]
+        if keys:
+            pipe.eval(_TAG_INDEX_ADD, len(keys), *keys, *[published_ts, post_id] * len(keys))
+    await pipe.execute()
+
+
+async def unindex_posts_tags(entries: Iterable[tuple[str, Iterable[str]]]) -> None:
+    """Удалить много постов из индексов тегов одним pipeline: (post_id, теги)."""
+    redis = await get_redis()
+    pipe = redis.pipeline(transaction=False)
+    for post_id, tag_slugs in entries:
+        for slug in tag_slugs:
+            pipe.zrem(_tag_index_key(slug), post_id)
+    await pipe.execute()
+
+
+async def get_missing_tag_indexes(tag_slugs: list[str]) -> list[str]:
+    """Вернуть теги, для которых индекс ещё не построен (или вытеснен LRU)."""
+    redis = await get_redis()
+    pipe = redis.pipeline(transaction=False)
+    for slug in tag_slugs:
+        pipe.exists(_tag_index_key(slug))
+    exists = await pipe.execute()
+    return [slug for slug, found in zip(tag_slugs, exists) if not found]
+
+
+async def fill_tag_index(tag_slug: str, entries: dict[str, float]) -> None:
+    """Заполнить индекс тега целиком (прогрев из БД)."""
+    if not entries:
+        return
+    redis = await get_redis()
+    await redis.zadd(_tag_index_key(tag_slug), entries)
+
+
+async def get_tag_post_ids(
+    tag_slugs: list[str],
+    offset: int,
+    limit: int,
+    match_all: bool = True,
+) -> tuple[list[str], int]:
+    """
+    Получить страницу ID постов по одному или нескольким тегам.
+    
+    Args:
+        tag_slugs: Slug'и тегов
+        offset: Смещение
+        limit: Размер страницы
+        match_all: True — пересечение (AND), False — объединение (OR)
+    
+    Returns:
+        (post_ids, total): ID постов от новых к старым и общее количество
+    """
+    redis = await get_redis()
+    
+    if len(tag_slugs) == 1:
+        key = _tag_index_key(tag_slugs[0])
+        pipe = redis.pipeline(transaction=False)
+        pipe.zrevrange(key, offset, offset + limit - 1)
+        pipe.zcard(key)
+        ids, total = await pipe.execute()
+        return ids, total
+    
+    # Пересечение/объединение во временный ключ атомарно в одной транзакции
+    slugs = sorted(set(tag_slugs))
+    op = "and" if match_all else "or"
+    tmp_key = f"tag_posts:tmp:{op}:{','.join(slugs)}"
+    keys = [_tag_index_key(slug) for slug in slugs]
+    
+    pipe = redis.pipeline(transaction=True)
+    if match_all:
+        pipe.zinterstore(tmp_key, keys, aggregate="MAX")
+    else:
+        pipe.zunionstore(tmp_key, keys, aggregate="MAX")
+    pipe.zrevrange(tmp_key, offset, offset + limit - 1)
+    pipe.delete(tmp_key)
+    total, ids, _ = await pipe.execute()
+    return ids, total
+
+
+# === Уникальные читатели (HyperLogLog) ===
+# uv:{post_id}             — за всё время
+# uv:{post_id}:{YYYYMMDD}  — за день (живёт UNIQUE_VIEWS_DAILY_TTL)
+# uv:dirty                 — "{post_id}:{YYYYMMDD}": посты и дни с новыми
+#                            просмотрами для фоновой записи в БД (день
+#                            нужен, чтобы дописать вчерашний итог после полуночи)
+
+UNIQUE_VIEWS_DAILY_TTL = 40 * 24 * 3600
+UNIQUE_VIEWS_DIRTY_KEY = "uv:dirty"
+
+
+def _unique_views_key(post_id: str, day: date | None = None) -> str:
+    if day is None:
+        return f"uv:{post_id}"
+    return f"uv:{post_id}:{day:%Y%m%d}"
+
+
+async def record_unique_view(post_id: str, viewer_key: str, day: date) -> None:
+    """Учесть читателя в HLL поста (за всё время и за день)."""
+    redis = await get_redis()
+    daily_key = _unique_views_key(post_id, day)
+    
+    pipe = redis.pipeline(transaction=False)
+    pipe.pfadd(_unique_views_key(post_id), viewer_key)
+    pipe.pfadd(daily_key, viewer_key)
+    pipe.expire(daily_key, UNIQUE_VIEWS_DAILY_TTL)
+    pipe.sadd(UNIQUE_VIEWS_DIRTY_KEY, f"{post_id}:{day:%Y%m%d}")
+    await pipe.execute()
+
+
+async def count_unique_views(post_id: str, days: list[date] | None = None) -> int:
+    """
+    Оценка числа уникальных читателей.
+    
+    Args:
+        post_id: ID поста
+        days: Дни для объединения (неделя, месяц); None — за всё время
+    """
+    redis = await get_redis()
+    
+    if days is None:
+        return await redis.pfcount(_unique_views_key(post_id))
+    
+    # PFCOUNT по нескольким ключам считает мощность объединения
+    return await redis.pfcount(*(_unique_views_key(post_id, day) for day in days))
+
+
+async def pop_dirty_unique_views(count: int) -> list[tuple[str, date]]:
+    """Забрать пачку (post_id, день) с новыми просмотрами."""
+    redis = await get_redis()
+    members = await redis.spop(UNIQUE_VIEWS_DIRTY_KEY, count) or []
+    
+    entries = []
+    for member in members:
+        post_id, _, day = member.partition(":")
+        entries.append((post_id, datetime.strptime(day, "%Y%m%d").date()))
+    return entries
+
+
+async def count_unique_views_batch(entries: list[tuple[str, date]]) -> list[tuple[int, int]]:
+    """(за всё время, за день) для пачки (post_id, день) одним pipeline."""
+    redis = await get_redis()
+    
+    pipe = redis.pipeline(transaction=False)
+    for post_id, day in entries:
+        pipe.pfcount(_unique_views_key(post_id))
+        pipe.pfcount(_unique_views_key(post_id, day))
+    counts = await pipe.execute()
+    
+    return list(zip(counts[0::2], counts[1::2]))
+
+
+# === Почасовые счётчики событий ===
+# stats:h:{YYYYMMDDHH} — hash "{post_id}:{metric}" -> count
+# stats:hours          — множество часов, ожидающих сброса в БД
+# stats:h:{YYYYMMDDHH}:flushing       — забранные счётчики до записи в БД
+# stats:h:{YYYYMMDDHH}:flushing:batch — id забранной пачки (отметка в stat_flush_batches)
+
+STATS_HOURS_KEY = "stats:hours"
+STATS_HOUR_TTL = 3 * 24 * 3600
+
+
+def _stats_hour_key(hour: str) -> str:
+    return f"stats:h:{hour}"
+
+
+async def record_stat_event(
+    post_id: str,
+    metric: str,
+    hour: str,
+    amount: int = 1,
+) -> None:
+    """
+    Увеличить счётчик события поста в часовом bucket.
+    
+    Args:
+        post_id: ID поста
+        metric: views / likes / comments
+        hour: Час в формате YYYYMMDDHH (UTC)
+        amount: Приращение (может быть отрицательным: снятие лайка)
+    """
+    redis = await get_redis()
+    key = _stats_hour_key(hour)
+    
+    pipe = redis.pipeline(transaction=False)
+    pipe.hincrby(key, f"{post_id}:{metric}", amount)
+    pipe.expire(key, STATS_HOUR_TTL)
+    pipe.sadd(STATS_HOURS_KEY, hour)
+    await pipe.execute()
+
+
+async def get_pending_stat_hours() -> list[str]:
+    """Часы, счётчики которых ещё не сброшены в БД."""
+    redis = await get_redis()
+    return sorted(await redis.smembers(STATS_HOURS_KEY))
+
+
+async def take_stat_hour(hour: str) -> tuple[str, dict[str, str]]:
+    """
+    Забрать счётчики часа для записи в БД.
+    
+    Hash переименовывается атомарно, поэтому запоздалые события
+    попадают в новый hash и будут забраны следующим запуском.
+    
+    Returns:
+        (id пачки, счётчики); остаток неудачного запуска возвращается
+        с прежним id, чтобы повторная запись распознала его
+    """
+    redis = await get_redis()
+    key = _stats_hour_key(hour)
+    flushing_key = f"{key}:flushing"
+    
+    # Остаток прошлого неудачного запуска забираем в первую очередь
+    if not await redis.exists(flushing_key):
+        try:
+            await redis.rename(key, flushing_key)
+        except ResponseError:
+            # Hash уже забран — час больше не ждёт сброса
+            await redis.srem(STATS_HOURS_KEY, hour)
+            return "", {}
+    
+    # До записи в БД пачка не помечена, так что новый id после сбоя здесь безопасен
+    batch_key = f"{flushing_key}:batch"
+    pipe = redis.pipeline(transaction=True)
+    pipe.set(batch_key, f"{hour}:{uuid.uuid4().hex}", nx=True, ex=STATS_HOUR_TTL)
+    pipe.get(batch_key)
+    pipe.hgetall(flushing_key)
+    _, batch_id, counters = await pipe.execute()
+    return batch_id, counters
+
+
+async def finish_stat_hour(hour: str) -> None:
+    """Удалить забранные счётчики после успешной записи в БД."""
+    redis = await get_redis()
+    key = _stats_hour_key(hour)
+    
+    pipe = redis.pipeline(transaction=True)
+    pipe.delete(f"{key}:flushing", f"{key}:flushing:batch")
+    pipe.srem(STATS_HOURS_KEY, hour)
+    await pipe.execute()
+    
+    # Запоздалые события успели создать новый hash — час снова ждёт сброса
+    if await redis.exists(key):
+        await redis.sadd(STATS_HOURS_KEY, hour)
+
+
+# === Черновики (автосохранение) ===
+# draft:{post_id} — hash: author_id, title, content, version, saved_version, saved_at
+# drafts:dirty    — zset post_id -> время первой несохранённой правки
+
+DRAFT_TTL = 24 * 3600
+DRAFTS_DIRTY_KEY = "drafts:dirty"
+
+# Создать черновик из БД, если его ещё нет
+_DRAFT_INIT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'author_id', ARGV[1], 'title', ARGV[2], 'content', ARGV[3],
+    'version', ARGV[4], 'saved_version', ARGV[4], 'saved_at', ARGV[5])
+redis.call('EXPIRE', KEYS[1], ARGV[6])
+return 1
+"""
+
+# Записать новую версию, если текущая совпадает с ожидаемой
+_DRAFT_SAVE = """
+local current = redis.call('HGET', KEYS[1], 'version')
+if not current then
+    return {0, -1}
+end
+if tonumber(current) ~= tonumber(ARGV[1]) then
+    return {0, tonumber(current)}
+end
+local version = tonumber(ARGV[1]) + 1
+redis.call('HSET', KEYS[1], 'title', ARGV[2], 'content', ARGV[3], 'version', version)
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+redis.call('ZADD', KEYS[2], 'NX', ARGV[4], ARGV[6])
+return {1, version}
+"""
+
+# Отметить версию сохранённой в БД; снять с очереди, если новее нет,
+# иначе отложить следующее сохранение на интервал
+_DRAFT_SAVED = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    redis.call('ZREM', KEYS[2], ARGV[3])
+    return 0
+end
+local saved = tonumber(redis.call('HGET', KEYS[1], 'saved_version') or '0')
+if tonumber(ARGV[1]) > saved then
+    redis.call('HSET', KEYS[1], 'saved_version', ARGV[1], 'saved_at', ARGV[2])
+end
+if tonumber(redis.call('HGET', KEYS[1], 'version')) <= tonumber(ARGV[1]) then
+    redis.call('ZREM', KEYS[2], ARGV[3])
+else
+    redis.call('ZADD', KEYS[2], 'XX', ARGV[2], ARGV[3])
+end
+return 1
+"""
+
+
+def _draft_key(post_id: str) -> str:
+    return f"draft:{post_id}"
+
+
+async def get_draft(post_id: str) -> dict[str, str]:
+    """Черновик поста ({} — нет в Redis)."""
+    redis = await get_redis()
+    return await redis.hgetall(_draft_key(post_id))
+
+
+async def init_draft(
+    post_id: str,
+    author_id: str,
+    title: str,
+    content: str,
+    version: int,
+    now: float,
+) -> None:
+    """Загрузить черновик из БД (если параллельный запрос не успел раньше)."""
+    redis = await get_redis()
+    await redis.eval(
+        _DRAFT_INIT, 1, _draft_key(post_id),
+        author_id, title, content, version, now, DRAFT_TTL,
+    )
+
+
+async def save_draft(
+    post_id: str,
+    expected_version: int,
+    title: str,
+    content: str,
+    now: float,
+) -> tuple[bool, int]:
+    """
+    Записать черновик с проверкой версии (optimistic concurrency).
+    
+    Returns:
+        (True, новая версия) или (False, текущая версия);
+        текущая версия -1 — черновика нет в Redis
+    """
+    redis = await get_redis()
+    saved, version = await redis.eval(
+        _DRAFT_SAVE, 2, _draft_key(post_id), DRAFTS_DIRTY_KEY,
+        expected_version, title, content, now, DRAFT_TTL, post_id,
+    )
+    return bool(saved), int(version)
+
+
+async def mark_draft_saved(post_id: str, version: int, now: float) -> None:
+    """Версия записана в БД."""
+    redis = await get_redis()
+    await redis.eval(
+        _DRAFT_SAVED, 2, _draft_key(post_id), DRAFTS_DIRTY_KEY,
+        version, now, post_id,
+    )
+
+
+async def get_dirty_drafts(older_than: float, count: int) -> list[str]:
+    """Черновики с несохранёнными правками старше older_than."""
+    redis = await get_redis()
+    return await redis.zrangebyscore(DRAFTS_DIRTY_KEY, "-inf", older_than, start=0, num=count)
+
+
+async def discard_draft(post_id: str) -> None:
+    """Удалить черновик (статья сохранена целиком через PUT)."""
+    redis = await get_redis()
+    
+    pipe = redis.pipeline(transaction=True)
+    pipe.delete(_draft_key(post_id))
+    pipe.zrem(DRAFTS_DIRTY_KEY, post_id)
+    await pipe.execute()
+
+
+async def discard_drafts(post_ids: list[str]) -> None:
+    """Удалить черновики многих постов (массовые действия администратора)."""
+    if not post_ids:
+        return
+    
+    redis = await get_redis()
+    pipe = redis.pipeline(transaction=False)
+    pipe.unlink(*(_draft_key(post_id) for post_id in post_ids))
+    pipe.zrem(DRAFTS_DIRTY_KEY, *post_ids)
+    await pipe.execute()
+
+
+# === Sitemap и ленты ===
+# Готовые XML-документы: hash {xml, etag, lastmod, ...}.
+# Шард sitemap — посты подряд по (published_at, id); sitemap:bounds
+# хранит score = published_at первого поста каждого закэшированного шарда,
+# по нему изменение поста сбрасывает только затронутые шарды.
+
+XML_CACHE_TTL = 24 * 3600
+SITEMAP_INDEX_KEY = "sitemap:index"
+SITEMAP_BOUNDS_KEY = "sitemap:bounds"
+FEED_KEYS_KEY = "feeds:keys"
+
+
+def _sitemap_shard_key(shard: int) -> str:
+    return f"sitemap:shard:{shard}"
+
+
+async def get_sitemap_shard(shard: int) -> dict[str, str]:
+    redis = await get_redis()
+    return await redis.hgetall(_sitemap_shard_key(shard))
+
+
+async def cache_sitemap_shard(shard: int, document: dict[str, str], first_ts: float) -> None:
+    redis = await get_redis()
+    pipe = redis.pipeline(transaction=True)
+    pipe.hset(_sitemap_shard_key(shard), mapping=document)
+    pipe.expire(_sitemap_shard_key(shard), XML_CACHE_TTL)
+    pipe.zadd(SITEMAP_BOUNDS_KEY, {str(shard): first_ts})
+    await pipe.execute()
+
+
+async def get_sitemap_index() -> dict[str, str]:
+    redis = await get_redis()
+    return await redis.hgetall(SITEMAP_INDEX_KEY)
+
+
+async def cache_sitemap_index(document: dict[str, str]) -> None:
+    redis = await get_redis()
+    pipe = redis.pipeline(transaction=True)
+    pipe.hset(SITEMAP_INDEX_KEY, mapping=document)
+    pipe.expire(SITEMAP_INDEX_KEY, XML_CACHE_TTL)
+    await pipe.execute()
+
+
+async def invalidate_sitemap(published_ts: float, shift: bool) -> None:
+    """
+    Сбросить шарды sitemap после изменения поста с этим published_at.
+    
+    shift=False — пост изменён на месте: сбрасывается его шард.
+    shift=True — пост появился или исчез: сдвигаются и все шарды после него.
+    """
+    redis = await get_redis()
+    
+    # Шард, содержащий пост (и предыдущий, если пост на границе)
+    candidates = await redis.zrevrangebyscore(
+        SITEMAP_BOUNDS_KEY, published_ts, "-inf", start=0, num=2, withscores=True
+    )
+    if candidates:
+        (shard, first_ts), *previous = candidates
+        shards = [shard]
+        if previous and first_ts == published_ts and int(previous[0][0]) == int(shard) - 1:
+            shards.append(previous[0][0])
+    else:
+        shards = await redis.zrange(SITEMAP_BOUNDS_KEY, 0, 0)
+    
+    if shift:
+        shards += await redis.zrangebyscore(SITEMAP_BOUNDS_KEY, f"({published_ts}", "+inf")
+    
+    pipe = redis.pipeline(transaction=True)
+    if shards:
+        pipe.unlink(*(_sitemap_shard_key(int(shard)) for shard in shards))
+        pipe.zrem(SITEMAP_BOUNDS_KEY, *shards)
+    pipe.unlink(SITEMAP_INDEX_KEY)
+    await pipe.execute()
+
+
+async def get_cached_feed(key: str) -> dict[str, str]:
+    redis = await get_redis()
+    return await redis.hgetall(f"feed:{key}")
+
+
+async def cache_feed(key: str, document: dict[str, str], ttl: int) -> None:
+    redis = await get_redis()
+    pipe = redis.pipeline(transaction=True)
+    pipe.hset(f"feed:{key}", mapping=document)
+    pipe.expire(f"feed:{key}", ttl)
+    pipe.sadd(FEED_KEYS_KEY, f"feed:{key}")
+    await pipe.execute()
+
+
+async def invalidate_feeds() -> None:
+    """Сбросить все закэшированные ленты (общую и по тегам)."""
+    redis = await get_redis()
+    keys = await redis.smembers(FEED_KEYS_KEY)
+    if not keys:
+        return
+    
+    pipe = redis.pipeline(transaction=True)
+    pipe.unlink(*keys)
+    pipe.srem(FEED_KEYS_KEY, *keys)
+    await pipe.execute()
+
+
+# === Блокировки фоновых задач ===
+
+async def acquire_lock(name: str, ttl_seconds: int) -> bool:
+    """
+    Захватить блокировку на ttl_seconds (SET NX EX).
+    Не снимается явно: истекает сама, чтобы задача выполнялась
+    не чаще раза за интервал на все воркеры.
+    """
+    redis = await get_redis()
+    return bool(await redis.set(f"lock:{name}", "1", nx=True, ex=ttl_seconds))
+
+
 # === Rate Limiting ===
 
 async def check_rate_limit(key: str, limit: int, window: int = 60) -> tuple[bool, int]:
@@ -0,0 +1,8 @@
+"""
+Jobs Package
+============
+Фоновые задачи, которые не должны выполняться в обработчиках запросов.
+
+Каждый модуль можно запустить как CLI:
+    python -m app.jobs.related_posts
+"""
@@ -0,0 +1,298 @@
+"""
+Account Jobs
+============
+Пачечная обработка контента заблокированных аккаунтов.
+
+Аккаунт уже заблокирован AccountService.start_job, здесь только
+удаляется / анонимизируется контент. Каждая пачка — отдельная
+короткая транзакция (вместе с обновлением прогресса), между
+пачками пауза. В часы пиковой нагрузки пачки меньше, а паузы
+длиннее, чтобы не держать блокировки строк posts/comments/likes.
+
+Запуск (подхватить незавершённые задачи):
+    python -m app.jobs.accounts
+"""
+
+import asyncio
+import logging
+import secrets
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from sqlalchemy import delete, func, or_, select, update
+
+from app.config import settings
+from app.core.security import hash_password
+from app.db.redis import (
+    invalidate_post_cache,
+    invalidate_tags_cache,
+    unindex_post_tags,
+)
+from app.db.session import async_session_maker
+from app.models.account_job import AccountJob, AccountJobMode, AccountJobStatus
+from app.models.comment import Comment
+from app.models.like import Like
+from app.models.post import Post, PostStatus
+from app.models.tag import Tag, post_tags
+from app.models.user import User
+from app.services.feed_service import invalidate_published_posts
+
+
+logger = logging.getLogger(__name__)
+
+ANONYMIZED_COMMENT = "[deleted]"
+
+
+def _throttle() -> tuple[int, float]:
+    """Размер пачки и пауза с учётом часов пиковой нагрузки (UTC)."""
+    start, end = settings.account_job_peak_hours
+    hour = datetime.now(timezone.utc).hour
+    peak = start <= hour < end if start <= end else hour >= start or hour < end
+    
+    if peak:
+        return settings.account_job_peak_batch_size, settings.account_job_peak_pause_ms / 1000
+    return settings.account_job_batch_size, settings.account_job_batch_pause_ms / 1000
+
+
+async def _claim(job_id: UUID) -> AccountJob | None:
+    """
+    Захватить задачу: ожидающую или зависшую (нет heartbeat дольше
+    ACCOUNT_JOB_STALE_AFTER). Атомарный UPDATE исключает двойной запуск.
+    """
+    stale = datetime.now(timezone.utc) - timedelta(seconds=settings.account_job_stale_after)
+    
+    async with async_session_maker() as db:
+        result = await db.execute(
+            update(AccountJob)
+            .where(
+                AccountJob.id == job_id,
+                or_(
+                    AccountJob.status == AccountJobStatus.PENDING,
+                    (AccountJob.status == AccountJobStatus.RUNNING)
+                    & (AccountJob.heartbeat_at < stale),
+                ),
+            )
+            .values(status=AccountJobStatus.RUNNING, heartbeat_at=func.now())
+            .returning(AccountJob)
+            .execution_options(synchronize_session=False)
+        )
+        job = result.scalar_one_or_none()
+        await db.commit()
+    
+    return job
+
+
+async def _run_batches(job_id: UUID, counter: str, build_statement, on_batch=None) -> int:
+    """
+    Выполнять statement пачками, пока он затрагивает строки.
+    
+    Прогресс и heartbeat задачи обновляются в той же транзакции.
+    """
+    processed = 0
+    
+    while True:
+        batch_size, pause = _throttle()
+        
+        async with async_session_maker() as db:
+            result = await db.execute(build_statement(batch_size))
+            rows = result.all()
+            
+            if rows:
+                await db.execute(
+                    update(AccountJob)
+                    .where(AccountJob.id == job_id)
+                    .values(
+                        {
+                            counter: getattr(AccountJob, counter) + len(rows),
+                            "heartbeat_at": func.now(),
+                        }
+                    )
+                )
+                if on_batch is not None:
+                    await on_batch(db, rows)
+            await db.commit()
+        
+        processed += len(rows)
+        if not rows:
+            return processed
+        
+        await asyncio.sleep(pause)
+
+
+# === Шаги ===
+
+async def _delete_likes(job_id: UUID, user_id: UUID) -> int:
+    def statement(limit: int):
+        batch = select(Like.id).where(Like.user_id == user_id).limit(limit)
+        return delete(Like).where(Like.id.in_(batch)).returning(Like.id)
+    
+    return await _run_batches(job_id, "likes_processed", statement)
+
+
+async def _delete_comments(job_id: UUID, user_id: UUID) -> int:
+    # Ответы других пользователей удаляет ON DELETE CASCADE по parent_id
+    def statement(limit: int):
+        batch = select(Comment.id).where(Comment.user_id == user_id).limit(limit)
+        return delete(Comment).where(Comment.id.in_(batch)).returning(Comment.id)
+    
+    return await _run_batches(job_id, "comments_processed", statement)
+
+
+async def _anonymize_comments(job_id: UUID, user_id: UUID) -> int:
+    def statement(limit: int):
+        batch = (
+            select(Comment.id)
+            .where(
+                Comment.user_id == user_id,
+                Comment.content != ANONYMIZED_COMMENT,
+            )
+            .limit(limit)
+        )
+        return (
+            update(Comment)
+            .where(Comment.id.in_(batch))
+            .values(content=ANONYMIZED_COMMENT)
+            .returning(Comment.id)
+        )
+    
+    return await _run_batches(job_id, "comments_processed", statement)
+
+
+async def _delete_posts(job_id: UUID, user_id: UUID) -> int:
+    """
+    Мягко удалить статьи пачками (строки удалит app.jobs.purge)
+    и сразу убрать их из кэша и индексов тегов.
+    """
+    def statement(limit: int):
+        batch = (
+            select(Post.id)
+            .where(Post.author_id == user_id, Post.deleted_at.is_(None))
+            .limit(limit)
+        )
+        return (
+            update(Post)
+            .where(Post.id.in_(batch))
+            .values(deleted_at=func.now())
+            .returning(Post.id, Post.slug, Post.status, Post.published_at)
+        )
+    
+    async def on_batch(db, rows) -> None:
+        result = await db.execute(
+            select(post_tags.c.post_id, Tag.slug)
+            .join(Tag, Tag.id == post_tags.c.tag_id)
+            .where(post_tags.c.post_id.in_([row.id for row in rows]))
+        )
+        tag_slugs: dict[UUID, list[str]] = {}
+        for post_id, slug in result:
+            tag_slugs.setdefault(post_id, []).append(slug)
+        
+        for row in rows:
+            await invalidate_post_cache(row.slug)
+            if row.id in tag_slugs:
+                await unindex_post_tags(str(row.id), tag_slugs[row.id])
+        
+        published = [
+            row.published_at for row in rows
+            if row.status == PostStatus.PUBLISHED and row.published_at
+        ]
+        if published:
+            await invalidate_tags_cache()
+            await invalidate_published_posts(min(published).timestamp(), shift=True)
+    
+    return await _run_batches(job_id, "posts_processed", statement, on_batch)
+
+
+async def _anonymize_user(user_id: UUID) -> None:
+    """Убрать персональные данные, оставив строку пользователя для статей."""
+    placeholder = f"deleted-{user_id.hex}"
+    # bcrypt — CPU-работа, вне event loop
+    loop = asyncio.get_running_loop()
+    password_hash = await loop.run_in_executor(
+        None, hash_password, secrets.token_urlsafe(32)
+    )
+    
+    async with async_session_maker() as db:
+        await db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(
+                email=f"{placeholder}@deleted.invalid",
+                username=placeholder,
+                password_hash=password_hash,
+                avatar_url=None,
+                bio=None,
+                verification_token=None,
+            )
+        )
+        await db.commit()
+
+
+# === Задачи ===
+
+async def run_account_job(job_id: UUID) -> None:
+    """Выполнить задачу обработки аккаунта (если её ещё никто не выполняет)."""
+    job = await _claim(job_id)
+    if job is None:
+        return
+    
+    user_id = job.user_id
+    
+    try:
+        if user_id is not None and job.mode != AccountJobMode.DEACTIVATE:
+            await _delete_likes(job_id, user_id)
+            
+            if job.mode == AccountJobMode.DELETE:
+                await _delete_comments(job_id, user_id)
+                await _delete_posts(job_id, user_id)
+            else:
+                await _anonymize_comments(job_id, user_id)
+                await _anonymize_user(user_id)
+    except Exception as exc:
+        logger.exception("Account job %s failed", job_id)
+        status, error = AccountJobStatus.FAILED, str(exc)
+    else:
+        status, error = AccountJobStatus.COMPLETED, None
+    
+    async with async_session_maker() as db:
+        await db.execute(
+            update(AccountJob)
+            .where(AccountJob.id == job_id)
+            .values(status=status, error=error, finished_at=func.now())
+        )
+        await db.commit()
+    
+    logger.info("Account job %s (%s) %s", job_id, job.mode.value, status.value)
+
+
+async def resume_account_jobs() -> int:
+    """
+    Подхватить ожидающие и зависшие задачи (после рестарта воркера).
+    
+    Returns:
+        Количество запущенных задач
+    """
+    stale = datetime.now(timezone.utc) - timedelta(seconds=settings.account_job_stale_after)
+    
+    async with async_session_maker() as db:
+        result = await db.execute(
+            select(AccountJob.id)
+            .where(
+                or_(
+                    AccountJob.status == AccountJobStatus.PENDING,
+                    (AccountJob.status == AccountJobStatus.RUNNING)
+                    & (AccountJob.heartbeat_at < stale),
+                )
+            )
+            .order_by(AccountJob.created_at)
+        )
+        job_ids = list(result.scalars().all())
+    
+    for job_id in job_ids:
+        await run_account_job(job_id)
+    
+    return len(job_ids)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(resume_account_jobs())
@@ -0,0 +1,263 @@
+"""
+Analytics Compactor Job
+=======================
+Сброс и свёртка статистики постов.
+
+1. Почасовые счётчики из Redis -> post_stats_hourly
+2. Часы старше ANALYTICS_HOURLY_RETENTION_DAYS -> post_stats_daily
+3. Дни старше ANALYTICS_DAILY_RETENTION_DAYS -> post_stats_monthly
+
+Сброс идемпотентен: id забранной из Redis пачки записывается
+в stat_flush_batches в той же транзакции, что и счётчики, и пачка,
+повторённая после сбоя до её удаления из Redis, пропускается.
+
+Свёртка — один оператор на уровень:
+    WITH moved AS (DELETE ... RETURNING ...) INSERT ... SELECT ... GROUP BY
+поэтому строки не бывают посчитаны дважды или потеряны.
+
+Запуск:
+    python -m app.jobs.analytics            # сброс и свёртка
+    python -m app.jobs.analytics --backfill # начальное заполнение из likes/comments
+"""
+
+import asyncio
+import logging
+import sys
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from uuid import UUID, uuid4
+
+from sqlalchemy import (
+    Date,
+    DateTime,
+    Integer,
+    cast,
+    column,
+    delete,
+    func,
+    literal,
+    literal_column,
+    select,
+    values,
+)
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db.redis import (
+    STATS_HOUR_TTL,
+    finish_stat_hour,
+    get_pending_stat_hours,
+    take_stat_hour,
+)
+from app.db.session import async_session_maker
+from app.models.analytics import (
+    PostStatsDaily,
+    PostStatsHourly,
+    PostStatsMonthly,
+    StatFlushBatch,
+)
+from app.models.comment import Comment
+from app.models.like import Like
+from app.models.post import Post
+
+
+logger = logging.getLogger(__name__)
+
+METRICS = ("views", "likes", "comments")
+
+
+def _trunc(unit: str, value) -> object:
+    """date_trunc с литералом единицы: одинаковое выражение в SELECT и GROUP BY."""
+    return cast(func.date_trunc(literal_column(f"'{unit}'"), value), Date)
+
+
+def _increment_on_conflict(stmt, constraint: str, table) -> object:
+    """ON CONFLICT: прибавить счётчики к существующему bucket."""
+    return stmt.on_conflict_do_update(
+        constraint=constraint,
+        set_={
+            metric: getattr(table, metric) + getattr(stmt.excluded, metric)
+            for metric in METRICS
+        } | {"updated_at": func.now()},
+    )
+
+
+async def _flush_hour(db: AsyncSession, hour: str, counters: dict[str, str]) -> int:
+    """Записать счётчики одного часа (автор подставляется join'ом с posts)."""
+    per_post: dict[str, dict[str, int]] = defaultdict(lambda: dict.fromkeys(METRICS, 0))
+    for field, value in counters.items():
+        post_id, metric = field.rsplit(":", 1)
+        if metric in METRICS:
+            per_post[post_id][metric] += int(value)
+    
+    if not per_post:
+        return 0
+    
+    rows = values(
+        column("post_id", PG_UUID(as_uuid=True)),
+        *(column(metric, Integer) for metric in METRICS),
+        name="counters",
+    ).data([
+        (UUID(post_id), *(counts[metric] for metric in METRICS))
+        for post_id, counts in per_post.items()
+    ])
+    
+    bucket = datetime.strptime(hour, "%Y%m%d%H").replace(tzinfo=timezone.utc)
+    
+    stmt = insert(PostStatsHourly).from_select(
+        ["id", "post_id", "author_id", "bucket", *METRICS],
+        select(
+            func.gen_random_uuid(),
+            Post.id,
+            Post.author_id,
+            literal(bucket, DateTime(timezone=True)),
+            *(getattr(rows.c, metric) for metric in METRICS),
+        ).join(rows, rows.c.post_id == Post.id),
+    )
+    await db.execute(_increment_on_conflict(stmt, "uq_post_stats_hourly", PostStatsHourly))
+    
+    return len(per_post)
+
+
+async def flush_hourly_counters() -> int:
+    """
+    Сбросить почасовые счётчики из Redis в post_stats_hourly.
+    
+    Returns:
+        Количество записанных строк (пост x час)
+    """
+    written = 0
+    
+    for hour in await get_pending_stat_hours():
+        batch_id, counters = await take_stat_hour(hour)
+        if not batch_id:
+            continue
+        
+        async with async_session_maker() as db:
+            result = await db.execute(
+                insert(StatFlushBatch)
+                .values(id=uuid4(), batch_id=batch_id)
+                .on_conflict_do_nothing(index_elements=["batch_id"])
+                .returning(StatFlushBatch.id)
+            )
+            if result.scalar_one_or_none() is not None:
+                written += await _flush_hour(db, hour, counters)
+            else:
+                logger.info("Stats batch %s already flushed, skipping", batch_id)
+            await db.commit()
+        
+        await finish_stat_hour(hour)
+    
+    return written
+
+
+async def _rollup(
+    db: AsyncSession,
+    source,
+    target,
+    constraint: str,
+    cutoff: date | datetime,
+    unit: str,
+) -> None:
+    """Перенести строки source старше cutoff в target, сгруппировав по unit."""
+    moved = (
+        delete(source)
+        .where(source.bucket < cutoff)
+        .returning(
+            source.post_id,
+            source.author_id,
+            source.bucket,
+            *(getattr(source, metric) for metric in METRICS),
+        )
+        .cte("moved")
+    )
+    
+    bucket = _trunc(unit, moved.c.bucket)
+    stmt = (
+        insert(target)
+        .from_select(
+            ["id", "post_id", "author_id", "bucket", *METRICS],
+            select(
+                func.gen_random_uuid(),
+                moved.c.post_id,
+                moved.c.author_id,
+                bucket,
+                *(func.sum(getattr(moved.c, metric)) for metric in METRICS),
+            ).group_by(moved.c.post_id, moved.c.author_id, bucket),
+        )
+        .add_cte(moved)
+    )
+    await db.execute(_increment_on_conflict(stmt, constraint, target))
+
+
+async def compact_stats() -> int:
+    """
+    Полный цикл компактора: сброс из Redis и свёртка уровней.
+    
+    Returns:
+        Количество записанных почасовых строк
+    """
+    written = await flush_hourly_counters()
+    
+    now = datetime.now(timezone.utc)
+    hourly_cutoff = (now - timedelta(days=settings.analytics_hourly_retention_days)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    daily_cutoff = (now.date() - timedelta(days=settings.analytics_daily_retention_days)).replace(day=1)
+    
+    async with async_session_maker() as db:
+        # Пачки старше срока жизни в Redis повториться уже не могут
+        await db.execute(
+            delete(StatFlushBatch)
+            .where(StatFlushBatch.created_at < now - timedelta(seconds=2 * STATS_HOUR_TTL))
+        )
+        await _rollup(
+            db, PostStatsHourly, PostStatsDaily, "uq_post_stats_daily", hourly_cutoff, "day"
+        )
+        await _rollup(
+            db, PostStatsDaily, PostStatsMonthly, "uq_post_stats_monthly", daily_cutoff, "month"
+        )
+        await db.commit()
+    
+    logger.info("Analytics compacted: %d hourly rows flushed", written)
+    return written
+
+
+async def backfill_stats() -> None:
+    """
+    Начальное заполнение post_stats_daily из существующих likes и comments.
+    
+    Запускается один раз при включении аналитики; просмотры
+    до этого момента доступны только как posts.view_count.
+    """
+    async with async_session_maker() as db:
+        for model, metric in ((Like, "likes"), (Comment, "comments")):
+            day = _trunc("day", model.created_at)
+            counts = {m: literal(0) for m in METRICS} | {metric: func.count()}
+            stmt = insert(PostStatsDaily).from_select(
+                ["id", "post_id", "author_id", "bucket", *METRICS],
+                select(
+                    func.gen_random_uuid(),
+                    Post.id,
+                    Post.author_id,
+                    day,
+                    *(counts[m] for m in METRICS),
+                )
+                .join(Post, Post.id == model.post_id)
+                .group_by(Post.id, Post.author_id, day),
+            )
+            await db.execute(_increment_on_conflict(stmt, "uq_post_stats_daily", PostStatsDaily))
+        
+        await db.commit()
+    
+    # Старые дни сразу сворачиваются в месяцы
+    await compact_stats()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    if "--backfill" in sys.argv:
+        asyncio.run(backfill_stats())
+    else:
+        asyncio.run(compact_stats())
@@ -0,0 +1,208 @@
+"""
+Weekly Digest Job
+=================
+Еженедельная рассылка новых статей подтверждённым пользователям.
+
+- Список статей рендерится один раз за запуск (общий фрагмент),
+  на каждого получателя — только обёртка с именем
+- Получатели читаются пачками по ключу (users.id > last_user_id),
+  без OFFSET и без загрузки всех пользователей в память
+- Письма уходят через общий пул постоянных SMTP-соединений
+- После каждой пачки сохраняется контрольная точка (digest_runs),
+  упавшая рассылка продолжается с места остановки
+
+Запуск:
+    python -m app.jobs.digest
+"""
+
+import asyncio
+import logging
+from datetime import datetime, time, timedelta, timezone
+from uuid import UUID
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from app.config import settings
+from app.core.mailer import mailer
+from app.db.session import async_session_maker
+from app.models.digest import DigestRun, DigestRunStatus
+from app.models.post import Post, PostStatus
+from app.models.user import User
+from app.services.email_service import build_message, render_email, render_fragment
+
+
+logger = logging.getLogger(__name__)
+
+
+def _previous_week(now: datetime) -> tuple[str, datetime, datetime]:
+    """(ISO неделя, начало, конец) прошлой недели, понедельник 00:00 UTC."""
+    monday = datetime.combine(
+        now.date() - timedelta(days=now.weekday()), time.min, tzinfo=timezone.utc
+    )
+    start = monday - timedelta(days=7)
+    year, week, _ = start.isocalendar()
+    return f"{year}-W{week:02d}", start, monday
+
+
+async def _claim_run(period: str, start: datetime, end: datetime) -> DigestRun | None:
+    """
+    Создать или захватить рассылку за период.
+    
+    None — рассылка завершена или её сейчас выполняет другой воркер.
+    """
+    stale = datetime.now(timezone.utc) - timedelta(seconds=settings.digest_stale_after)
+    
+    async with async_session_maker() as db:
+        await db.execute(
+            insert(DigestRun)
+            .values(period=period, period_start=start, period_end=end)
+            .on_conflict_do_nothing(index_elements=["period"])
+        )
+        result = await db.execute(
+            update(DigestRun)
+            .where(
+                DigestRun.period == period,
+                DigestRun.status == DigestRunStatus.RUNNING,
+                or_(DigestRun.heartbeat_at.is_(None), DigestRun.heartbeat_at < stale),
+            )
+            .values(heartbeat_at=func.now())
+            .returning(DigestRun)
+            .execution_options(synchronize_session=False)
+        )
+        run = result.scalar_one_or_none()
+        await db.commit()
+    
+    return run
+
+
+async def _load_posts(start: datetime, end: datetime) -> list[dict]:
+    """Самые читаемые статьи периода."""
+    async with async_session_maker() as db:
+        result = await db.execute(
+            select(
+                Post.title,
+                Post.slug,
+                Post.excerpt,
+                Post.published_at,
+                User.username.label("author"),
+            )
+            .join(User, User.id == Post.author_id)
+            .where(
+                Post.status == PostStatus.PUBLISHED,
+                Post.deleted_at.is_(None),
+                Post.published_at >= start,
+                Post.published_at < end,
+            )
+            .order_by(Post.view_count.desc(), Post.published_at.desc())
+            .limit(settings.digest_max_posts)
+        )
+        return [row._asdict() for row in result]
+
+
+async def _send(email: str, context: dict) -> bool:
+    try:
+        await mailer.send(build_message(email, render_email("digest", context)))
+    except Exception:
+        logger.warning("Digest to %s failed", email, exc_info=True)
+        return False
+    return True
+
+
+async def send_weekly_digest(now: datetime | None = None, force: bool = False) -> int:
+    """
+    Разослать дайджест за прошлую неделю.
+    
+    Запускается планировщиком каждые DIGEST_CHECK_INTERVAL секунд,
+    за каждую неделю рассылка выполняется один раз.
+    
+    Returns:
+        Количество отправленных в этом запуске писем
+    """
+    if not settings.email_enabled:
+        return 0
+    
+    now = now or datetime.now(timezone.utc)
+    period, start, end = _previous_week(now)
+    
+    # До DIGEST_SEND_HOUR понедельника рассылку не начинаем;
+    # позже в течение недели — догоняем пропущенную или упавшую
+    if not force and now < end + timedelta(hours=settings.digest_send_hour):
+        return 0
+    
+    run = await _claim_run(period, start, end)
+    if run is None:
+        return 0
+    
+    posts = await _load_posts(start, end)
+    
+    # Общий для всех писем фрагмент со статьями
+    posts_html, posts_text = render_fragment("digest_posts", {"posts": posts})
+    base_context = {
+        "period_start": start,
+        "period_last_day": end - timedelta(days=1),
+        "posts_html": posts_html,
+        "posts_text": posts_text,
+    }
+    
+    sent = 0
+    last_user_id: UUID | None = run.last_user_id
+    
+    while posts:
+        async with async_session_maker() as db:
+            query = (
+                select(User.id, User.email, User.username)
+                .where(
+                    User.is_verified.is_(True),
+                    User.is_active.is_(True),
+                    User.deleted_at.is_(None),
+                )
+                .order_by(User.id)
+                .limit(settings.digest_batch_size)
+            )
+            if last_user_id is not None:
+                query = query.where(User.id > last_user_id)
+            
+            recipients = (await db.execute(query)).all()
+        
+        if not recipients:
+            break
+        
+        # Параллельность ограничена размером пула SMTP-соединений
+        results = await asyncio.gather(*(
+            _send(email, {**base_context, "username": username})
+            for _, email, username in recipients
+        ))
+        ok = sum(results)
+        sent += ok
+        last_user_id = recipients[-1].id
+        
+        # Контрольная точка
+        async with async_session_maker() as db:
+            await db.execute(
+                update(DigestRun)
+                .where(DigestRun.id == run.id)
+                .values(
+                    last_user_id=last_user_id,
+                    sent_count=DigestRun.sent_count + ok,
+                    failed_count=DigestRun.failed_count + len(results) - ok,
+                    heartbeat_at=func.now(),
+                )
+            )
+            await db.commit()
+    
+    async with async_session_maker() as db:
+        await db.execute(
+            update(DigestRun)
+            .where(DigestRun.id == run.id)
+            .values(status=DigestRunStatus.COMPLETED, finished_at=func.now())
+        )
+        await db.commit()
+    
+    logger.info("Digest %s: %d posts, %d emails sent", period, len(posts), sent)
+    return sent
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(send_weekly_digest(force=True))
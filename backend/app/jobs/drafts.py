@@ -0,0 +1,121 @@
+"""
+Drafts Persist Job
+==================
+Запись черновиков автосохранения из Redis в Postgres.
+
+Черновик записывается, если его первая несохранённая правка старше
+DRAFT_PERSIST_INTERVAL секунд: частые автосохранения схлопываются
+в одну запись за интервал.
+
+Запуск:
+    python -m app.jobs.drafts
+"""
+
+import asyncio
+import logging
+import time
+from uuid import UUID
+
+from sqlalchemy import select, update
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.core.render import render_content
+from app.db.redis import discard_draft, get_dirty_drafts, get_draft, mark_draft_saved
+from app.db.session import async_session_maker
+from app.models.post import Post, PostStatus
+
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 100
+
+
+def _fields(draft: dict[str, str]) -> tuple[str | None, ...]:
+    return draft.get("version"), draft.get("title"), draft.get("content")
+
+
+async def persist_draft(post_id: str) -> bool:
+    """
+    Записать черновик в БД одним UPDATE.
+    
+    Версия в БД только растёт: запоздалая запись старой версии
+    ничего не меняет. Статья опубликована, удалена или сохранена
+    через PUT -> черновик отбрасывается.
+    
+    Версия черновика не упорядочена с версией PUT, поэтому перед
+    записью черновик перечитывается под блокировкой строки: PUT
+    отбрасывает черновик, держа ту же блокировку, и после неё
+    черновик либо прежний, либо уже удалён или заменён.
+    """
+    draft = await get_draft(post_id)
+    if not draft:
+        await discard_draft(post_id)
+        return False
+    
+    version = int(draft["version"])
+    rendered = await run_in_threadpool(render_content, draft["content"])
+    
+    async with async_session_maker() as db:
+        await db.execute(
+            select(Post.id).where(Post.id == UUID(post_id)).with_for_update()
+        )
+        current = await get_draft(post_id)
+        if _fields(current) != _fields(draft):
+            # PUT или новое автосохранение успели раньше: актуальный
+            # черновик (если он есть) запишется следующим проходом
+            await db.rollback()
+            return False
+        
+        result = await db.execute(
+            update(Post)
+            .where(
+                Post.id == UUID(post_id),
+                Post.status == PostStatus.DRAFT,
+                Post.deleted_at.is_(None),
+                Post.content_version < version,
+            )
+            .values(
+                title=draft["title"],
+                content=draft["content"],
+                content_version=version,
+                **rendered.columns(),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+    
+    if result.rowcount == 0 and int(draft["saved_version"]) < version:
+        await discard_draft(post_id)
+        return False
+    
+    await mark_draft_saved(post_id, version, time.time())
+    return True
+
+
+async def persist_drafts(batch_size: int = BATCH_SIZE) -> int:
+    """
+    Записать черновики с правками старше DRAFT_PERSIST_INTERVAL.
+    
+    Returns:
+        Количество записанных черновиков
+    """
+    cutoff = time.time() - settings.draft_persist_interval
+    persisted = 0
+    
+    while post_ids := await get_dirty_drafts(cutoff, batch_size):
+        for post_id in post_ids:
+            try:
+                persisted += await persist_draft(post_id)
+            except Exception:
+                logger.exception("Failed to persist draft %s", post_id)
+                return persisted
+    
+    if persisted:
+        logger.info("Persisted %d drafts", persisted)
+    return persisted
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(persist_drafts())
@@ -0,0 +1,71 @@
+"""
+Fingerprints Backfill Job
+=========================
+Расчёт MinHash сигнатур для статей, созданных до появления
+поиска почти-дубликатов.
+
+Запуск:
+    python -m app.jobs.fingerprints
+"""
+
+import asyncio
+import logging
+
+from sqlalchemy import select
+
+from app.db.session import async_session_maker
+from app.models.post import Post
+from app.models.post_fingerprint import PostFingerprint
+from app.services.duplicate_service import DuplicateService
+
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 200
+
+
+async def backfill_fingerprints(batch_size: int = BATCH_SIZE) -> int:
+    """
+    Посчитать сигнатуры статей без fingerprint.
+    
+    Статьи обрабатываются по возрастанию created_at, поэтому более поздняя
+    копия помечается дубликатом более ранней статьи, а не наоборот.
+    
+    Returns:
+        Количество обработанных статей
+    """
+    processed = 0
+    
+    while True:
+        async with async_session_maker() as db:
+            result = await db.execute(
+                select(Post.id, Post.content)
+                .outerjoin(PostFingerprint, PostFingerprint.post_id == Post.id)
+                .where(PostFingerprint.id.is_(None))
+                .order_by(Post.created_at)
+                .limit(batch_size)
+            )
+            batch = result.all()
+            if not batch:
+                break
+            
+            service = DuplicateService(db)
+            for post_id, content in batch:
+                signature, duplicates = await service.find_duplicates(
+                    content, exclude_post_id=post_id
+                )
+                await service.save_fingerprint(post_id, signature, duplicates)
+                # Следующие статьи батча должны видеть уже сохранённые полосы
+                await db.flush()
+            
+            await db.commit()
+        
+        processed += len(batch)
+        logger.info("Fingerprinted %d posts", processed)
+    
+    return processed
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(backfill_fingerprints())
@@ -0,0 +1,507 @@
+"""
+Post Transfer
+=============
+Перенос статей: экспорт и импорт NDJSON (одна статья — одна строка).
+
+Экспорт — один запрос с курсором на сервере: строки читаются
+пачками по EXPORT_CHUNK_SIZE и сразу отдаются, память не растёт
+с числом статей. Теги, автор и счётчики собираются в том же запросе.
+
+Импорт — пачками по IMPORT_BATCH_SIZE строк, каждая в своей транзакции:
+1. строки проверяются (PostImportRecord) и рендерятся в потоке
+2. пачка пишется COPY во временные таблицы (ON COMMIT DROP)
+3. недостающие теги — одним INSERT ... SELECT ... ON CONFLICT DO NOTHING
+4. статьи и их теги — одним запросом: занятые slug получают суффикс
+   -N (как _generate_unique_slug) сразу для всей пачки с учётом slug
+   самой пачки, статьи с уже существующим (или повторённым) id
+   пропускаются
+После commit обновляются индексы тегов и кэши. Почти-дубликаты
+и история правок для импортированных статей не считаются.
+
+Запуск:
+    python -m app.jobs.post_transfer export [--status published] > posts.ndjson
+    python -m app.jobs.post_transfer import posts.ndjson --author admin
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import uuid
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from uuid import UUID
+
+from pydantic import ValidationError
+from slugify import slugify
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.core.render import RENDERER_VERSION, render_content
+from app.db.redis import index_posts_tags, invalidate_tags_cache
+from app.db.session import async_session_maker
+from app.jobs.tasks import rebuild_related_posts_index
+from app.models.comment import Comment
+from app.models.like import Like
+from app.models.post import Post, PostStatus
+from app.models.tag import Tag, post_tags
+from app.models.user import User
+from app.schemas.post import PostImportRecord, PostImportResponse
+from app.services.feed_service import invalidate_published_posts
+
+
+logger = logging.getLogger(__name__)
+
+EXPORT_CHUNK_SIZE = 500
+IMPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+
+
+# === Экспорт ===
+
+def _export_query(status: PostStatus | None):
+    tags = (
+        select(func.coalesce(func.array_agg(Tag.name), text("'{}'")))
+        .join(post_tags, post_tags.c.tag_id == Tag.id)
+        .where(post_tags.c.post_id == Post.id)
+        .scalar_subquery()
+    )
+    likes = select(func.count()).where(Like.post_id == Post.id).scalar_subquery()
+    comments = select(func.count()).where(Comment.post_id == Post.id).scalar_subquery()
+    
+    query = (
+        select(
+            Post.id,
+            Post.title,
+            Post.slug,
+            Post.content,
+            Post.excerpt,
+            Post.cover_image,
+            Post.status,
+            Post.published_at,
+            Post.publish_at,
+            Post.created_at,
+            Post.updated_at,
+            Post.meta_title,
+            Post.meta_description,
+            Post.view_count,
+            Post.unique_view_count,
+            User.username.label("author"),
+            tags.label("tags"),
+            likes.label("likes_count"),
+            comments.label("comments_count"),
+        )
+        .join(User, User.id == Post.author_id)
+        .where(Post.deleted_at.is_(None))
+        .order_by(Post.created_at, Post.id)
+        .execution_options(yield_per=EXPORT_CHUNK_SIZE)
+    )
+    if status is not None:
+        query = query.where(Post.status == status)
+    return query
+
+
+def _isoformat(value: datetime | None) -> str | None:
+    return value.isoformat() if value else None
+
+
+def _export_line(row) -> bytes:
+    record = {
+        "id": str(row.id),
+        "title": row.title,
+        "slug": row.slug,
+        "content": row.content,
+        "excerpt": row.excerpt,
+        "cover_image": row.cover_image,
+        "status": row.status.value,
+        "published_at": _isoformat(row.published_at),
+        "publish_at": _isoformat(row.publish_at),
+        "created_at": _isoformat(row.created_at),
+        "updated_at": _isoformat(row.updated_at),
+        "meta_title": row.meta_title,
+        "meta_description": row.meta_description,
+        "author": row.author,
+        "tags": sorted(row.tags),
+        "view_count": row.view_count,
+        "unique_view_count": row.unique_view_count,
+        "likes_count": row.likes_count,
+        "comments_count": row.comments_count,
+    }
+    return json.dumps(record, ensure_ascii=False).encode() + b"\n"
+
+
+async def export_posts(status: PostStatus | None = None) -> AsyncIterator[bytes]:
+    """
+    Статьи в NDJSON, по фрагменту на пачку строк.
+    
+    Сессия своя: генератор дочитывается уже после выхода из обработчика.
+    """
+    async with async_session_maker() as db:
+        result = await db.stream(_export_query(status))
+        async for rows in result.partitions():
+            yield b"".join(_export_line(row) for row in rows)
+
+
+# === Импорт ===
+
+STAGING_POSTS = """
+CREATE TEMP TABLE post_import (
+    line_no integer,
+    id uuid,
+    title text,
+    slug text,
+    content text,
+    excerpt text,
+    cover_image text,
+    status text,
+    published_at timestamptz,
+    publish_at timestamptz,
+    created_at timestamptz,
+    meta_title text,
+    meta_description text,
+    author text,
+    view_count integer,
+    content_html text,
+    content_text text,
+    word_count integer,
+    reading_time integer,
+    toc jsonb,
+    render_version integer
+) ON COMMIT DROP
+"""
+
+STAGING_TAGS = """
+CREATE TEMP TABLE post_import_tags (
+    line_no integer,
+    name text,
+    slug text
+) ON COMMIT DROP
+"""
+
+STAGING_POST_COLUMNS = [
+    "line_no", "id", "title", "slug", "content", "excerpt", "cover_image",
+    "status", "published_at", "publish_at", "created_at", "meta_title",
+    "meta_description", "author", "view_count", "content_html", "content_text",
+    "word_count", "reading_time", "toc", "render_version",
+]
+
+MERGE_TAGS = text("""
+INSERT INTO tags (id, name, slug)
+SELECT DISTINCT ON (slug) gen_random_uuid(), name, slug
+FROM post_import_tags
+ORDER BY slug, line_no
+ON CONFLICT DO NOTHING
+""")
+
+# Новые статьи пачки: id ещё нет в БД, повтор id в файле — первая строка
+STAGED_NEW = """
+SELECT DISTINCT ON (s.id) s.*
+FROM post_import s
+WHERE NOT EXISTS (SELECT 1 FROM posts p WHERE p.id = s.id)
+ORDER BY s.id, s.line_no
+"""
+
+COUNT_NEW = text(f"SELECT count(*) FROM ({STAGED_NEW}) s")
+
+# Суффикс slug: n = номер среди одинаковых в пачке (с 0) + занят ли slug;
+# n > 0 -> slug-(максимальный суффикс среди статей и slug самой пачки + n),
+# поэтому "foo", "foo", "foo-1" дают "foo", "foo-2", "foo-1"
+MERGE_POSTS = text(f"""
+WITH staged AS ({STAGED_NEW}),
+candidates AS (
+    SELECT
+        s.*,
+        row_number() OVER (PARTITION BY s.slug ORDER BY s.line_no) - 1
+            + (EXISTS (SELECT 1 FROM posts p WHERE p.slug = s.slug))::int AS n,
+        GREATEST(
+            (
+                SELECT max(substring(p.slug FROM '-([0-9]+)$')::int)
+                FROM posts p
+                WHERE p.slug LIKE s.slug || '-%' AND p.slug ~ ('^' || s.slug || '-[0-9]+$')
+            ),
+            (
+                SELECT max(substring(o.slug FROM '-([0-9]+)$')::int)
+                FROM staged o
+                WHERE o.slug LIKE s.slug || '-%' AND o.slug ~ ('^' || s.slug || '-[0-9]+$')
+            )
+        ) AS max_suffix
+    FROM staged s
+),
+inserted AS (
+    INSERT INTO posts (
+        id, author_id, title, slug, content, excerpt, cover_image, status,
+        published_at, publish_at, created_at, updated_at, meta_title,
+        meta_description, view_count, content_html, content_text, word_count,
+        reading_time, toc, render_version
+    )
+    SELECT
+        c.id,
+        COALESCE(u.id, :default_author_id),
+        c.title,
+        CASE WHEN c.n = 0 THEN c.slug
+             ELSE c.slug || '-' || (COALESCE(c.max_suffix, 0) + c.n) END,
+        c.content, c.excerpt, c.cover_image, c.status::poststatus,
+        c.published_at, c.publish_at, COALESCE(c.created_at, now()), now(),
+        c.meta_title, c.meta_description, c.view_count, c.content_html,
+        c.content_text, c.word_count, c.reading_time, c.toc, c.render_version
+    FROM candidates c
+    LEFT JOIN users u ON u.username = c.author AND u.deleted_at IS NULL
+    ORDER BY c.line_no
+    ON CONFLICT DO NOTHING
+    RETURNING id, slug, status, published_at
+),
+linked AS (
+    INSERT INTO post_tags (post_id, tag_id)
+    SELECT DISTINCT i.id, t.id
+    FROM inserted i
+    JOIN staged s ON s.id = i.id
+    JOIN post_import_tags st ON st.line_no = s.line_no
+    JOIN tags t ON t.slug = st.slug OR t.name = st.name
+    ON CONFLICT DO NOTHING
+)
+SELECT i.id, i.slug, i.status, i.published_at, s.slug AS requested_slug
+FROM inserted i
+JOIN staged s ON s.id = i.id
+""")
+
+
+@dataclass
+class ImportStats:
+    imported: int = 0
+    renamed: int = 0
+    skipped: int = 0
+    conflicts: int = 0
+    errors: list[str] = field(default_factory=list)
+    
+    def error(self, message: str) -> None:
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(message)
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, bytes]]:
+    """Строки потока байт с номерами (строка может прийти в нескольких фрагментах)."""
+    buffer = b""
+    line_no = 0
+    
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_no += 1
+            yield line_no, line
+    
+    if buffer:
+        yield line_no + 1, buffer
+
+
+def _prepare(batch: list[tuple[int, PostImportRecord]]) -> tuple[list[tuple], list[tuple]]:
+    """Строки временных таблиц: рендеринг, slug, теги (CPU, вне event loop)."""
+    now = datetime.now(timezone.utc)
+    posts, tags = [], []
+    
+    for line_no, record in batch:
+        rendered = render_content(record.content)
+        
+        status, published_at, publish_at = record.status, record.published_at, record.publish_at
+        if status == PostStatus.PUBLISHED:
+            published_at = published_at or now
+        elif status == PostStatus.SCHEDULED and publish_at is None:
+            status = PostStatus.DRAFT
+        
+        posts.append((
+            line_no,
+            record.id or uuid.uuid4(),
+            record.title,
+            slugify(record.slug or record.title, max_length=200) or "post",
+            record.content,
+            record.excerpt or rendered.excerpt(),
+            record.cover_image,
+            status.name,
+            published_at,
+            publish_at if status == PostStatus.SCHEDULED else None,
+            record.created_at,
+            record.meta_title or record.title[:70],
+            record.meta_description or rendered.excerpt(160),
+            record.author,
+            record.view_count,
+            rendered.html,
+            rendered.text,
+            rendered.word_count,
+            rendered.reading_time,
+            json.dumps(rendered.toc),
+            RENDERER_VERSION,
+        ))
+        
+        seen = set()
+        for name in record.tags:
+            name = name.strip()[:50]
+            slug = slugify(name, max_length=50)
+            if len(name) >= 2 and slug and slug not in seen:
+                seen.add(slug)
+                tags.append((line_no, name, slug))
+    
+    return posts, tags
+
+
+async def _import_batch(
+    batch: list[tuple[int, PostImportRecord]],
+    default_author_id: UUID,
+    stats: ImportStats,
+) -> None:
+    posts, tags = await run_in_threadpool(_prepare, batch)
+    
+    async with async_session_maker() as db:
+        await db.execute(text(STAGING_POSTS))
+        await db.execute(text(STAGING_TAGS))
+        
+        conn = await db.connection()
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            "post_import", records=posts, columns=STAGING_POST_COLUMNS
+        )
+        if tags:
+            await raw.driver_connection.copy_records_to_table(
+                "post_import_tags", records=tags, columns=["line_no", "name", "slug"]
+            )
+            await db.execute(MERGE_TAGS)
+        
+        new = (await db.execute(COUNT_NEW)).scalar_one()
+        result = await db.execute(MERGE_POSTS, {"default_author_id": default_author_id})
+        inserted = result.all()
+        
+        published = [row for row in inserted if row.status == PostStatus.PUBLISHED.name]
+        tag_slugs = await _tag_slugs(db, [row.id for row in published])
+        
+        await db.commit()
+    
+    stats.imported += len(inserted)
+    stats.renamed += sum(row.slug != row.requested_slug for row in inserted)
+    stats.skipped += len(posts) - new
+    # Slug пачки уникальны, так что ON CONFLICT срабатывает только
+    # на id или slug, записанные параллельно
+    stats.conflicts += new - len(inserted)
+    
+    if published:
+        await index_posts_tags(
+            (str(row.id), tag_slugs[row.id], row.published_at.timestamp())
+            for row in published
+            if row.id in tag_slugs
+        )
+        await invalidate_tags_cache()
+        await invalidate_published_posts(
+            min(row.published_at for row in published).timestamp(), shift=True
+        )
+
+
+async def _tag_slugs(db: AsyncSession, post_ids: list[UUID]) -> dict[UUID, list[str]]:
+    if not post_ids:
+        return {}
+    
+    result = await db.execute(
+        select(post_tags.c.post_id, Tag.slug)
+        .join(Tag, Tag.id == post_tags.c.tag_id)
+        .where(post_tags.c.post_id.in_(post_ids))
+    )
+    tag_slugs: dict[UUID, list[str]] = {}
+    for post_id, slug in result:
+        tag_slugs.setdefault(post_id, []).append(slug)
+    return tag_slugs
+
+
+async def import_posts(
+    chunks: AsyncIterator[bytes],
+    default_author_id: UUID,
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> PostImportResponse:
+    """
+    Импортировать статьи из потока NDJSON.
+    
+    Args:
+        chunks: фрагменты тела запроса или файла
+        default_author_id: автор статей, чей username не найден
+    """
+    stats = ImportStats()
+    batch: list[tuple[int, PostImportRecord]] = []
+    
+    async for line_no, line in _lines(chunks):
+        if not line.strip():
+            continue
+        try:
+            batch.append((line_no, PostImportRecord.model_validate_json(line)))
+        except ValidationError as exc:
+            error = exc.errors()[0]
+            location = ".".join(str(part) for part in error["loc"])
+            stats.error(f"line {line_no}: {location}: {error['msg']}")
+            continue
+        
+        if len(batch) >= batch_size:
+            await _import_batch(batch, default_author_id, stats)
+            batch = []
+    
+    if batch:
+        await _import_batch(batch, default_author_id, stats)
+    
+    if stats.imported:
+        logger.info(
+            "Imported %d posts (%d renamed, %d skipped, %d conflicts)",
+            stats.imported, stats.renamed, stats.skipped, stats.conflicts,
+        )
+    
+    return PostImportResponse(
+        imported=stats.imported,
+        renamed=stats.renamed,
+        skipped=stats.skipped,
+        conflicts=stats.conflicts,
+        errors=stats.errors,
+    )
+
+
+# === CLI ===
+
+async def _read_file(path: str, chunk_size: int = 1 << 16) -> AsyncIterator[bytes]:
+    with open(path, "rb") as file:
+        while chunk := await run_in_threadpool(file.read, chunk_size):
+            yield chunk
+
+
+async def _export_cli(status: PostStatus | None) -> None:
+    async for chunk in export_posts(status):
+        sys.stdout.buffer.write(chunk)
+    sys.stdout.buffer.flush()
+
+
+async def _import_cli(path: str, author: str, batch_size: int) -> None:
+    async with async_session_maker() as db:
+        result = await db.execute(select(User.id).where(User.username == author))
+        author_id = result.scalar_one_or_none()
+    if author_id is None:
+        sys.exit(f"User {author!r} not found")
+    
+    report = await import_posts(_read_file(path), author_id, batch_size)
+    if report.imported:
+        await rebuild_related_posts_index.enqueue()
+    print(report.model_dump_json(indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export / import posts as NDJSON")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    export_parser = commands.add_parser("export", help="Статьи в stdout")
+    export_parser.add_argument("--status", choices=[status.value for status in PostStatus])
+    
+    import_parser = commands.add_parser("import", help="Статьи из файла")
+    import_parser.add_argument("path")
+    import_parser.add_argument("--author", required=True, help="Автор по умолчанию (username)")
+    import_parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    
+    if args.command == "export":
+        asyncio.run(_export_cli(PostStatus(args.status) if args.status else None))
+    else:
+        asyncio.run(_import_cli(args.path, args.author, args.batch_size))
@@ -0,0 +1,114 @@
+"""
+Publisher Job
+=============
+Публикация отложенных статей (status=SCHEDULED), у которых
+наступило publish_at.
+
+Статьи переводятся пачками одним UPDATE ... WHERE id IN (SELECT ...
+FOR UPDATE SKIP LOCKED): параллельные запуски и правки статьи
+через API не блокируют друг друга, а каждая статья публикуется
+ровно один раз. После commit индексы тегов и кэши обновляются
+одним pipeline на пачку, sitemap и ленты сбрасываются начиная
+с самой ранней опубликованной статьи.
+
+Запуск:
+    python -m app.jobs.publisher
+"""
+
+import asyncio
+import logging
+from uuid import UUID
+
+from sqlalchemy import func, select, update
+
+from app.db.redis import index_posts_tags, invalidate_post_caches, invalidate_tags_cache
+from app.db.session import async_session_maker
+from app.jobs.tasks import update_related_posts
+from app.models.post import Post, PostStatus
+from app.models.tag import Tag, post_tags
+from app.services.feed_service import invalidate_published_posts
+
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 200
+
+
+async def _publish_batch(batch_size: int) -> list:
+    """Опубликовать одну пачку; строки (id, slug, published_at, теги)."""
+    due = (
+        select(Post.id)
+        .where(
+            Post.status == PostStatus.SCHEDULED,
+            Post.publish_at <= func.now(),
+            Post.deleted_at.is_(None),
+        )
+        .order_by(Post.publish_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    
+    async with async_session_maker() as db:
+        result = await db.execute(
+            update(Post)
+            .where(Post.id.in_(due.scalar_subquery()))
+            .values(
+                status=PostStatus.PUBLISHED,
+                published_at=Post.publish_at,
+                publish_at=None,
+            )
+            .returning(Post.id, Post.slug, Post.published_at)
+            .execution_options(synchronize_session=False)
+        )
+        rows = result.all()
+        
+        tag_slugs: dict[UUID, list[str]] = {}
+        if rows:
+            result = await db.execute(
+                select(post_tags.c.post_id, Tag.slug)
+                .join(Tag, Tag.id == post_tags.c.tag_id)
+                .where(post_tags.c.post_id.in_([row.id for row in rows]))
+            )
+            for post_id, slug in result:
+                tag_slugs.setdefault(post_id, []).append(slug)
+        
+        await db.commit()
+    
+    return [(row.id, row.slug, row.published_at, tag_slugs.get(row.id, [])) for row in rows]
+
+
+async def publish_due_posts(batch_size: int = BATCH_SIZE) -> int:
+    """
+    Опубликовать все статьи с наступившим publish_at.
+    
+    Returns:
+        Количество опубликованных статей
+    """
+    published = 0
+    
+    while rows := await _publish_batch(batch_size):
+        await index_posts_tags(
+            (str(post_id), tags, published_at.timestamp())
+            for post_id, _, published_at, tags in rows
+        )
+        await invalidate_post_caches(slug for _, slug, _, _ in rows)
+        await invalidate_tags_cache()
+        await invalidate_published_posts(
+            min(published_at for _, _, published_at, _ in rows).timestamp(), shift=True
+        )
+        
+        for post_id, _, _, _ in rows:
+            await update_related_posts.enqueue(post_id)
+        
+        published += len(rows)
+        if len(rows) < batch_size:
+            break
+    
+    if published:
+        logger.info("Published %d scheduled posts", published)
+    return published
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(publish_due_posts())
@@ -0,0 +1,109 @@
+"""
+Purge Job
+=========
+Окончательное удаление мягко удалённых статей и пользователей.
+
+Строки удаляются небольшими пачками в отдельных транзакциях,
+поэтому блокировки на posts/comments/likes держатся недолго.
+Комментарии, лайки и прочие зависимые строки удаляет
+ON DELETE CASCADE в БД, ORM их не загружает.
+
+Запуск:
+    python -m app.jobs.purge
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, exists, or_, select
+
+from app.config import settings
+from app.db.session import async_session_maker
+from app.models.post import Post
+from app.models.user import User
+
+
+logger = logging.getLogger(__name__)
+
+
+async def _purge_batches(build_delete, batch_size: int, pause: float) -> int:
+    """Выполнять DELETE пачками, пока он удаляет строки."""
+    purged = 0
+    
+    while True:
+        async with async_session_maker() as db:
+            result = await db.execute(build_delete(batch_size))
+            deleted = len(result.all())
+            await db.commit()
+        
+        purged += deleted
+        if deleted < batch_size:
+            return purged
+        
+        # Даём место конкурирующим транзакциям
+        await asyncio.sleep(pause)
+
+
+async def purge_deleted(
+    retention_days: int | None = None,
+    batch_size: int | None = None,
+) -> tuple[int, int]:
+    """
+    Удалить статьи и пользователей, мягко удалённые раньше retention_days.
+    
+    Сначала удаляются статьи (свои и удалённых пользователей),
+    затем пользователи без оставшихся статей.
+    
+    Returns:
+        (posts, users): количество удалённых строк
+    """
+    if retention_days is None:
+        retention_days = settings.purge_retention_days
+    if batch_size is None:
+        batch_size = settings.purge_batch_size
+    pause = settings.purge_batch_pause_ms / 1000
+    
+    cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    
+    expired_users = select(User.id).where(User.deleted_at < cutoff)
+    
+    def delete_posts(limit: int):
+        # SKIP LOCKED: строки, занятые запросами, заберём следующим запуском
+        batch = (
+            select(Post.id)
+            .where(
+                or_(
+                    Post.deleted_at < cutoff,
+                    Post.author_id.in_(expired_users),
+                )
+            )
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return delete(Post).where(Post.id.in_(batch)).returning(Post.id)
+    
+    def delete_users(limit: int):
+        batch = (
+            select(User.id)
+            .where(
+                User.deleted_at < cutoff,
+                ~exists().where(Post.author_id == User.id),
+            )
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return delete(User).where(User.id.in_(batch)).returning(User.id)
+    
+    posts = await _purge_batches(delete_posts, batch_size, pause)
+    users = await _purge_batches(delete_users, batch_size, pause)
+    
+    if posts or users:
+        logger.info("Purged %d posts and %d users", posts, users)
+    
+    return posts, users
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(purge_deleted())
@@ -0,0 +1,233 @@
+"""
+Job Queue
+=========
+Очередь фоновых задач на Redis Streams.
+
+jobs:{queue}          — stream задач (consumer group "workers")
+jobs:{queue}:delayed  — sorted set повторов с backoff (score = время запуска)
+jobs:{queue}:dead     — stream задач, исчерпавших попытки
+jobs:metrics:{job}    — hash счётчиков задачи
+
+Задачи объявляются декоратором job() и ставятся в очередь через
+.enqueue(...) с теми же аргументами, что у функции. Аргументы
+сериализуются в JSON и валидируются по сигнатуре при выполнении
+(UUID, datetime и т.д. восстанавливаются pydantic).
+
+Выполнение — app.jobs.worker.
+"""
+
+import inspect
+import json
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any, Generic, ParamSpec
+
+from pydantic import validate_call
+from pydantic_core import to_json
+from redis.exceptions import ResponseError
+
+from app.config import settings
+from app.db.redis import get_redis
+
+
+P = ParamSpec("P")
+
+GROUP = "workers"
+DEAD_LETTER_MAXLEN = 10_000
+
+
+def stream_key(queue: str) -> str:
+    return f"jobs:{queue}"
+
+
+def delayed_key(queue: str) -> str:
+    return f"jobs:{queue}:delayed"
+
+
+def dead_key(queue: str) -> str:
+    return f"jobs:{queue}:dead"
+
+
+def metrics_key(job_name: str) -> str:
+    return f"jobs:metrics:{job_name}"
+
+
+@dataclass
+class JobDefinition(Generic[P]):
+    """
+    Описание фоновой задачи.
+    
+    Attributes:
+        name: Уникальное имя (хранится в сообщении)
+        func: Асинхронная функция задачи
+        queue: Очередь (у каждой свой лимит параллельности в воркере)
+        max_retries: Повторов после ошибки (потом — в dead-letter)
+        retry_backoff: Базовая задержка повтора, секунды (растёт как 2^attempt)
+        timeout: Лимит выполнения, секунды (None — без лимита)
+    """
+    
+    name: str
+    func: Callable[P, Awaitable[Any]]
+    queue: str = "default"
+    max_retries: int = 3
+    retry_backoff: float = 5.0
+    timeout: float | None = 60.0
+    _validated: Callable[..., Awaitable[Any]] = field(init=False, repr=False)
+    
+    def __post_init__(self) -> None:
+        self._validated = validate_call(self.func)
+    
+    async def __call__(self, *args: P.args, **kwargs: P.kwargs) -> Any:
+        """Выполнить задачу сразу, без очереди."""
+        return await self.func(*args, **kwargs)
+    
+    async def enqueue(self, *args: P.args, **kwargs: P.kwargs) -> str:
+        """
+        Поставить задачу в очередь.
+        
+        Returns:
+            ID сообщения в stream
+        """
+        arguments = inspect.signature(self.func).bind(*args, **kwargs).arguments
+        return await enqueue_raw(self.queue, self.name, to_json(arguments).decode())
+    
+    async def run(self, args_json: str) -> Any:
+        """Выполнить задачу из сообщения очереди (с валидацией аргументов)."""
+        return await self._validated(**json.loads(args_json))
+
+
+# Реестр задач: name -> definition
+registry: dict[str, JobDefinition] = {}
+
+
+def job(
+    name: str,
+    queue: str = "default",
+    max_retries: int = 3,
+    retry_backoff: float = 5.0,
+    timeout: float | None = 60.0,
+) -> Callable[[Callable[P, Awaitable[Any]]], JobDefinition[P]]:
+    """
+    Объявить фоновую задачу.
+    
+    Использование:
+        @job("posts.reindex", queue="maintenance")
+        async def reindex_post(post_id: UUID) -> None: ...
+        
+        await reindex_post.enqueue(post.id)
+    """
+    def decorator(func: Callable[P, Awaitable[Any]]) -> JobDefinition[P]:
+        if name in registry:
+            raise ValueError(f"Job {name!r} is already registered")
+        
+        definition = JobDefinition(
+            name=name,
+            func=func,
+            queue=queue,
+            max_retries=max_retries,
+            retry_backoff=retry_backoff,
+            timeout=timeout,
+        )
+        registry[name] = definition
+        return definition
+    
+    return decorator
+
+
+# === Операции с очередью ===
+
+async def enqueue_raw(
+    queue: str,
+    job_name: str,
+    args_json: str,
+    attempt: int = 0,
+) -> str:
+    """Добавить сообщение задачи в stream очереди."""
+    redis = await get_redis()
+    return await redis.xadd(
+        stream_key(queue),
+        {
+            "job": job_name,
+            "args": args_json,
+            "attempt": str(attempt),
+            "enqueued_at": str(time.time()),
+        },
+        maxlen=settings.job_stream_maxlen,
+        approximate=True,
+    )
+
+
+async def ensure_group(queue: str) -> None:
+    """Создать consumer group очереди (и сам stream), если их нет."""
+    redis = await get_redis()
+    try:
+        await redis.xgroup_create(stream_key(queue), GROUP, id="0", mkstream=True)
+    except ResponseError as exc:
+        if "BUSYGROUP" not in str(exc):
+            raise
+
+
+# Атомарный перенос созревших повторов из sorted set обратно в stream
+_PROMOTE_DELAYED = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, member in ipairs(due) do
+    redis.call('ZREM', KEYS[1], member)
+    local msg = cjson.decode(member)
+    redis.call('XADD', KEYS[2], 'MAXLEN', '~', ARGV[3], '*',
+        'job', msg.job, 'args', msg.args,
+        'attempt', msg.attempt, 'enqueued_at', ARGV[1])
+end
+return #due
+"""
+
+
+async def promote_delayed(queue: str, limit: int = 100) -> int:
+    """Вернуть в очередь повторы, время которых наступило."""
+    redis = await get_redis()
+    return await redis.eval(
+        _PROMOTE_DELAYED,
+        2,
+        delayed_key(queue),
+        stream_key(queue),
+        str(time.time()),
+        limit,
+        settings.job_stream_maxlen,
+    )
+
+
+async def get_queue_metrics() -> dict[str, Any]:
+    """Длины очередей и счётчики задач (для админки)."""
+    redis = await get_redis()
+    queues = {}
+    
+    for queue in settings.job_queues:
+        pipe = redis.pipeline(transaction=False)
+        pipe.xlen(stream_key(queue))
+        pipe.zcard(delayed_key(queue))
+        pipe.xlen(dead_key(queue))
+        length, delayed, dead = await pipe.execute()
+        
+        try:
+            pending = (await redis.xpending(stream_key(queue), GROUP))["pending"]
+        except ResponseError:
+            pending = 0
+        
+        queues[queue] = {
+            "length": length,
+            "in_progress": pending,
+            "delayed": delayed,
+            "dead": dead,
+        }
+    
+    jobs = {}
+    for name in sorted(registry):
+        counters = {key: float(value) for key, value in (await redis.hgetall(metrics_key(name))).items()}
+        completed = counters.get("completed", 0)
+        jobs[name] = {
+            **counters,
+            "avg_latency_ms": counters.get("latency_ms", 0) / completed if completed else 0.0,
+            "avg_runtime_ms": counters.get("runtime_ms", 0) / completed if completed else 0.0,
+        }
+    
+    return {"queues": queues, "jobs": jobs}
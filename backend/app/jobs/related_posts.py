@@ -0,0 +1,391 @@
+"""
+Related Posts Job
+=================
+Построение индекса похожих статей.
+
+Полная перестройка:
+    1. TF-IDF векторы всех опубликованных статей (scipy.sparse CSR)
+    2. Top-k соседей батчами матричного произведения X[batch] @ X.T
+    3. Перезапись таблицы related_posts
+
+Инкрементальное обновление (после update_post) векторизует только
+изменённую статью по сохранённому словарю/IDF и пересчитывает её соседей.
+
+Запуск:
+    python -m app.jobs.related_posts
+"""
+
+import asyncio
+import json
+import logging
+import re
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from uuid import UUID
+
+import numpy as np
+import scipy.sparse as sp
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db.session import async_session_maker
+from app.models.post import Post, PostStatus
+from app.models.related_post import RelatedPost
+from app.models.tag import Tag, post_tags
+
+
+logger = logging.getLogger(__name__)
+
+TAG_RE = re.compile(r"<[^>]+>")
+TOKEN_RE = re.compile(r"\w{2,}", re.UNICODE)
+
+# Вес токенов заголовка и тегов относительно текста
+TITLE_WEIGHT = 3
+TAG_WEIGHT = 5
+
+# Память под один батч плотных similarity-строк (float32)
+BATCH_MEMORY_BYTES = 64 * 1024 * 1024
+
+
+@dataclass
+class RelatedIndex:
+    """Словарь, IDF и нормализованная TF-IDF матрица опубликованных статей."""
+    
+    post_ids: list[str]
+    vocabulary: dict[str, int]
+    idf: np.ndarray
+    matrix: sp.csr_matrix
+
+
+def _tokenize(title: str, content: str, tag_slugs: list[str]) -> Counter:
+    """Токены статьи с весами заголовка и тегов."""
+    counts = Counter(TOKEN_RE.findall(TAG_RE.sub(" ", content).lower()))
+    for token in TOKEN_RE.findall(title.lower()):
+        counts[token] += TITLE_WEIGHT
+    for slug in tag_slugs:
+        counts[f"tag:{slug}"] += TAG_WEIGHT
+    return counts
+
+
+def _normalize_rows(matrix: sp.csr_matrix) -> sp.csr_matrix:
+    """L2-нормализация строк (косинусная близость = скалярное произведение)."""
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sp.diags(1.0 / norms).dot(matrix).tocsr().astype(np.float32)
+
+
+def _vectorize(counts: Counter, vocabulary: dict[str, int], idf: np.ndarray) -> sp.csr_matrix:
+    """TF-IDF вектор одной статьи по готовому словарю."""
+    cols = [vocabulary[token] for token in counts if token in vocabulary]
+    tf = [counts[token] for token in counts if token in vocabulary]
+    data = (1.0 + np.log(np.asarray(tf, dtype=np.float32))) * idf[cols]
+    vector = sp.csr_matrix(
+        (data, (np.zeros(len(cols), dtype=np.int32), cols)),
+        shape=(1, len(vocabulary)),
+    )
+    return _normalize_rows(vector)
+
+
+def build_index(docs: list[tuple[str, Counter]]) -> RelatedIndex:
+    """
+    Построить TF-IDF матрицу.
+    
+    Используется сублинейный TF (1 + log tf) и сглаженный IDF.
+    Токены, встречающиеся в одной статье или в большинстве статей,
+    отбрасываются: они не влияют на близость или работают как стоп-слова.
+    """
+    vocabulary: dict[str, int] = {}
+    rows: list[int] = []
+    cols: list[int] = []
+    data: list[int] = []
+    
+    for row, (_, counts) in enumerate(docs):
+        for token, count in counts.items():
+            rows.append(row)
+            cols.append(vocabulary.setdefault(token, len(vocabulary)))
+            data.append(count)
+    
+    n_docs = len(docs)
+    tf = sp.csr_matrix(
+        (np.asarray(data, dtype=np.float32), (rows, cols)),
+        shape=(n_docs, len(vocabulary)),
+    )
+    
+    # Отбор словаря по document frequency
+    df = np.bincount(tf.indices, minlength=len(vocabulary))
+    keep = (df >= 2) & (df <= max(2, int(0.5 * n_docs)))
+    keep_cols = np.flatnonzero(keep)
+    remap = {old: new for new, old in enumerate(keep_cols)}
+    tokens = sorted(vocabulary, key=vocabulary.get)
+    vocabulary = {tokens[old]: new for old, new in remap.items()}
+    tf = tf[:, keep_cols]
+    df = df[keep_cols]
+    
+    tf.data = 1.0 + np.log(tf.data)
+    idf = (np.log((1.0 + n_docs) / (1.0 + df)) + 1.0).astype(np.float32)
+    matrix = _normalize_rows(tf.dot(sp.diags(idf)))
+    
+    return RelatedIndex(
+        post_ids=[post_id for post_id, _ in docs],
+        vocabulary=vocabulary,
+        idf=idf,
+        matrix=matrix,
+    )
+
+
+def top_k_neighbours(
+    index: RelatedIndex,
+    queries: sp.csr_matrix,
+    k: int,
+    min_score: float,
+    exclude: list[int | None],
+) -> list[list[tuple[int, float]]]:
+    """
+    Top-k соседей для строк queries батчами матричного произведения.
+    
+    Args:
+        index: Индекс со всеми статьями
+        queries: Нормализованные векторы запросов
+        k: Количество соседей
+        min_score: Минимальная близость
+        exclude: Для каждой строки — позиция самой статьи в индексе (или None)
+    
+    Returns:
+        Для каждой строки список (позиция в индексе, близость) по убыванию
+    """
+    n_docs = index.matrix.shape[0]
+    batch_size = max(1, BATCH_MEMORY_BYTES // (4 * max(n_docs, 1)))
+    k = min(k, n_docs - 1) if n_docs > 1 else 0
+    results: list[list[tuple[int, float]]] = []
+    
+    if k <= 0:
+        return [[] for _ in range(queries.shape[0])]
+    
+    matrix_t = index.matrix.T.tocsr()
+    for start in range(0, queries.shape[0], batch_size):
+        sims = queries[start:start + batch_size].dot(matrix_t).toarray()
+        
+        for offset, own in enumerate(exclude[start:start + batch_size]):
+            if own is not None:
+                sims[offset, own] = -1.0
+        
+        top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(sims, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        
+        for cols, scores in zip(top, top_scores):
+            results.append([
+                (int(col), float(score))
+                for col, score in zip(cols, scores)
+                if score >= min_score
+            ])
+    
+    return results
+
+
+# === Хранение индекса ===
+
+def _index_dir() -> Path:
+    return Path(settings.related_posts_index_dir)
+
+
+def save_index(index: RelatedIndex) -> None:
+    """Сохранить индекс на диск для инкрементальных обновлений."""
+    path = _index_dir()
+    path.mkdir(parents=True, exist_ok=True)
+    sp.save_npz(path / "matrix.npz", index.matrix)
+    np.save(path / "idf.npy", index.idf)
+    (path / "meta.json").write_text(
+        json.dumps({"post_ids": index.post_ids, "vocabulary": index.vocabulary})
+    )
+
+
+_loaded: tuple[float, RelatedIndex] | None = None
+
+
+def load_index() -> RelatedIndex | None:
+    """Загрузить индекс с диска (кэшируется до следующей перестройки)."""
+    global _loaded
+    
+    meta_path = _index_dir() / "meta.json"
+    if not meta_path.exists():
+        return None
+    
+    mtime = meta_path.stat().st_mtime
+    if _loaded is None or _loaded[0] != mtime:
+        meta = json.loads(meta_path.read_text())
+        _loaded = (
+            mtime,
+            RelatedIndex(
+                post_ids=meta["post_ids"],
+                vocabulary=meta["vocabulary"],
+                idf=np.load(_index_dir() / "idf.npy"),
+                matrix=sp.load_npz(_index_dir() / "matrix.npz").tocsr(),
+            ),
+        )
+    
+    return _loaded[1]
+
+
+# === Задачи ===
+
+def _document_query():
+    """
+    id, заголовок, текст и slug'и тегов статьи одной строкой.
+    
+    Только колонки: загрузка Post в ORM тянет цепочку selectin-связей
+    (автор, его статьи, комментарии, лайки).
+    """
+    tag_slugs = (
+        select(func.coalesce(func.array_agg(Tag.slug), text("'{}'")))
+        .join(post_tags, post_tags.c.tag_id == Tag.id)
+        .where(post_tags.c.post_id == Post.id)
+        .scalar_subquery()
+    )
+    return select(Post.id, Post.title, Post.content, tag_slugs.label("tag_slugs"))
+
+
+async def _load_documents(db: AsyncSession) -> list[tuple[str, Counter]]:
+    """Токены всех опубликованных статей (тексты не держим в памяти целиком)."""
+    result = await db.stream(
+        _document_query()
+        .where(Post.status == PostStatus.PUBLISHED, Post.deleted_at.is_(None))
+        .order_by(Post.id)
+        .execution_options(yield_per=1000)
+    )
+    return [
+        (str(row.id), _tokenize(row.title, row.content, row.tag_slugs))
+        async for row in result
+    ]
+
+
+def _compute_all(docs: list[tuple[str, Counter]]) -> tuple[RelatedIndex, list[list[tuple[int, float]]]]:
+    index = build_index(docs)
+    neighbours = top_k_neighbours(
+        index,
+        index.matrix,
+        k=settings.related_posts_top_k,
+        min_score=settings.related_posts_min_score,
+        exclude=list(range(len(docs))),
+    )
+    save_index(index)
+    return index, neighbours
+
+
+async def rebuild_related_posts() -> int:
+    """
+    Полностью перестроить related_posts.
+    
+    Returns:
+        Количество записанных пар
+    """
+    async with async_session_maker() as db:
+        docs = await _load_documents(db)
+        if not docs:
+            return 0
+        
+        # CPU-работа вне event loop
+        loop = asyncio.get_running_loop()
+        index, neighbours = await loop.run_in_executor(None, _compute_all, docs)
+        
+        rows = [
+            {
+                "post_id": UUID(index.post_ids[row]),
+                "related_post_id": UUID(index.post_ids[col]),
+                "score": score,
+                "rank": rank,
+            }
+            for row, items in enumerate(neighbours)
+            for rank, (col, score) in enumerate(items)
+        ]
+        
+        await db.execute(delete(RelatedPost))
+        for start in range(0, len(rows), 5000):
+            await db.execute(insert(RelatedPost), rows[start:start + 5000])
+        await db.commit()
+    
+    logger.info("Related posts rebuilt: %d posts, %d pairs", len(docs), len(rows))
+    return len(rows)
+
+
+async def update_related_for_post(post_id: UUID) -> None:
+    """
+    Пересчитать похожие статьи для одной статьи.
+    
+    Использует сохранённый словарь и IDF: остальные строки индекса
+    обновятся при следующей полной перестройке.
+    """
+    index = load_index()
+    if index is None:
+        logger.info("Related posts index not built yet, skipping %s", post_id)
+        return
+    
+    async with async_session_maker() as db:
+        result = await db.execute(
+            _document_query().where(
+                Post.id == post_id,
+                Post.status == PostStatus.PUBLISHED,
+                Post.deleted_at.is_(None),
+            )
+        )
+        post = result.one_or_none()
+        
+        await db.execute(delete(RelatedPost).where(RelatedPost.post_id == post_id))
+        
+        if post is not None:
+            counts = _tokenize(post.title, post.content, post.tag_slugs)
+            
+            own = str(post_id)
+            exclude = index.post_ids.index(own) if own in index.post_ids else None
+            
+            loop = asyncio.get_running_loop()
+            neighbours = await loop.run_in_executor(
+                None,
+                lambda: top_k_neighbours(
+                    index,
+                    _vectorize(counts, index.vocabulary, index.idf),
+                    k=settings.related_posts_top_k,
+                    min_score=settings.related_posts_min_score,
+                    exclude=[exclude],
+                )[0],
+            )
+            
+            # Статьи индекса могли быть удалены после перестройки
+            candidates = [UUID(index.post_ids[col]) for col, _ in neighbours]
+            existing = await db.execute(
+                select(Post.id).where(
+                    Post.id.in_(candidates),
+                    Post.status == PostStatus.PUBLISHED,
+                    Post.deleted_at.is_(None),
+                )
+            )
+            alive = set(existing.scalars().all())
+            neighbours = [
+                (col, score) for col, score in neighbours
+                if UUID(index.post_ids[col]) in alive
+            ]
+            
+            if neighbours:
+                await db.execute(
+                    insert(RelatedPost),
+                    [
+                        {
+                            "post_id": post_id,
+                            "related_post_id": UUID(index.post_ids[col]),
+                            "score": score,
+                            "rank": rank,
+                        }
+                        for rank, (col, score) in enumerate(neighbours)
+                    ],
+                )
+        
+        await db.commit()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(rebuild_related_posts())
@@ -0,0 +1,133 @@
+"""
+Render Posts Backfill Job
+=========================
+Перерендеринг статей после изменения RENDERER_VERSION (app.core.render).
+
+- Статьи обходятся пачками по ключу (posts.id > last_id)
+- Пачка рендерится параллельно в пуле процессов
+- Результат записывается одним executemany; статья, изменённая
+  во время рендеринга (другой updated_at), не перезаписывается —
+  её уже отрендерил update_post
+- updated_at не меняется: перерендеринг не считается правкой статьи
+
+Запуск:
+    python -m app.jobs.render_posts
+    python -m app.jobs.render_posts --all --workers 8
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from uuid import UUID
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.core.render import RENDERER_VERSION, RenderedContent, render_content
+from app.db.session import async_session_maker
+from app.models.post import Post
+
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 200
+
+posts_table = Post.__table__
+
+_UPDATE_RENDERED = (
+    update(posts_table)
+    .where(
+        posts_table.c.id == bindparam("b_id"),
+        posts_table.c.updated_at == bindparam("b_updated_at"),
+    )
+    .values(
+        content_html=bindparam("b_html"),
+        content_text=bindparam("b_text"),
+        word_count=bindparam("b_word_count"),
+        reading_time=bindparam("b_reading_time"),
+        toc=bindparam("b_toc", type_=JSONB),
+        render_version=RENDERER_VERSION,
+        updated_at=posts_table.c.updated_at,
+    )
+)
+
+
+async def rerender_posts(
+    force: bool = False,
+    batch_size: int = BATCH_SIZE,
+    workers: int | None = None,
+) -> int:
+    """
+    Перерендерить статьи с устаревшей версией рендеринга.
+    
+    Args:
+        force: Перерендерить все статьи, независимо от версии
+        batch_size: Статей в пачке
+        workers: Процессов рендеринга (по умолчанию — число CPU)
+    
+    Returns:
+        Количество обработанных статей
+    """
+    loop = asyncio.get_running_loop()
+    updated = 0
+    last_id: UUID | None = None
+    
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        while True:
+            async with async_session_maker() as db:
+                query = (
+                    select(Post.id, Post.updated_at, Post.content)
+                    .order_by(Post.id)
+                    .limit(batch_size)
+                )
+                if not force:
+                    query = query.where(Post.render_version != RENDERER_VERSION)
+                if last_id is not None:
+                    query = query.where(Post.id > last_id)
+                
+                batch = (await db.execute(query)).all()
+            
+            if not batch:
+                break
+            last_id = batch[-1].id
+            
+            rendered: list[RenderedContent] = await asyncio.gather(*(
+                loop.run_in_executor(pool, render_content, content)
+                for _, _, content in batch
+            ))
+            
+            async with async_session_maker() as db:
+                await db.execute(
+                    _UPDATE_RENDERED,
+                    [
+                        {
+                            "b_id": post_id,
+                            "b_updated_at": updated_at,
+                            "b_html": item.html,
+                            "b_text": item.text,
+                            "b_word_count": item.word_count,
+                            "b_reading_time": item.reading_time,
+                            "b_toc": item.toc,
+                        }
+                        for (post_id, updated_at, _), item in zip(batch, rendered)
+                    ],
+                )
+                await db.commit()
+            
+            updated += len(batch)
+            logger.info("Rendered %d posts (version %d)", updated, RENDERER_VERSION)
+    
+    return updated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-render post content")
+    parser.add_argument("--all", action="store_true", help="Перерендерить все статьи")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(rerender_posts(force=args.all, batch_size=args.batch_size, workers=args.workers))
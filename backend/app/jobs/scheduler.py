@@ -0,0 +1,129 @@
+"""
+Periodic Scheduler
+==================
+Запуск периодических задач внутри процесса приложения.
+
+Каждый воркер uvicorn запускает свой планировщик, но задача
+выполняется только там, где удалось захватить Redis-блокировку
+на интервал, т.е. не чаще одного раза за интервал на весь кластер.
+"""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from app.config import settings
+from app.db.events import ensure_event_partitions
+from app.db.redis import acquire_lock
+from app.jobs.accounts import resume_account_jobs
+from app.jobs.analytics import compact_stats
+from app.jobs.digest import send_weekly_digest
+from app.jobs.drafts import persist_drafts
+from app.jobs.publisher import publish_due_posts
+from app.jobs.purge import purge_deleted
+from app.jobs.static_export import export_static
+from app.jobs.unique_views import persist_unique_views
+from app.jobs.user_stats import refresh_user_stats
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PeriodicJob:
+    """Периодическая задача."""
+    
+    name: str
+    interval: int  # секунды
+    func: Callable[[], Awaitable[Any]]
+
+
+PERIODIC_JOBS: list[PeriodicJob] = [
+    PeriodicJob(
+        name="unique_views",
+        interval=settings.unique_views_persist_interval,
+        func=persist_unique_views,
+    ),
+    PeriodicJob(
+        name="analytics",
+        interval=settings.analytics_compact_interval,
+        func=compact_stats,
+    ),
+    PeriodicJob(
+        name="user_stats",
+        interval=settings.user_stats_refresh_interval,
+        func=refresh_user_stats,
+    ),
+    PeriodicJob(
+        name="purge",
+        interval=settings.purge_interval,
+        func=purge_deleted,
+    ),
+    PeriodicJob(
+        name="account_jobs",
+        interval=settings.account_job_resume_interval,
+        func=resume_account_jobs,
+    ),
+    PeriodicJob(
+        name="drafts",
+        interval=max(1, settings.draft_persist_interval // 2),
+        func=persist_drafts,
+    ),
+    PeriodicJob(
+        name="publisher",
+        interval=settings.publish_check_interval,
+        func=publish_due_posts,
+    ),
+    PeriodicJob(
+        name="event_partitions",
+        interval=24 * 3600,
+        func=ensure_event_partitions,
+    ),
+]
+
+if settings.digest_enabled:
+    PERIODIC_JOBS.append(
+        PeriodicJob(
+            name="digest",
+            interval=settings.digest_check_interval,
+            func=send_weekly_digest,
+        )
+    )
+
+if settings.static_export_enabled:
+    PERIODIC_JOBS.append(
+        PeriodicJob(
+            name="static_export",
+            interval=settings.static_export_interval,
+            func=export_static,
+        )
+    )
+
+
+async def _run_periodic(job: PeriodicJob) -> None:
+    while True:
+        await asyncio.sleep(job.interval)
+        try:
+            if await acquire_lock(f"job:{job.name}", max(1, job.interval - 1)):
+                await job.func()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Periodic job %s failed", job.name)
+
+
+def start_scheduler() -> list[asyncio.Task]:
+    """Запустить все периодические задачи (вызывается в lifespan)."""
+    return [
+        asyncio.create_task(_run_periodic(job), name=f"periodic:{job.name}")
+        for job in PERIODIC_JOBS
+    ]
+
+
+async def stop_scheduler(tasks: list[asyncio.Task]) -> None:
+    """Остановить периодические задачи."""
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,555 @@
+"""
+Seed Dataset
+============
+Синтетический набор данных для замеров производительности
+(get_posts, get_post_by_slug, авторизация) на объёмах, близких к боевым.
+
+Генерируются пользователи, теги, статьи, связи статей с тегами,
+лайки и деревья комментариев:
+- авторы, теги и комментаторы распределены по степенному закону
+  (Zipf): немногие авторы пишут большую часть статей, немногие теги
+  покрывают большую часть статей
+- длина статей, число лайков, комментариев и просмотров —
+  логнормальные, с длинным хвостом
+- статьи рендерятся (app.core.render) при генерации, как при создании
+  через API; у всех пользователей один пароль (--password),
+  user0 — администратор
+
+Набор детерминирован: каждая строка выводится из --seed и своего
+номера, поэтому результат не зависит от числа процессов и порядка
+загрузки (кроме соли хэша пароля). Время отсчитывается от --until,
+по умолчанию — начало текущих суток UTC.
+
+Загрузка — по таблицам в порядке внешних ключей (независимые таблицы
+одновременно). Пачки генерируются в пуле процессов и пишутся COPY
+параллельно по --workers соединениям на таблицу; каждый COPY —
+отдельная транзакция. Скрипт рассчитан на пустую базу: повторный
+запуск с тем же --seed упрётся в уникальные ключи.
+
+Запуск:
+    python -m app.jobs.seed --users 10000 --posts 100000 [--seed 42] [--workers 4]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import random
+import time
+import uuid
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from itertools import accumulate
+from typing import NamedTuple
+
+from slugify import slugify
+from sqlalchemy import text
+
+from app.core.render import RENDERER_VERSION, render_content
+from app.core.security import hash_password
+from app.db.redis import invalidate_tags_cache
+from app.db.session import engine
+from app.jobs.user_stats import refresh_user_stats
+from app.models.comment import Comment
+from app.models.like import Like
+from app.models.post import Post, PostStatus
+from app.models.tag import Tag, post_tags
+from app.models.user import User, UserRole
+from app.services.feed_service import invalidate_published_posts
+
+
+logger = logging.getLogger(__name__)
+
+USERS_CHUNK_SIZE = 5000
+POSTS_CHUNK_SIZE = 500
+
+# Пул движка — 5 + 10 соединений, одновременно грузятся до трёх таблиц
+MAX_WORKERS = 5
+
+STATUS_WEIGHTS = {PostStatus.PUBLISHED: 85, PostStatus.DRAFT: 12, PostStatus.SCHEDULED: 3}
+# Вероятности 0..5 тегов у статьи
+TAG_COUNT_WEIGHTS = [5, 20, 30, 25, 15, 5]
+
+AUTHOR_ZIPF = 1.1
+TAG_ZIPF = 1.0
+WORD_ZIPF = 0.9
+
+# Слов в статье: медиана и разброс логнормального распределения
+POST_WORDS_MEDIAN = 700
+POST_WORDS_SIGMA = 0.7
+POST_WORDS_MAX = 20_000
+
+# Доля комментариев-ответов; половина ответов — на последний
+# комментарий, так ветки уходят вглубь
+REPLY_PROBABILITY = 0.6
+
+VOCABULARY = """
+    the a of to and in is for on with that this it as by from at be are
+    api data query index cache server client request response database
+    table column row value key user post comment tag page list model
+    service function method class module object string number array
+    python postgres redis docker linux async await thread process memory
+    latency throughput performance benchmark profile test build deploy
+    release version update migration schema transaction lock commit
+    network socket http json markdown render template search token
+    session config error debug log metric trace event queue worker job
+    batch stream file image upload storage backup replica shard cluster
+    node pool connection timeout retry limit scale load balance proxy
+    security auth password hash encrypt sign verify permission role
+    design pattern refactor review code bug fix feature idea problem
+    solution example result simple fast slow large small new old good
+    better best first last next often always never usually really
+""".split()
+
+USER_COLUMNS = [
+    "id", "email", "username", "password_hash", "role", "bio",
+    "is_active", "is_verified", "created_at", "updated_at",
+]
+TAG_COLUMNS = ["id", "name", "slug", "description", "created_at", "updated_at"]
+POST_COLUMNS = [
+    "id", "author_id", "title", "slug", "content", "excerpt", "meta_description",
+    "content_html", "content_text", "word_count", "reading_time", "toc", "render_version",
+    "status", "view_count", "unique_view_count", "published_at", "publish_at",
+    "created_at", "updated_at",
+]
+POST_TAG_COLUMNS = ["post_id", "tag_id"]
+LIKE_COLUMNS = ["id", "user_id", "post_id", "created_at", "updated_at"]
+COMMENT_COLUMNS = [
+    "id", "post_id", "user_id", "parent_id", "content", "is_approved",
+    "created_at", "updated_at",
+]
+
+
+@dataclass(frozen=True)
+class SeedConfig:
+    """Параметры набора."""
+    
+    until: datetime
+    password_hash: str
+    seed: int = 42
+    users: int = 10_000
+    tags: int = 500
+    posts: int = 100_000
+    likes_per_post: float = 20.0
+    comments_per_post: float = 5.0
+    days: int = 730
+    workers: int = 4
+    
+    @property
+    def start(self) -> datetime:
+        return self.until - timedelta(days=self.days)
+
+
+class PostMeta(NamedTuple):
+    """Всё о статье, кроме текста: нужно и статьям, и лайкам с комментариями."""
+    
+    status: PostStatus
+    author: int
+    tags: list[int]
+    created_at: datetime
+    updated_at: datetime
+    published_at: datetime | None
+    publish_at: datetime | None
+    likes: int
+    comments: int
+    views: int
+    unique_views: int
+
+
+# === Случайные величины ===
+
+def _rng(config: SeedConfig, kind: str, index: int) -> random.Random:
+    """Генератор строки: зависит только от seed, вида и номера."""
+    return random.Random(f"{config.seed}:{kind}:{index}")
+
+
+def _uuid(config: SeedConfig, kind: str, key: int | str) -> uuid.UUID:
+    digest = hashlib.blake2b(f"{config.seed}:{kind}:{key}".encode(), digest_size=16).digest()
+    return uuid.UUID(bytes=digest, version=4)
+
+
+@lru_cache
+def _zipf_cum_weights(n: int, exponent: float) -> list[float]:
+    """Накопленные веса рангов: вес ранга r — 1 / r^exponent."""
+    return list(accumulate(1 / rank ** exponent for rank in range(1, n + 1)))
+
+
+def _zipf(rng: random.Random, n: int, exponent: float) -> int:
+    """Номер 0..n-1, младшие номера — самые частые."""
+    return rng.choices(range(n), cum_weights=_zipf_cum_weights(n, exponent))[0]
+
+
+def _lognormal_count(rng: random.Random, mean: float, sigma: float = 1.5) -> int:
+    """Неотрицательное целое с длинным хвостом и средним около mean."""
+    if mean <= 0:
+        return 0
+    return int(rng.lognormvariate(math.log(mean) - sigma ** 2 / 2, sigma))
+
+
+# === Текст ===
+
+def _words(rng: random.Random, count: int) -> list[str]:
+    return rng.choices(
+        VOCABULARY, cum_weights=_zipf_cum_weights(len(VOCABULARY), WORD_ZIPF), k=count
+    )
+
+
+def _title(rng: random.Random) -> str:
+    return " ".join(_words(rng, rng.randint(3, 9))).capitalize()
+
+
+def _sentence(rng: random.Random) -> str:
+    return " ".join(_words(rng, rng.randint(6, 18))).capitalize() + "."
+
+
+def _paragraph(rng: random.Random) -> str:
+    return " ".join(_sentence(rng) for _ in range(rng.randint(2, 8)))
+
+
+def _block(rng: random.Random) -> str:
+    """Абзац, изредка список или блок кода."""
+    roll = rng.random()
+    if roll < 0.08:
+        return "\n".join(f"- {_sentence(rng)}" for _ in range(rng.randint(2, 6)))
+    if roll < 0.12:
+        lines = [
+            f"{left} = {right}({arg})"
+            for left, right, arg in (_words(rng, 3) for _ in range(rng.randint(2, 12)))
+        ]
+        return "```python\n" + "\n".join(lines) + "\n```"
+    return _paragraph(rng)
+
+
+def _post_content(rng: random.Random, words: int) -> str:
+    """Markdown из разделов с заголовками h2."""
+    blocks: list[str] = []
+    written = 0
+    while written < words:
+        if blocks and rng.random() < 0.15:
+            blocks.append(f"## {_title(rng)}")
+        block = _block(rng)
+        blocks.append(block)
+        written += block.count(" ") + 1
+    return "\n\n".join(blocks)
+
+
+# === Строки таблиц ===
+
+def _user_created_at(config: SeedConfig, index: int) -> datetime:
+    """Пользователи регистрируются равномерно в первой половине периода."""
+    return config.start + (config.until - config.start) / 2 * (index / config.users)
+
+
+def _post_meta(config: SeedConfig, index: int) -> PostMeta:
+    rng = _rng(config, "post", index)
+    status = rng.choices(list(STATUS_WEIGHTS), weights=list(STATUS_WEIGHTS.values()))[0]
+    author = _zipf(rng, config.users, AUTHOR_ZIPF)
+    
+    tags: set[int] = set()
+    if config.tags:
+        count = rng.choices(range(len(TAG_COUNT_WEIGHTS)), weights=TAG_COUNT_WEIGHTS)[0]
+        while len(tags) < min(count, config.tags):
+            tags.add(_zipf(rng, config.tags, TAG_ZIPF))
+    
+    registered = _user_created_at(config, author)
+    written = registered + (config.until - registered) * rng.random()
+    created_at = max(registered, written - timedelta(hours=rng.uniform(0, 72)))
+    
+    published_at = publish_at = None
+    likes = comments = views = unique_views = 0
+    if status == PostStatus.PUBLISHED:
+        published_at = written
+        likes = min(_lognormal_count(rng, config.likes_per_post), config.users)
+        comments = _lognormal_count(rng, config.comments_per_post)
+        views = likes * rng.randint(10, 50) + rng.randint(0, 100)
+        unique_views = int(views * rng.uniform(0.4, 0.8))
+    elif status == PostStatus.SCHEDULED:
+        publish_at = config.until + timedelta(hours=rng.uniform(1, 30 * 24))
+    
+    updated_at = written
+    if rng.random() < 0.2:
+        updated_at += (config.until - written) * rng.random()
+    
+    return PostMeta(
+        status=status,
+        author=author,
+        tags=sorted(tags),
+        created_at=created_at,
+        updated_at=updated_at,
+        published_at=published_at,
+        publish_at=publish_at,
+        likes=likes,
+        comments=comments,
+        views=views,
+        unique_views=unique_views,
+    )
+
+
+def _post_range(config: SeedConfig, chunk: int) -> range:
+    return range(chunk * POSTS_CHUNK_SIZE, min((chunk + 1) * POSTS_CHUNK_SIZE, config.posts))
+
+
+def _user_rows(config: SeedConfig, chunk: int) -> list[tuple]:
+    rows = []
+    for index in range(chunk * USERS_CHUNK_SIZE, min((chunk + 1) * USERS_CHUNK_SIZE, config.users)):
+        rng = _rng(config, "user", index)
+        username = f"user{index}"
+        created_at = _user_created_at(config, index)
+        rows.append((
+            _uuid(config, "user", index),
+            f"{username}@example.com",
+            username,
+            config.password_hash,
+            (UserRole.ADMIN if index == 0 else UserRole.USER).name,
+            _sentence(rng) if rng.random() < 0.3 else None,
+            True,
+            rng.random() < 0.9,
+            created_at,
+            created_at,
+        ))
+    return rows
+
+
+def _tag_rows(config: SeedConfig, chunk: int) -> list[tuple]:
+    """Все теги одной пачкой; имена — слова словаря, дальше с номером."""
+    rows = []
+    for index in range(config.tags):
+        word = VOCABULARY[index % len(VOCABULARY)]
+        name = word if index < len(VOCABULARY) else f"{word}-{index // len(VOCABULARY)}"
+        rows.append((
+            _uuid(config, "tag", index),
+            name,
+            slugify(name, max_length=50),
+            None,
+            config.start,
+            config.start,
+        ))
+    return rows
+
+
+def _post_rows(config: SeedConfig, chunk: int) -> list[tuple]:
+    rows = []
+    for index in _post_range(config, chunk):
+        meta = _post_meta(config, index)
+        rng = _rng(config, "content", index)
+        title = _title(rng)
+        words = int(rng.lognormvariate(math.log(POST_WORDS_MEDIAN), POST_WORDS_SIGMA))
+        content = _post_content(rng, min(words, POST_WORDS_MAX))
+        rendered = render_content(content)
+        rows.append((
+            _uuid(config, "post", index),
+            _uuid(config, "user", meta.author),
+            title,
+            f"{slugify(title, max_length=200)}-{index}",
+            content,
+            rendered.excerpt(),
+            rendered.excerpt(160),
+            rendered.html,
+            rendered.text,
+            rendered.word_count,
+            rendered.reading_time,
+            json.dumps(rendered.toc),
+            RENDERER_VERSION,
+            meta.status.name,
+            meta.views,
+            meta.unique_views,
+            meta.published_at,
+            meta.publish_at,
+            meta.created_at,
+            meta.updated_at,
+        ))
+    return rows
+
+
+def _post_tag_rows(config: SeedConfig, chunk: int) -> list[tuple]:
+    return [
+        (_uuid(config, "post", index), _uuid(config, "tag", tag))
+        for index in _post_range(config, chunk)
+        for tag in _post_meta(config, index).tags
+    ]
+
+
+def _like_rows(config: SeedConfig, chunk: int) -> list[tuple]:
+    """Лайки опубликованных статей, большая часть — вскоре после публикации."""
+    rows = []
+    for index in _post_range(config, chunk):
+        meta = _post_meta(config, index)
+        if not meta.likes:
+            continue
+        
+        rng = _rng(config, "likes", index)
+        post_id = _uuid(config, "post", index)
+        age = config.until - meta.published_at
+        for number, user in enumerate(rng.sample(range(config.users), meta.likes)):
+            created_at = meta.published_at + age * rng.random() ** 3
+            rows.append((
+                _uuid(config, "like", f"{index}:{number}"),
+                _uuid(config, "user", user),
+                post_id,
+                created_at,
+                created_at,
+            ))
+    return rows
+
+
+def _comment_rows(config: SeedConfig, chunk: int) -> list[tuple]:
+    """
+    Деревья комментариев опубликованных статей.
+    
+    Все комментарии статьи попадают в одну пачку, родитель — раньше
+    ответа, так что внешний ключ parent_id выполняется внутри COPY.
+    """
+    rows = []
+    for index in _post_range(config, chunk):
+        meta = _post_meta(config, index)
+        if not meta.comments:
+            continue
+        
+        rng = _rng(config, "comments", index)
+        post_id = _uuid(config, "post", index)
+        age = config.until - meta.published_at
+        times = sorted(meta.published_at + age * rng.random() ** 2 for _ in range(meta.comments))
+        
+        thread: list[uuid.UUID] = []
+        for number, created_at in enumerate(times):
+            parent_id = None
+            if thread and rng.random() < REPLY_PROBABILITY:
+                parent_id = thread[-1] if rng.random() < 0.5 else rng.choice(thread)
+            
+            comment_id = _uuid(config, "comment", f"{index}:{number}")
+            rows.append((
+                comment_id,
+                post_id,
+                _uuid(config, "user", _zipf(rng, config.users, AUTHOR_ZIPF)),
+                parent_id,
+                " ".join(_sentence(rng) for _ in range(rng.randint(1, 4))),
+                rng.random() > 0.02,
+                created_at,
+                created_at,
+            ))
+            thread.append(comment_id)
+    return rows
+
+
+# === Загрузка ===
+
+async def _load(
+    config: SeedConfig,
+    pool: ProcessPoolExecutor,
+    table: str,
+    columns: list[str],
+    generate: Callable[[SeedConfig, int], list[tuple]],
+    chunks: int,
+) -> int:
+    """Сгенерировать пачки в пуле процессов и записать их COPY по config.workers соединениям."""
+    loop = asyncio.get_running_loop()
+    pending = iter(range(chunks))
+    loaded = 0
+    
+    async def worker() -> None:
+        nonlocal loaded
+        async with engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            # Соединения берут номера пачек из общего итератора
+            for chunk in pending:
+                records = await loop.run_in_executor(pool, generate, config, chunk)
+                if records:
+                    await raw.driver_connection.copy_records_to_table(
+                        table, records=records, columns=columns
+                    )
+                loaded += len(records)
+    
+    started = time.monotonic()
+    async with asyncio.TaskGroup() as group:
+        for _ in range(min(config.workers, chunks)):
+            group.create_task(worker())
+    
+    logger.info("%s: %d rows in %.1fs", table, loaded, time.monotonic() - started)
+    return loaded
+
+
+async def seed(config: SeedConfig) -> dict[str, int]:
+    """
+    Сгенерировать и загрузить набор.
+    
+    Returns:
+        Число строк по таблицам
+    """
+    users_chunks = math.ceil(config.users / USERS_CHUNK_SIZE)
+    posts_chunks = math.ceil(config.posts / POSTS_CHUNK_SIZE)
+    
+    with ProcessPoolExecutor(max_workers=config.workers) as pool:
+        stages = [
+            [
+                (User.__tablename__, USER_COLUMNS, _user_rows, users_chunks),
+                (Tag.__tablename__, TAG_COLUMNS, _tag_rows, 1 if config.tags else 0),
+            ],
+            [(Post.__tablename__, POST_COLUMNS, _post_rows, posts_chunks)],
+            [
+                (post_tags.name, POST_TAG_COLUMNS, _post_tag_rows, posts_chunks),
+                (Like.__tablename__, LIKE_COLUMNS, _like_rows, posts_chunks),
+                (Comment.__tablename__, COMMENT_COLUMNS, _comment_rows, posts_chunks),
+            ],
+        ]
+        stats: dict[str, int] = {}
+        for stage in stages:
+            counts = await asyncio.gather(*(
+                _load(config, pool, table, columns, generate, chunks)
+                for table, columns, generate, chunks in stage
+            ))
+            stats.update(zip((table for table, *_ in stage), counts))
+    
+    # Статистика планировщика для замеров, счётчики и кэши,
+    # которые обычно обновляются при записи через API
+    async with engine.begin() as conn:
+        await conn.execute(text("ANALYZE " + ", ".join(stats)))
+    await refresh_user_stats()
+    await invalidate_tags_cache()
+    await invalidate_published_posts(0.0, shift=True)
+    
+    logger.info("Seeded: %s", stats)
+    return stats
+
+
+def _parse_until(value: str) -> datetime:
+    until = datetime.fromisoformat(value)
+    return until if until.tzinfo else until.replace(tzinfo=timezone.utc)
+
+
+if __name__ == "__main__":
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    
+    parser = argparse.ArgumentParser(description="Generate a synthetic dataset")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--tags", type=int, default=500)
+    parser.add_argument("--posts", type=int, default=100_000)
+    parser.add_argument("--likes-per-post", type=float, default=20.0, help="Среднее на опубликованную статью")
+    parser.add_argument("--comments-per-post", type=float, default=5.0, help="Среднее на опубликованную статью")
+    parser.add_argument("--days", type=int, default=730, help="Длина периода до --until")
+    parser.add_argument("--until", type=_parse_until, default=today, help="Конец периода (ISO 8601)")
+    parser.add_argument("--password", default="password123", help="Пароль всех пользователей")
+    parser.add_argument("--workers", type=int, default=4, choices=range(1, MAX_WORKERS + 1))
+    args = parser.parse_args()
+    
+    if args.users < 1:
+        parser.error("--users must be at least 1")
+    
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(seed(SeedConfig(
+        until=args.until,
+        password_hash=hash_password(args.password),
+        seed=args.seed,
+        users=args.users,
+        tags=args.tags,
+        posts=args.posts,
+        likes_per_post=args.likes_per_post,
+        comments_per_post=args.comments_per_post,
+        days=args.days,
+        workers=args.workers,
+    )))
@@ -0,0 +1,319 @@
+"""
+Static Export Job
+=================
+Статический снимок опубликованного контента для отдачи через CDN.
+
+В STATIC_EXPORT_DIR пишутся те же JSON, что отдаёт API анонимному
+читателю:
+    posts/{slug}.json               GET /posts/{slug}
+    pages/{n}.json                  GET /posts?page=n
+    tags/{slug}/pages/{n}.json      GET /posts?tag=slug&page=n
+    tags.json                       GET /tags
+    manifest.json                   файлы с sha256 и размером
+
+Экспорт инкрементальный: список опубликованных статей (id, slug,
+updated_at) сравнивается с манифестом прошлого запуска, заново
+пишутся только изменённые статьи, первые страницы ленты и страницы
+тегов, в которых что-то поменялось. Файлы пишутся атомарно
+(временный файл + rename), манифест — последним.
+
+Счётчики лайков и комментариев в снимке обновляются при следующей
+правке статьи или полном экспорте (--full).
+
+Запуск:
+    python -m app.jobs.static_export [--full]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+from uuid import UUID
+
+from pydantic import BaseModel
+from sqlalchemy import func, select
+from sqlalchemy.orm import raiseload, selectinload
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.db.session import async_session_maker
+from app.models.comment import Comment
+from app.models.like import Like
+from app.models.post import Post, PostStatus
+from app.schemas.post import PostDetailResponse, PostListResponse
+from app.schemas.tag import TagListResponse
+from app.services.post_service import PostService
+from app.services.tag_service import TagService
+
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+BATCH_SIZE = 100
+
+
+def _dump(model: BaseModel) -> bytes:
+    return json.dumps(
+        model.model_dump(mode="json"), ensure_ascii=False, separators=(",", ":")
+    ).encode()
+
+
+def _post_details_query(post_ids: list[UUID]):
+    """
+    Статьи с автором, тегами и счётчиками.
+    
+    Лайки и комментарии считаются подзапросами: selectin-связи
+    моделей иначе тянут их целиком вместе с авторами и ответами.
+    Прочие связи запрещены (raiseload), чтобы новая не загрузилась молча.
+    Статья, снятая с публикации после списка id, не возвращается.
+    """
+    likes = select(func.count()).where(Like.post_id == Post.id).scalar_subquery()
+    comments = select(func.count()).where(Comment.post_id == Post.id).scalar_subquery()
+    
+    return (
+        select(Post, likes.label("likes_count"), comments.label("comments_count"))
+        .options(
+            selectinload(Post.author).raiseload("*"),
+            selectinload(Post.tags).raiseload("*"),
+            raiseload("*"),
+        )
+        .where(
+            Post.id.in_(post_ids),
+            Post.status == PostStatus.PUBLISHED,
+            Post.deleted_at.is_(None),
+        )
+    )
+
+
+def _post_detail(post: Post, likes_count: int, comments_count: int) -> PostDetailResponse:
+    fields = {
+        name: getattr(post, name)
+        for name in PostDetailResponse.model_fields
+        if name not in ("likes_count", "comments_count")
+    }
+    return PostDetailResponse.model_validate(
+        {**fields, "likes_count": likes_count, "comments_count": comments_count},
+        from_attributes=True,
+    )
+
+
+class StaticExporter:
+    """Запись файлов снимка и учёт их в манифесте."""
+    
+    def __init__(self, root: Path, manifest: dict[str, Any]):
+        self.root = root
+        self.files: dict[str, dict[str, Any]] = manifest.get("files", {})
+        self.written = 0
+        self.removed = 0
+    
+    def write_bytes(self, path: str, data: bytes) -> None:
+        target = self.root / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        
+        fd, tmp = tempfile.mkstemp(dir=target.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(tmp, target)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    
+    async def write(self, path: str, model: BaseModel) -> None:
+        """Записать файл, если содержимое изменилось."""
+        data = _dump(model)
+        digest = hashlib.sha256(data).hexdigest()
+        if self.files.get(path, {}).get("sha256") == digest:
+            return
+        
+        await run_in_threadpool(self.write_bytes, path, data)
+        self.files[path] = {"sha256": digest, "size": len(data)}
+        self.written += 1
+    
+    async def remove(self, path: str) -> None:
+        if self.files.pop(path, None) is None:
+            return
+        
+        await run_in_threadpool((self.root / path).unlink, missing_ok=True)
+        self.removed += 1
+    
+    async def remove_prefix(self, prefix: str, keep: set[str]) -> None:
+        """Удалить файлы под prefix, кроме keep (лишние страницы списков)."""
+        for path in [path for path in self.files if path.startswith(prefix)]:
+            if path not in keep:
+                await self.remove(path)
+
+
+def _load_manifest(root: Path) -> dict[str, Any]:
+    try:
+        manifest = json.loads((root / "manifest.json").read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest
+
+
+async def _export_pages(
+    exporter: StaticExporter,
+    db,
+    prefix: str,
+    tag_slug: str | None = None,
+) -> int:
+    """Первые STATIC_EXPORT_PAGES страниц списка; возвращает число статей."""
+    service = PostService(db)
+    per_page = settings.static_export_per_page
+    keep: set[str] = set()
+    total = 0
+    
+    for page in range(1, settings.static_export_pages + 1):
+        posts, total = await service.get_posts(
+            page=page,
+            per_page=per_page,
+            tag_slugs=[tag_slug] if tag_slug else None,
+        )
+        pages = (total + per_page - 1) // per_page
+        if page > max(pages, 1):
+            break
+        
+        path = f"{prefix}{page}.json"
+        await exporter.write(path, PostListResponse(
+            items=posts,
+            total=total,
+            page=page,
+            per_page=per_page,
+            pages=pages,
+        ))
+        keep.add(path)
+    
+    await exporter.remove_prefix(prefix, keep)
+    return total
+
+
+async def export_static(full: bool = False, batch_size: int = BATCH_SIZE) -> dict[str, int]:
+    """
+    Обновить статический снимок.
+    
+    Args:
+        full: пересобрать все статьи, а не только изменённые
+            (файлы с прежним содержимым всё равно не перезаписываются)
+    
+    Returns:
+        Счётчики: статей экспортировано, удалено, файлов записано, удалено
+    """
+    root = Path(settings.static_export_dir)
+    root.mkdir(parents=True, exist_ok=True)
+    
+    manifest = await run_in_threadpool(_load_manifest, root)
+    exporter = StaticExporter(root, manifest)
+    previous: dict[str, dict[str, Any]] = manifest.get("posts", {})
+    
+    async with async_session_maker() as db:
+        result = await db.execute(
+            select(Post.id, Post.slug, Post.updated_at)
+            .where(Post.status == PostStatus.PUBLISHED, Post.deleted_at.is_(None))
+        )
+        current = {
+            str(post_id): {"slug": slug, "updated_at": updated_at.isoformat()}
+            for post_id, slug, updated_at in result
+        }
+    
+    changed = list(current) if full else [
+        post_id for post_id, state in current.items()
+        if previous.get(post_id, {}).get("updated_at") != state["updated_at"]
+        or previous[post_id]["slug"] != state["slug"]
+    ]
+    removed = [post_id for post_id in previous if post_id not in current]
+    
+    posts: dict[str, dict[str, Any]] = {
+        post_id: state for post_id, state in previous.items() if post_id in current
+    }
+    affected_tags: set[str] = set()
+    
+    # Снятые с публикации и удалённые
+    for post_id in removed:
+        state = previous[post_id]
+        await exporter.remove(f"posts/{state['slug']}.json")
+        affected_tags.update(state.get("tags", []))
+    
+    # Изменённые и новые — пачками, каждая в своей сессии
+    for start in range(0, len(changed), batch_size):
+        batch = changed[start:start + batch_size]
+        async with async_session_maker() as db:
+            result = await db.execute(
+                _post_details_query([UUID(post_id) for post_id in batch])
+            )
+            exported = set()
+            for post, likes_count, comments_count in result:
+                post_id = str(post.id)
+                exported.add(post_id)
+                old = previous.get(post_id)
+                if old and old["slug"] != post.slug:
+                    await exporter.remove(f"posts/{old['slug']}.json")
+                
+                tags = sorted(tag.slug for tag in post.tags)
+                affected_tags.update(tags)
+                if old:
+                    affected_tags.update(old.get("tags", []))
+                
+                await exporter.write(
+                    f"posts/{post.slug}.json", _post_detail(post, likes_count, comments_count)
+                )
+                # updated_at из списка: статья могла измениться после него,
+                # тогда следующий запуск экспортирует её ещё раз
+                posts[post_id] = {**current[post_id], "tags": tags}
+            
+            # Сняты с публикации или удалены после списка: в манифест не попадают,
+            # прежний файл удаляется сразу
+            for post_id in set(batch) - exported:
+                old = posts.pop(post_id, None)
+                if old:
+                    await exporter.remove(f"posts/{old['slug']}.json")
+                    affected_tags.update(old.get("tags", []))
+    
+    if full or changed or removed:
+        async with async_session_maker() as db:
+            await _export_pages(exporter, db, "pages/")
+            
+            tags = await TagService(db).get_tags()
+            await exporter.write("tags.json", TagListResponse(items=tags, total=len(tags)))
+            
+            for tag_slug in sorted(affected_tags):
+                total = await _export_pages(exporter, db, f"tags/{tag_slug}/pages/", tag_slug)
+                if total == 0:
+                    await exporter.remove_prefix(f"tags/{tag_slug}/", set())
+        
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "posts": posts,
+            "files": dict(sorted(exporter.files.items())),
+        }
+        data = json.dumps(manifest, ensure_ascii=False, indent=1).encode()
+        await run_in_threadpool(exporter.write_bytes, "manifest.json", data)
+    
+    stats = {
+        "posts_exported": len(changed),
+        "posts_removed": len(removed),
+        "files_written": exporter.written,
+        "files_removed": exporter.removed,
+    }
+    if changed or removed:
+        logger.info("Static export: %s", stats)
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export published content as static JSON")
+    parser.add_argument("--full", action="store_true", help="Пересобрать все статьи")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(export_static(full=args.full, batch_size=args.batch_size))
@@ -0,0 +1,40 @@
+"""
+Job Definitions
+===============
+Фоновые задачи, выполняемые через очередь (app.jobs.queue).
+
+Ставятся в очередь из обработчиков запросов:
+    await update_related_posts.enqueue(post.id)
+"""
+
+from app.jobs.accounts import run_account_job
+from app.jobs.queue import job
+from app.jobs.related_posts import rebuild_related_posts, update_related_for_post
+from app.services.email_service import deliver_email
+
+
+update_related_posts = job("related_posts.update")(update_related_for_post)
+
+rebuild_related_posts_index = job(
+    "related_posts.rebuild",
+    queue="maintenance",
+    max_retries=1,
+    timeout=None,
+)(rebuild_related_posts)
+
+# Задача сама сохраняет прогресс и подхватывается планировщиком,
+# поэтому очередь её не повторяет и не ограничивает по времени
+process_account = job(
+    "accounts.process",
+    queue="maintenance",
+    max_retries=0,
+    timeout=None,
+)(run_account_job)
+
+# Письма: временные ошибки SMTP повторяются с backoff 30с, 1м, 2м, ...
+send_email = job(
+    "email.send",
+    queue="email",
+    max_retries=6,
+    retry_backoff=30.0,
+)(deliver_email)
@@ -0,0 +1,104 @@
+"""
+Unique Views Job
+================
+Запись оценок уникальных читателей из HyperLogLog (Redis) в БД.
+
+Обрабатываются только посты, у которых были просмотры
+с прошлого запуска (множество uv:dirty). Отметка хранит день
+просмотра, поэтому после полуночи записывается и итог вчерашнего дня.
+
+Запуск:
+    python -m app.jobs.unique_views
+"""
+
+import asyncio
+import logging
+import uuid
+from uuid import UUID
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from app.db.redis import count_unique_views_batch, pop_dirty_unique_views
+from app.db.session import async_session_maker
+from app.models.analytics import PostUniqueViewsDaily
+from app.models.post import Post
+
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+posts_table = Post.__table__
+
+# executemany; updated_at не меняется — просмотры не правка статьи
+_update_counts = (
+    update(posts_table)
+    .where(posts_table.c.id == bindparam("b_id"))
+    .values(
+        unique_view_count=bindparam("b_total"),
+        updated_at=posts_table.c.updated_at,
+    )
+)
+
+
+async def persist_unique_views(batch_size: int = BATCH_SIZE) -> int:
+    """
+    Записать оценки уникальных читателей.
+    
+    Returns:
+        Количество обработанных отметок (пост, день)
+    """
+    processed = 0
+    
+    while entries := await pop_dirty_unique_views(batch_size):
+        counts = await count_unique_views_batch(entries)
+        
+        async with async_session_maker() as db:
+            # Посты могли быть удалены после просмотра
+            post_ids = {UUID(post_id) for post_id, _ in entries}
+            result = await db.execute(select(Post.id).where(Post.id.in_(list(post_ids))))
+            alive = set(result.scalars().all())
+            rows = [
+                (UUID(post_id), day, total, daily)
+                for (post_id, day), (total, daily) in zip(entries, counts)
+                if UUID(post_id) in alive
+            ]
+            
+            if rows:
+                # Пост может прийти за два дня — итог за всё время один
+                totals = {post_id: total for post_id, _, total, _ in rows}
+                await db.execute(
+                    _update_counts,
+                    [{"b_id": post_id, "b_total": total} for post_id, total in totals.items()],
+                )
+                
+                stmt = insert(PostUniqueViewsDaily).values([
+                    {
+                        "id": uuid.uuid4(),
+                        "post_id": post_id,
+                        "day": day,
+                        "unique_viewers": daily,
+                    }
+                    for post_id, day, _, daily in rows
+                ])
+                await db.execute(
+                    stmt.on_conflict_do_update(
+                        constraint="uq_post_unique_views_day",
+                        set_={
+                            "unique_viewers": stmt.excluded.unique_viewers,
+                            "updated_at": func.now(),
+                        },
+                    )
+                )
+                await db.commit()
+        
+        processed += len(entries)
+    
+    logger.info("Persisted unique views for %d post-days", processed)
+    return processed
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(persist_unique_views())
@@ -0,0 +1,43 @@
+"""
+User Stats Job
+==============
+Обновление материализованного представления user_stats_mv.
+
+Запуск:
+    python -m app.jobs.user_stats
+"""
+
+import asyncio
+import logging
+
+from sqlalchemy import text
+
+from app.db.session import engine
+from app.models.user_stats import (
+    CREATE_USER_STATS_MV,
+    CREATE_USER_STATS_MV_INDEX,
+    REFRESH_USER_STATS_MV,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+async def refresh_user_stats() -> None:
+    """
+    Обновить статистику авторов без блокировки чтения.
+    
+    Представление создаётся при первом запуске, если его
+    ещё нет (например, схема накатывалась миграциями).
+    """
+    async with engine.begin() as conn:
+        await conn.execute(text(CREATE_USER_STATS_MV))
+        await conn.execute(text(CREATE_USER_STATS_MV_INDEX))
+        await conn.execute(text(REFRESH_USER_STATS_MV))
+    
+    logger.info("user_stats_mv refreshed")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(refresh_user_stats())
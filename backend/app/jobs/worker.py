@@ -0,0 +1,348 @@
+"""
+Job Worker
+==========
+Исполнитель задач из Redis Streams (app.jobs.queue).
+
+- Параллельность ограничена отдельно для каждой очереди
+- Ошибка -> повтор с экспоненциальным backoff, после max_retries -> dead-letter
+- Выполняемые сообщения периодически «продлеваются» (XCLAIM),
+  поэтому чужие сообщения забираются только у упавших воркеров:
+  после JOB_VISIBILITY_TIMEOUT без продления
+- Сообщение, которое раз за разом роняет воркеры, уходит в dead-letter
+
+Запуск:
+    python -m app.jobs.worker
+    python -m app.jobs.worker --queue default=8 --queue email=2
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import socket
+import time
+from typing import Any
+
+from app.config import settings
+from app.core.mailer import mailer
+from app.db.redis import close_redis, get_redis
+from app.jobs import tasks  # noqa: F401  регистрирует задачи
+from app.jobs.queue import (
+    DEAD_LETTER_MAXLEN,
+    GROUP,
+    dead_key,
+    delayed_key,
+    ensure_group,
+    metrics_key,
+    promote_delayed,
+    registry,
+    stream_key,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    """Воркер очередей задач."""
+    
+    def __init__(self, queues: dict[str, int], consumer: str | None = None):
+        self.queues = queues
+        self.consumer = consumer or f"{socket.gethostname()}:{os.getpid()}"
+        self.visibility_ms = settings.job_visibility_timeout * 1000
+        
+        self._slots = {queue: asyncio.Semaphore(limit) for queue, limit in queues.items()}
+        self._inflight: dict[str, set[str]] = {queue: set() for queue in queues}
+        self._tasks: set[asyncio.Task] = set()
+        self._loops: list[asyncio.Task] = []
+        self._stopping = False
+    
+    # === Жизненный цикл ===
+    
+    async def start(self) -> None:
+        for queue in self.queues:
+            await ensure_group(queue)
+            self._loops.append(asyncio.create_task(self._read_loop(queue), name=f"jobs:read:{queue}"))
+        
+        self._loops.append(asyncio.create_task(self._maintenance_loop(), name="jobs:maintenance"))
+        logger.info("Worker %s started: %s", self.consumer, self.queues)
+    
+    async def stop(self, grace: float = 30.0) -> None:
+        """Перестать брать задачи и дождаться выполняемых (не дольше grace)."""
+        self._stopping = True
+        for task in self._loops:
+            task.cancel()
+        await asyncio.gather(*self._loops, return_exceptions=True)
+        self._loops.clear()
+        
+        if self._tasks:
+            _, pending = await asyncio.wait(self._tasks, timeout=grace)
+            # Не успевшие задачи отменяются до закрытия соединений: их сообщения
+            # остаются в PEL и будут забраны после visibility timeout
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        
+        await mailer.close()
+        logger.info("Worker %s stopped", self.consumer)
+    
+    # === Чтение очереди ===
+    
+    async def _read_loop(self, queue: str) -> None:
+        redis = await get_redis()
+        slots = self._slots[queue]
+        reclaim_every = max(1.0, settings.job_visibility_timeout / 3)
+        last_reclaim = 0.0
+        
+        while not self._stopping:
+            free = 0
+            try:
+                # Ждём хотя бы один свободный слот, читаем не больше свободных
+                await slots.acquire()
+                free = 1
+                while not slots.locked():
+                    await slots.acquire()
+                    free += 1
+                
+                # Сообщения упавших воркеров забираются в те же слоты, что и новые:
+                # иначе занятый чтением воркер никогда не доходит до них
+                if time.monotonic() - last_reclaim >= reclaim_every:
+                    last_reclaim = time.monotonic()
+                    for message_id, fields in await self._reclaim(queue, free):
+                        self._spawn(queue, message_id, fields)
+                        free -= 1
+                    if not free:
+                        continue
+                
+                response = await redis.xreadgroup(
+                    GROUP,
+                    self.consumer,
+                    {stream_key(queue): ">"},
+                    count=free,
+                    block=settings.job_block_ms,
+                )
+                messages = response[0][1] if response else []
+                
+                for message_id, fields in messages:
+                    self._spawn(queue, message_id, fields)
+                    free -= 1
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Failed to read queue %s", queue)
+                await asyncio.sleep(1)
+            finally:
+                for _ in range(free):
+                    slots.release()
+    
+    def _spawn(self, queue: str, message_id: str, fields: dict[str, str]) -> None:
+        """Запустить выполнение сообщения (слот уже занят)."""
+        self._inflight[queue].add(message_id)
+        task = asyncio.create_task(self._process(queue, message_id, fields))
+        self._tasks.add(task)
+        
+        def done(_: asyncio.Task) -> None:
+            self._tasks.discard(task)
+            self._inflight[queue].discard(message_id)
+            self._slots[queue].release()
+        
+        task.add_done_callback(done)
+    
+    # === Выполнение ===
+    
+    async def _process(self, queue: str, message_id: str, fields: dict[str, str]) -> None:
+        redis = await get_redis()
+        name = fields.get("job", "")
+        attempt = int(fields.get("attempt", 0))
+        definition = registry.get(name)
+        
+        if definition is None:
+            await self._dead_letter(queue, message_id, fields, f"Unknown job {name!r}")
+            return
+        
+        started = time.time()
+        latency_ms = (started - float(fields.get("enqueued_at", started))) * 1000
+        
+        try:
+            await asyncio.wait_for(definition.run(fields["args"]), timeout=definition.timeout)
+        except asyncio.CancelledError:
+            # Остановка воркера: сообщение остаётся в PEL
+            raise
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+            
+            if attempt < definition.max_retries:
+                delay = definition.retry_backoff * 2 ** attempt
+                logger.warning(
+                    "Job %s %s failed (attempt %d), retry in %.0fs: %s",
+                    name, message_id, attempt + 1, delay, error,
+                )
+                retry = json.dumps({"job": name, "args": fields["args"], "attempt": attempt + 1})
+                
+                pipe = redis.pipeline(transaction=True)
+                pipe.zadd(delayed_key(queue), {retry: time.time() + delay})
+                pipe.xack(stream_key(queue), GROUP, message_id)
+                pipe.xdel(stream_key(queue), message_id)
+                pipe.hincrby(metrics_key(name), "retried", 1)
+                await pipe.execute()
+            else:
+                logger.error("Job %s %s failed permanently: %s", name, message_id, error)
+                await self._dead_letter(queue, message_id, fields, error)
+            return
+        
+        runtime_ms = (time.time() - started) * 1000
+        
+        pipe = redis.pipeline(transaction=True)
+        pipe.xack(stream_key(queue), GROUP, message_id)
+        pipe.xdel(stream_key(queue), message_id)
+        pipe.hincrby(metrics_key(name), "completed", 1)
+        pipe.hincrbyfloat(metrics_key(name), "latency_ms", latency_ms)
+        pipe.hincrbyfloat(metrics_key(name), "runtime_ms", runtime_ms)
+        await pipe.execute()
+    
+    async def _dead_letter(
+        self,
+        queue: str,
+        message_id: str,
+        fields: dict[str, Any],
+        error: str,
+    ) -> None:
+        """Переложить сообщение в dead-letter stream."""
+        redis = await get_redis()
+        
+        pipe = redis.pipeline(transaction=True)
+        pipe.xadd(
+            dead_key(queue),
+            {**fields, "error": error, "failed_at": str(time.time())},
+            maxlen=DEAD_LETTER_MAXLEN,
+            approximate=True,
+        )
+        pipe.xack(stream_key(queue), GROUP, message_id)
+        pipe.xdel(stream_key(queue), message_id)
+        pipe.hincrby(metrics_key(fields.get("job", "unknown")), "dead", 1)
+        await pipe.execute()
+    
+    # === Обслуживание ===
+    
+    async def _maintenance_loop(self) -> None:
+        """Повторы и продление своих сообщений (чужие забирает цикл чтения)."""
+        heartbeat_every = max(1.0, settings.job_visibility_timeout / 3)
+        last_heartbeat = 0.0
+        
+        while not self._stopping:
+            try:
+                for queue in self.queues:
+                    await promote_delayed(queue)
+                
+                now = time.monotonic()
+                if now - last_heartbeat >= heartbeat_every:
+                    await self._heartbeat()
+                    last_heartbeat = now
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Job queue maintenance failed")
+            
+            await asyncio.sleep(1)
+    
+    async def _heartbeat(self) -> None:
+        """Сбросить idle своих выполняемых сообщений (XCLAIM JUSTID себе же)."""
+        redis = await get_redis()
+        for queue, message_ids in self._inflight.items():
+            if message_ids:
+                await redis.xclaim(
+                    stream_key(queue),
+                    GROUP,
+                    self.consumer,
+                    min_idle_time=0,
+                    message_ids=list(message_ids),
+                    justid=True,
+                )
+    
+    async def _reclaim(self, queue: str, limit: int) -> list[tuple[str, dict[str, str]]]:
+        """
+        Забрать до limit сообщений, не продлевавшихся дольше visibility timeout.
+        
+        Слоты под них уже заняты циклом чтения. Сообщение, которое
+        раз за разом роняет воркеры, сразу уходит в dead-letter.
+        """
+        redis = await get_redis()
+        reclaimed = []
+        
+        pending = await redis.xpending_range(
+            stream_key(queue),
+            GROUP,
+            min="-",
+            max="+",
+            count=limit,
+            idle=self.visibility_ms,
+        )
+        
+        for entry in pending:
+            if entry["message_id"] in self._inflight[queue]:
+                continue
+            
+            claimed = await redis.xclaim(
+                stream_key(queue),
+                GROUP,
+                self.consumer,
+                min_idle_time=self.visibility_ms,
+                message_ids=[entry["message_id"]],
+            )
+            if not claimed or claimed[0][1] is None:
+                # Забрал другой воркер или сообщение удалено
+                continue
+            
+            message_id, fields = claimed[0]
+            definition = registry.get(fields.get("job", ""))
+            max_deliveries = (definition.max_retries if definition else 0) + 2
+            
+            if entry["times_delivered"] >= max_deliveries:
+                await self._dead_letter(queue, message_id, fields, "Worker crashed while processing")
+                continue
+            
+            logger.warning("Reclaimed job %s from %s", message_id, entry["consumer"])
+            reclaimed.append((message_id, fields))
+        
+        return reclaimed
+
+
+def parse_queues(values: list[str] | None) -> dict[str, int]:
+    """--queue name=concurrency -> {name: concurrency}."""
+    if not values:
+        return dict(settings.job_queues)
+    
+    queues = {}
+    for value in values:
+        name, _, limit = value.partition("=")
+        queues[name] = int(limit or 1)
+    return queues
+
+
+async def main(queues: dict[str, int]) -> None:
+    worker = Worker(queues)
+    await worker.start()
+    
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    
+    await stop.wait()
+    await worker.stop()
+    await close_redis()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run background job worker")
+    parser.add_argument(
+        "--queue",
+        action="append",
+        help="Очередь и лимит параллельности, например default=4 (можно несколько)",
+    )
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(parse_queues(args.queue)))
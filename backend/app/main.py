@@ -9,14 +9,20 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from fastapi.staticfiles import StaticFiles
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
 
+from app.api.feeds import router as feeds_router
 from app.api.v1.router import router as api_router
 from app.config import settings
 from app.core.exceptions import BlogException
+from app.core.images import shutdown_process_pool
+from app.db.events import ensure_event_partitions, event_buffer
 from app.db.redis import close_redis
+from app.jobs.scheduler import start_scheduler, stop_scheduler
+from app.jobs.worker import Worker
 
 
 # Rate limiter
@@ -30,9 +36,21 @@ async def lifespan(app: FastAPI):
     """
     # Startup
     print("🚀 Starting Blog API...")
+    periodic_tasks = start_scheduler() if settings.scheduler_enabled else []
+    if settings.events_enabled:
+        await ensure_event_partitions()
+        event_buffer.start()
+    worker = Worker(settings.job_queues) if settings.job_worker_in_process else None
+    if worker is not None:
+        await worker.start()
     yield
     # Shutdown
     print("👋 Shutting down...")
+    await stop_scheduler(periodic_tasks)
+    if worker is not None:
+        await worker.stop()
+    await event_buffer.stop()
+    shutdown_process_pool()
     await close_redis()
 
 
@@ -77,6 +95,14 @@ async def blog_exception_handler(request: Request, exc: BlogException):
 
 # Подключаем роутеры
 app.include_router(api_router, prefix="/api")
+app.include_router(feeds_router)
+
+# Загруженные изображения (в production отдаются nginx/CDN напрямую)
+app.mount(
+    settings.media_url_prefix,
+    StaticFiles(directory=settings.media_dir, check_dir=False),
+    name="media",
+)
 
 
 # Health check
@@ -9,6 +9,21 @@ from app.models.post import Post, PostStatus
 from app.models.comment import Comment
 from app.models.like import Like
 from app.models.tag import Tag, post_tags
+from app.models.related_post import RelatedPost
+from app.models.post_fingerprint import PostFingerprint, PostLSHBand
+from app.models.post_revision import PostRevision
+from app.models.event import events
+from app.models.user_stats import user_stats_mv
+from app.models.account_job import AccountJob, AccountJobMode, AccountJobStatus
+from app.models.digest import DigestRun, DigestRunStatus
+from app.models.media import Media
+from app.models.analytics import (
+    PostStatsDaily,
+    PostStatsHourly,
+    PostStatsMonthly,
+    PostUniqueViewsDaily,
+    StatFlushBatch,
+)
 
 __all__ = [
     "User",
@@ -19,4 +34,21 @@ __all__ = [
     "Like",
     "Tag",
     "post_tags",
+    "RelatedPost",
+    "PostFingerprint",
+    "PostLSHBand",
+    "PostRevision",
+    "PostUniqueViewsDaily",
+    "PostStatsHourly",
+    "PostStatsDaily",
+    "PostStatsMonthly",
+    "StatFlushBatch",
+    "events",
+    "user_stats_mv",
+    "AccountJob",
+    "AccountJobMode",
+    "AccountJobStatus",
+    "DigestRun",
+    "DigestRunStatus",
+    "Media",
 ]
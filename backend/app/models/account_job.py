@@ -0,0 +1,108 @@
+"""
+Account Job Model
+=================
+Фоновая деактивация / анонимизация / удаление аккаунта.
+"""
+
+import enum
+from datetime import datetime
+
+from sqlalchemy import DateTime, Enum, ForeignKey, Index, Integer, Text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class AccountJobMode(str, enum.Enum):
+    """Что сделать с аккаунтом."""
+    DEACTIVATE = "deactivate"   # только заблокировать вход
+    ANONYMIZE = "anonymize"     # убрать персональные данные, статьи оставить
+    DELETE = "delete"           # удалить аккаунт и весь контент
+
+
+class AccountJobStatus(str, enum.Enum):
+    """Состояние задачи."""
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class AccountJob(Base):
+    """
+    Задача обработки аккаунта.
+    
+    Аккаунт блокируется сразу при создании задачи, а контент
+    обрабатывается пачками фоновой задачей app.jobs.accounts.
+    Счётчики обновляются после каждой пачки (прогресс для админки).
+    """
+    
+    __tablename__ = "account_jobs"
+    
+    # Пользователь удаляется в конце задачи, запись остаётся для истории
+    user_id: Mapped[str | None] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="SET NULL"),
+        nullable=True,
+        index=True,
+    )
+    
+    requested_by_id: Mapped[str | None] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+    
+    mode: Mapped[AccountJobMode] = mapped_column(
+        Enum(AccountJobMode),
+        nullable=False,
+    )
+    
+    status: Mapped[AccountJobStatus] = mapped_column(
+        Enum(AccountJobStatus),
+        default=AccountJobStatus.PENDING,
+        nullable=False,
+    )
+    
+    # Прогресс
+    posts_processed: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        nullable=False,
+    )
+    
+    comments_processed: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        nullable=False,
+    )
+    
+    likes_processed: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        nullable=False,
+    )
+    
+    # Обновляется после каждой пачки; зависшая задача подхватывается заново
+    heartbeat_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+    
+    finished_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+    
+    error: Mapped[str | None] = mapped_column(
+        Text,
+        nullable=True,
+    )
+    
+    __table_args__ = (
+        Index("ix_account_jobs_status", "status"),
+    )
+    
+    def __repr__(self) -> str:
+        return f"<AccountJob {self.mode.value} {self.user_id} {self.status.value}>"
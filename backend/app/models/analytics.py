@@ -0,0 +1,142 @@
+"""
+Analytics Models
+================
+Агрегированная статистика постов.
+"""
+
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, ForeignKey, Index, Integer, String, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class PostUniqueViewsDaily(Base):
+    """
+    Оценка уникальных читателей поста за день.
+    
+    Источник — дневной HyperLogLog в Redis, записывается
+    фоновой задачей app.jobs.unique_views.
+    """
+    
+    __tablename__ = "post_unique_views_daily"
+    
+    post_id: Mapped[str] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("posts.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    
+    day: Mapped[date] = mapped_column(
+        Date,
+        nullable=False,
+    )
+    
+    unique_viewers: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        nullable=False,
+    )
+    
+    __table_args__ = (
+        UniqueConstraint("post_id", "day", name="uq_post_unique_views_day"),
+    )
+    
+    def __repr__(self) -> str:
+        return f"<PostUniqueViewsDaily {self.post_id} {self.day}>"
+
+
+class PostStatsMixin:
+    """
+    Общие колонки таблиц агрегатов: пост, автор (денормализован
+    для статистики автора без join с posts) и счётчики событий.
+    """
+    
+    post_id: Mapped[str] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("posts.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    
+    author_id: Mapped[str] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    
+    views: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    likes: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    comments: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+
+class PostStatsHourly(PostStatsMixin, Base):
+    """
+    Почасовые счётчики поста за последние дни.
+    Сбрасываются из Redis компактором app.jobs.analytics.
+    """
+    
+    __tablename__ = "post_stats_hourly"
+    
+    bucket: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+    )
+    
+    __table_args__ = (
+        UniqueConstraint("post_id", "bucket", name="uq_post_stats_hourly"),
+        Index("ix_post_stats_hourly_author_bucket", "author_id", "bucket"),
+        Index("ix_post_stats_hourly_bucket", "bucket"),
+    )
+
+
+class PostStatsDaily(PostStatsMixin, Base):
+    """Дневные счётчики (свёрнутые из почасовых)."""
+    
+    __tablename__ = "post_stats_daily"
+    
+    bucket: Mapped[date] = mapped_column(
+        Date,
+        nullable=False,
+    )
+    
+    __table_args__ = (
+        UniqueConstraint("post_id", "bucket", name="uq_post_stats_daily"),
+        Index("ix_post_stats_daily_author_bucket", "author_id", "bucket"),
+        Index("ix_post_stats_daily_bucket", "bucket"),
+    )
+
+
+class PostStatsMonthly(PostStatsMixin, Base):
+    """Месячные счётчики (bucket = первое число месяца)."""
+    
+    __tablename__ = "post_stats_monthly"
+    
+    bucket: Mapped[date] = mapped_column(
+        Date,
+        nullable=False,
+    )
+    
+    __table_args__ = (
+        UniqueConstraint("post_id", "bucket", name="uq_post_stats_monthly"),
+        Index("ix_post_stats_monthly_author_bucket", "author_id", "bucket"),
+    )
+
+
+class StatFlushBatch(Base):
+    """
+    Пачка почасовых счётчиков из Redis, уже записанная в post_stats_hourly.
+    
+    Отметка пишется в одной транзакции со счётчиками: если задача
+    упала после commit, но до удаления пачки из Redis, повторный
+    сброс той же пачки пропускается.
+    """
+    
+    __tablename__ = "stat_flush_batches"
+    
+    batch_id: Mapped[str] = mapped_column(
+        String(64),
+        unique=True,
+        nullable=False,
+    )
@@ -68,6 +68,7 @@ class Comment(Base):
         back_populates="parent",
         lazy="selectin",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     parent = relationship(
         "Comment",
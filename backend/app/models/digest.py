@@ -0,0 +1,87 @@
+"""
+Digest Run Model
+================
+Запуски еженедельной рассылки с контрольной точкой.
+"""
+
+import enum
+from datetime import datetime
+
+from sqlalchemy import DateTime, Enum, Integer, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class DigestRunStatus(str, enum.Enum):
+    """Состояние рассылки."""
+    RUNNING = "running"
+    COMPLETED = "completed"
+
+
+class DigestRun(Base):
+    """
+    Рассылка дайджеста за неделю.
+    
+    Получатели обходятся по возрастанию users.id, после каждой
+    пачки сохраняется last_user_id — после падения рассылка
+    продолжается с места остановки, а не начинается заново.
+    """
+    
+    __tablename__ = "digest_runs"
+    
+    # ISO неделя, за которую собраны статьи: 2024-W05
+    period: Mapped[str] = mapped_column(
+        String(10),
+        unique=True,
+        nullable=False,
+    )
+    
+    period_start: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+    )
+    
+    period_end: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+    )
+    
+    status: Mapped[DigestRunStatus] = mapped_column(
+        Enum(DigestRunStatus),
+        default=DigestRunStatus.RUNNING,
+        nullable=False,
+    )
+    
+    # Контрольная точка
+    last_user_id: Mapped[str | None] = mapped_column(
+        UUID(as_uuid=True),
+        nullable=True,
+    )
+    
+    sent_count: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        nullable=False,
+    )
+    
+    failed_count: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        nullable=False,
+    )
+    
+    # Обновляется после каждой пачки; зависшая рассылка подхватывается заново
+    heartbeat_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+    
+    finished_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+    
+    def __repr__(self) -> str:
+        return f"<DigestRun {self.period} {self.status.value}>"
@@ -0,0 +1,30 @@
+"""
+Event Model
+===========
+Append-only журнал событий (просмотры, лайки, чтения),
+секционированный по месяцам.
+"""
+
+from sqlalchemy import Column, DateTime, Index, String, Table
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+from app.db.base import Base
+
+
+# Таблица без ORM-класса: строки только добавляются через COPY
+# (app.db.events.EventBuffer) и читаются агрегирующими запросами.
+# Секции events_yYYYYmMM создаются app.db.events.ensure_event_partitions.
+events = Table(
+    "events",
+    Base.metadata,
+    Column("occurred_at", DateTime(timezone=True), nullable=False),
+    Column("event_type", String(32), nullable=False),
+    Column("post_id", UUID(as_uuid=True), nullable=True),
+    Column("user_id", UUID(as_uuid=True), nullable=True),
+    Column("data", JSONB, nullable=True),
+    Index("ix_events_occurred_at", "occurred_at"),
+    Index("ix_events_post_occurred_at", "post_id", "occurred_at"),
+    postgresql_partition_by="RANGE (occurred_at)",
+)
+
+EVENT_COLUMNS = ["occurred_at", "event_type", "post_id", "user_id", "data"]
@@ -0,0 +1,69 @@
+"""
+Media Model
+===========
+Загруженные изображения (адресация по содержимому).
+"""
+
+from sqlalchemy import ForeignKey, Integer, String
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class Media(Base):
+    """
+    Загруженное изображение.
+    
+    Файлы лежат на диске по SHA-256 содержимого:
+    - {MEDIA_DIR}/originals/ab/abcdef...        — оригинал
+    - {MEDIA_DIR}/variants/ab/abcdef.../640.webp — варианты
+    
+    Повторная загрузка того же файла возвращает существующую запись.
+    """
+    
+    __tablename__ = "media"
+    
+    sha256: Mapped[str] = mapped_column(
+        String(64),
+        unique=True,
+        nullable=False,
+    )
+    
+    uploader_id: Mapped[str | None] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="SET NULL"),
+        nullable=True,
+        index=True,
+    )
+    
+    # Формат оригинала: JPEG, PNG, WEBP, GIF
+    format: Mapped[str] = mapped_column(
+        String(10),
+        nullable=False,
+    )
+    
+    width: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+    )
+    
+    height: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+    )
+    
+    size_bytes: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+    )
+    
+    # [{"width": 640, "height": 360, "format": "webp", "size": 18234}, ...]
+    variants: Mapped[list[dict]] = mapped_column(
+        JSONB,
+        default=list,
+        nullable=False,
+    )
+    
+    def __repr__(self) -> str:
+        return f"<Media {self.sha256[:12]} {self.width}x{self.height}>"
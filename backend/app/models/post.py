@@ -8,17 +8,19 @@ import enum
 from datetime import datetime
 
 from sqlalchemy import (
+    and_,
     Boolean,
     Enum,
     ForeignKey,
     Index,
     Integer,
+    SmallInteger,
     String,
     Text,
     DateTime,
     func,
 )
-from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from sqlalchemy.dialects.postgresql import JSONB, UUID, TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -27,6 +29,7 @@ from app.db.base import Base
 class PostStatus(str, enum.Enum):
     """Статусы публикации."""
     DRAFT = "draft"
+    SCHEDULED = "scheduled"
     PUBLISHED = "published"
 
 
@@ -35,7 +38,7 @@ class Post(Base):
     Модель статьи.
     
     Поддерживает:
-    - Черновики и опубликованные статьи
+    - Черновики, отложенные и опубликованные статьи
     - Полнотекстовый поиск PostgreSQL
     - Счётчик просмотров
     - Теги через many-to-many
@@ -74,6 +77,57 @@ class Post(Base):
         nullable=True,
     )
     
+    # Результат рендеринга content (app.core.render), заполняется при записи
+    content_html: Mapped[str | None] = mapped_column(
+        Text,
+        nullable=True,
+    )
+    
+    content_text: Mapped[str | None] = mapped_column(
+        Text,
+        nullable=True,
+    )
+    
+    word_count: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        server_default="0",
+        nullable=False,
+    )
+    
+    # Время чтения в минутах
+    reading_time: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        server_default="0",
+        nullable=False,
+    )
+    
+    # Оглавление: [{"level": 2, "id": "...", "title": "..."}]
+    toc: Mapped[list[dict]] = mapped_column(
+        JSONB,
+        default=list,
+        server_default="[]",
+        nullable=False,
+    )
+    
+    # Версия заголовка и текста: растёт при каждом сохранении
+    # (проверка конфликтов автосохранения черновиков)
+    content_version: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        server_default="0",
+        nullable=False,
+    )
+    
+    # RENDERER_VERSION, которой отрендерена статья (0 — не рендерилась)
+    render_version: Mapped[int] = mapped_column(
+        SmallInteger,
+        default=0,
+        server_default="0",
+        nullable=False,
+    )
+    
     cover_image: Mapped[str | None] = mapped_column(
         String(500),
         nullable=True,
@@ -93,11 +147,34 @@ class Post(Base):
         nullable=False,
     )
     
+    # Оценка уникальных читателей (HyperLogLog в Redis,
+    # периодически записывается фоновой задачей)
+    unique_view_count: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        server_default="0",
+        nullable=False,
+    )
+    
     published_at: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True),
         nullable=True,
     )
     
+    # Время отложенной публикации (статус SCHEDULED),
+    # публикует фоновая задача app.jobs.publisher
+    publish_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+    
+    # Мягкое удаление: статья скрыта сразу, строка удаляется
+    # фоновой задачей очистки (app.jobs.purge)
+    deleted_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+    
     # Полнотекстовый поиск PostgreSQL
     # Будет заполняться автоматически через триггер в миграции
     search_vector: Mapped[str | None] = mapped_column(
@@ -118,17 +195,21 @@ class Post(Base):
     
     # Отношения
     author = relationship("User", back_populates="posts", lazy="selectin")
+    # passive_deletes: комментарии и лайки удаляет ON DELETE CASCADE в БД,
+    # ORM не загружает их перед удалением статьи
     comments = relationship(
         "Comment",
         back_populates="post",
         lazy="selectin",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     likes = relationship(
         "Like",
         back_populates="post",
         lazy="selectin",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     tags = relationship(
         "Tag",
@@ -141,6 +222,27 @@ class Post(Base):
     __table_args__ = (
         # GIN индекс для полнотекстового поиска
         Index("ix_posts_search_vector", search_vector, postgresql_using="gin"),
+        # Последние статьи автора (профиль)
+        Index("ix_posts_author_published", author_id, published_at.desc()),
+        # Порядок опубликованных статей: шарды sitemap и ленты
+        Index(
+            "ix_posts_published_order",
+            published_at,
+            "id",
+            postgresql_where=and_(status == PostStatus.PUBLISHED, deleted_at.is_(None)),
+        ),
+        # Очередь отложенных публикаций
+        Index(
+            "ix_posts_publish_at",
+            publish_at,
+            postgresql_where=status == PostStatus.SCHEDULED,
+        ),
+        # Очередь очистки мягко удалённых статей
+        Index(
+            "ix_posts_deleted_at",
+            deleted_at,
+            postgresql_where=deleted_at.is_not(None),
+        ),
     )
     
     def __repr__(self) -> str:
@@ -150,6 +252,10 @@ class Post(Base):
     def is_published(self) -> bool:
         return self.status == PostStatus.PUBLISHED
     
+    @property
+    def is_deleted(self) -> bool:
+        return self.deleted_at is not None
+    
     @property
     def likes_count(self) -> int:
         return len(self.likes) if self.likes else 0
@@ -0,0 +1,89 @@
+"""
+Post Fingerprint Models
+=======================
+MinHash сигнатуры статей и LSH-индекс для поиска почти-дубликатов.
+"""
+
+from sqlalchemy import BigInteger, Float, ForeignKey, Index, LargeBinary, SmallInteger
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.db.base import Base
+
+
+class PostFingerprint(Base):
+    """
+    MinHash сигнатура статьи (512 байт).
+    
+    Хранится отдельно от posts, чтобы не увеличивать
+    размер строк, которые читаются при каждом запросе.
+    """
+    
+    __tablename__ = "post_fingerprints"
+    
+    post_id: Mapped[str] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("posts.id", ondelete="CASCADE"),
+        unique=True,
+        nullable=False,
+    )
+    
+    signature: Mapped[bytes] = mapped_column(
+        LargeBinary,
+        nullable=False,
+    )
+    
+    # Ближайший найденный дубликат (для модерации)
+    duplicate_of_id: Mapped[str | None] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("posts.id", ondelete="SET NULL"),
+        nullable=True,
+        index=True,
+    )
+    
+    similarity: Mapped[float | None] = mapped_column(
+        Float,
+        nullable=True,
+    )
+    
+    # Отношения
+    post = relationship("Post", foreign_keys=[post_id])
+    duplicate_of = relationship("Post", foreign_keys=[duplicate_of_id])
+    
+    def __repr__(self) -> str:
+        return f"<PostFingerprint {self.post_id}>"
+
+
+class PostLSHBand(Base):
+    """
+    Полоса LSH: (номер полосы, хеш полосы) -> статья.
+    
+    Кандидаты в дубликаты — статьи с хотя бы одной совпавшей полосой,
+    поиск идёт по индексу (band, bucket), а не по всем статьям.
+    """
+    
+    __tablename__ = "post_lsh_bands"
+    
+    post_id: Mapped[str] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("posts.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    
+    band: Mapped[int] = mapped_column(
+        SmallInteger,
+        nullable=False,
+    )
+    
+    bucket: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+    )
+    
+    __table_args__ = (
+        Index("ix_post_lsh_bands_band_bucket", "band", "bucket"),
+    )
+    
+    def __repr__(self) -> str:
+        return f"<PostLSHBand {self.post_id} band={self.band}>"
@@ -0,0 +1,71 @@
+"""
+Post Revision Model
+===================
+История правок статей (дельты со снимками).
+"""
+
+from sqlalchemy import Boolean, ForeignKey, Integer, LargeBinary, String, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class PostRevision(Base):
+    """
+    Ревизия статьи — состояние после сохранения.
+    
+    data содержит сжатый полный текст (снимок) или сжатую построчную
+    дельту к предыдущей ревизии (app.core.delta). Снимок пишется каждые
+    POST_REVISION_SNAPSHOT_EVERY ревизий, поэтому для восстановления
+    любой ревизии применяется не больше стольких же дельт.
+    """
+    
+    __tablename__ = "post_revisions"
+    
+    post_id: Mapped[str] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("posts.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    
+    # Порядковый номер ревизии статьи: 1, 2, 3...
+    number: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+    )
+    
+    editor_id: Mapped[str | None] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+    
+    title: Mapped[str] = mapped_column(
+        String(255),
+        nullable=False,
+    )
+    
+    is_snapshot: Mapped[bool] = mapped_column(
+        Boolean,
+        default=False,
+        nullable=False,
+    )
+    
+    data: Mapped[bytes] = mapped_column(
+        LargeBinary,
+        nullable=False,
+    )
+    
+    # Длина текста ревизии (символы), для списка без распаковки
+    content_length: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+    )
+    
+    __table_args__ = (
+        UniqueConstraint("post_id", "number", name="uq_post_revision_number"),
+    )
+    
+    def __repr__(self) -> str:
+        return f"<PostRevision {self.post_id} #{self.number}>"
@@ -0,0 +1,55 @@
+"""
+Related Post Model
+==================
+Предрассчитанные похожие статьи (top-k соседей по TF-IDF).
+"""
+
+from sqlalchemy import Float, ForeignKey, Index, SmallInteger, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class RelatedPost(Base):
+    """
+    Связь статьи с похожей статьёй.
+    
+    Заполняется фоновой задачей app.jobs.related_posts,
+    читается одним индексным запросом по (post_id, rank).
+    """
+    
+    __tablename__ = "related_posts"
+    
+    post_id: Mapped[str] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("posts.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    
+    related_post_id: Mapped[str] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("posts.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    
+    # Косинусная близость TF-IDF векторов
+    score: Mapped[float] = mapped_column(
+        Float,
+        nullable=False,
+    )
+    
+    # Позиция в списке похожих (0 = самая похожая)
+    rank: Mapped[int] = mapped_column(
+        SmallInteger,
+        nullable=False,
+    )
+    
+    __table_args__ = (
+        UniqueConstraint("post_id", "related_post_id", name="uq_related_post_pair"),
+        Index("ix_related_posts_post_rank", "post_id", "rank"),
+    )
+    
+    def __repr__(self) -> str:
+        return f"<RelatedPost {self.post_id} -> {self.related_post_id}>"
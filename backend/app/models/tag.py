@@ -69,16 +69,19 @@ class Tag(Base):
     )
     
     # Отношения
+    # Посты тега никогда не загружаются целиком: списки идут через
+    # индексы тегов, а связи в post_tags удаляет ON DELETE CASCADE.
     posts = relationship(
         "Post",
         secondary=post_tags,
         back_populates="tags",
-        lazy="selectin",
+        lazy="noload",
+        passive_deletes=True,
     )
     
+    # Количество опубликованных постов.
+    # Заполняется TagService одним сгруппированным запросом.
+    posts_count = 0
+    
     def __repr__(self) -> str:
         return f"<Tag {self.name}>"
-    
-    @property
-    def posts_count(self) -> int:
-        return len(self.posts) if self.posts else 0
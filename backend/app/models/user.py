@@ -7,7 +7,7 @@ User Model
 import enum
 from datetime import datetime
 
-from sqlalchemy import Boolean, Enum, String, Text
+from sqlalchemy import Boolean, DateTime, Enum, Index, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -33,6 +33,7 @@ class User(Base):
         is_active: Активен ли аккаунт
         is_verified: Подтверждён ли email
         verification_token: Токен для подтверждения email
+        deleted_at: Время мягкого удаления (строку удаляет app.jobs.purge)
     """
     
     __tablename__ = "users"
@@ -89,10 +90,31 @@ class User(Base):
         nullable=True,
     )
     
+    deleted_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+    
     # Отношения
-    posts = relationship("Post", back_populates="author", lazy="selectin")
-    comments = relationship("Comment", back_populates="user", lazy="selectin")
-    likes = relationship("Like", back_populates="user", lazy="selectin")
+    # passive_deletes="all": при удалении пользователя ORM не загружает
+    # и не трогает его статьи/комментарии/лайки — их удаляет ON DELETE CASCADE
+    posts = relationship(
+        "Post", back_populates="author", lazy="selectin", passive_deletes="all"
+    )
+    comments = relationship(
+        "Comment", back_populates="user", lazy="selectin", passive_deletes="all"
+    )
+    likes = relationship(
+        "Like", back_populates="user", lazy="selectin", passive_deletes="all"
+    )
+    
+    __table_args__ = (
+        Index(
+            "ix_users_deleted_at",
+            deleted_at,
+            postgresql_where=deleted_at.is_not(None),
+        ),
+    )
     
     def __repr__(self) -> str:
         return f"<User {self.username}>"
@@ -0,0 +1,87 @@
+"""
+User Stats Materialized View
+============================
+Предрассчитанная статистика авторов для публичного профиля.
+
+Материализованное представление обновляется фоновой задачей
+(REFRESH MATERIALIZED VIEW CONCURRENTLY), поэтому профиль читается
+одним индексным запросом независимо от количества статей автора.
+"""
+
+from sqlalchemy import (
+    DDL,
+    BigInteger,
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    Table,
+    event,
+)
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.base import Base
+
+
+# Отдельный MetaData: представление не создаётся как таблица
+# ни create_all, ни автогенерацией миграций Alembic.
+view_metadata = MetaData()
+
+user_stats_mv = Table(
+    "user_stats_mv",
+    view_metadata,
+    Column("user_id", UUID(as_uuid=True), primary_key=True),
+    Column("posts_count", Integer, nullable=False),
+    Column("total_views", BigInteger, nullable=False),
+    Column("likes_received", Integer, nullable=False),
+    Column("comments_count", Integer, nullable=False),
+    Column("refreshed_at", DateTime(timezone=True), nullable=False),
+)
+
+
+CREATE_USER_STATS_MV = """
+CREATE MATERIALIZED VIEW IF NOT EXISTS user_stats_mv AS
+SELECT
+    u.id AS user_id,
+    COALESCE(p.posts_count, 0)::integer AS posts_count,
+    COALESCE(p.total_views, 0)::bigint AS total_views,
+    COALESCE(l.likes_received, 0)::integer AS likes_received,
+    COALESCE(c.comments_count, 0)::integer AS comments_count,
+    now() AS refreshed_at
+FROM users u
+LEFT JOIN (
+    SELECT author_id, count(*) AS posts_count, sum(view_count) AS total_views
+    FROM posts
+    WHERE status = 'PUBLISHED' AND deleted_at IS NULL
+    GROUP BY author_id
+) p ON p.author_id = u.id
+LEFT JOIN (
+    SELECT posts.author_id, count(*) AS likes_received
+    FROM likes
+    JOIN posts ON posts.id = likes.post_id AND posts.deleted_at IS NULL
+    GROUP BY posts.author_id
+) l ON l.author_id = u.id
+LEFT JOIN (
+    SELECT posts.author_id, count(*) AS comments_count
+    FROM comments
+    JOIN posts ON posts.id = comments.post_id AND posts.deleted_at IS NULL
+    GROUP BY posts.author_id
+) c ON c.author_id = u.id
+"""
+
+CREATE_USER_STATS_MV_INDEX = (
+    "CREATE UNIQUE INDEX IF NOT EXISTS ux_user_stats_mv_user_id "
+    "ON user_stats_mv (user_id)"
+)
+
+# CONCURRENTLY не блокирует чтение (требует уникальный индекс)
+REFRESH_USER_STATS_MV = "REFRESH MATERIALIZED VIEW CONCURRENTLY user_stats_mv"
+
+
+event.listen(Base.metadata, "after_create", DDL(CREATE_USER_STATS_MV))
+event.listen(Base.metadata, "after_create", DDL(CREATE_USER_STATS_MV_INDEX))
+event.listen(
+    Base.metadata,
+    "before_drop",
+    DDL("DROP MATERIALIZED VIEW IF EXISTS user_stats_mv"),
+)
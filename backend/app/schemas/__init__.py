@@ -21,6 +21,10 @@ from app.schemas.user import (
     UserMeResponse,
     UserAdminResponse,
     UserStats,
+    UserPostCard,
+    UserProfileResponse,
+    AccountJobCreate,
+    AccountJobResponse,
 )
 from app.schemas.post import (
     PostBase,
@@ -29,7 +33,22 @@ from app.schemas.post import (
     PostResponse,
     PostDetailResponse,
     PostListResponse,
+    RelatedPostResponse,
+    PostDuplicateResponse,
+    PostDuplicateListResponse,
+    PostUniqueViewsResponse,
     PostSEO,
+    TocItem,
+    PostRevisionResponse,
+    PostRevisionDetailResponse,
+    DraftOperation,
+    DraftPatch,
+    DraftResponse,
+    PostBulkFilter,
+    PostBulkRequest,
+    PostBulkResponse,
+    PostImportRecord,
+    PostImportResponse,
 )
 from app.schemas.comment import (
     CommentCreate,
@@ -42,6 +61,17 @@ from app.schemas.tag import (
     TagUpdate,
     TagResponse,
     TagListResponse,
+    TagCloudItem,
+    TagCloudResponse,
+    TagBulkCreate,
+)
+from app.schemas.analytics import (
+    StatsPoint,
+    PostStatsResponse,
+)
+from app.schemas.media import (
+    MediaVariant,
+    MediaResponse,
 )
 
 __all__ = [
@@ -61,6 +91,10 @@ __all__ = [
     "UserMeResponse",
     "UserAdminResponse",
     "UserStats",
+    "UserPostCard",
+    "UserProfileResponse",
+    "AccountJobCreate",
+    "AccountJobResponse",
     # Post
     "PostBase",
     "PostCreate",
@@ -68,7 +102,22 @@ __all__ = [
     "PostResponse",
     "PostDetailResponse",
     "PostListResponse",
+    "RelatedPostResponse",
+    "PostDuplicateResponse",
+    "PostDuplicateListResponse",
+    "PostUniqueViewsResponse",
     "PostSEO",
+    "TocItem",
+    "PostRevisionResponse",
+    "PostRevisionDetailResponse",
+    "DraftOperation",
+    "DraftPatch",
+    "DraftResponse",
+    "PostBulkFilter",
+    "PostBulkRequest",
+    "PostBulkResponse",
+    "PostImportRecord",
+    "PostImportResponse",
     # Comment
     "CommentCreate",
     "CommentUpdate",
@@ -79,4 +128,13 @@ __all__ = [
     "TagUpdate",
     "TagResponse",
     "TagListResponse",
+    "TagCloudItem",
+    "TagCloudResponse",
+    "TagBulkCreate",
+    # Analytics
+    "StatsPoint",
+    "PostStatsResponse",
+    # Media
+    "MediaVariant",
+    "MediaResponse",
 ]
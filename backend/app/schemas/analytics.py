@@ -0,0 +1,28 @@
+"""
+Analytics Schemas
+=================
+Pydantic модели для статистики постов и авторов.
+"""
+
+from datetime import date, datetime
+from typing import Literal
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class StatsPoint(BaseModel):
+    """Точка временного ряда."""
+    
+    bucket: date | datetime
+    views: int = 0
+    likes: int = 0
+    comments: int = 0
+
+
+class PostStatsResponse(BaseModel):
+    """Временной ряд статистики поста."""
+    
+    post_id: UUID
+    granularity: Literal["hour", "day", "month"]
+    items: list[StatsPoint]
@@ -0,0 +1,28 @@
+"""
+Media Schemas
+=============
+Pydantic модели для загруженных изображений.
+"""
+
+from pydantic import BaseModel
+
+
+class MediaVariant(BaseModel):
+    """Вариант изображения фиксированной ширины."""
+    
+    url: str
+    width: int
+    height: int
+    format: str
+    size: int
+
+
+class MediaResponse(BaseModel):
+    """Загруженное изображение со ссылками на варианты."""
+    
+    hash: str
+    format: str
+    width: int
+    height: int
+    size_bytes: int
+    variants: list[MediaVariant]
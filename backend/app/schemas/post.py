@@ -5,6 +5,7 @@ Pydantic модели для статей.
 """
 
 from datetime import datetime
+from typing import Literal
 from uuid import UUID
 
 from pydantic import BaseModel, Field
@@ -29,7 +30,13 @@ class PostCreate(PostBase):
     """Создание статьи."""
     
     status: PostStatus = PostStatus.DRAFT
+    publish_at: datetime | None = Field(None, description="Время публикации для status=scheduled")
     tag_ids: list[UUID] = []
+    tags: list[str] = Field(
+        default=[],
+        max_length=20,
+        description="Названия тегов (несуществующие будут созданы)",
+    )
 
 
 class PostUpdate(BaseModel):
@@ -40,9 +47,19 @@ class PostUpdate(BaseModel):
     excerpt: str | None = Field(None, max_length=500)
     cover_image: str | None = None
     status: PostStatus | None = None
+    publish_at: datetime | None = None
     meta_title: str | None = Field(None, max_length=70)
     meta_description: str | None = Field(None, max_length=160)
     tag_ids: list[UUID] | None = None
+    tags: list[str] | None = Field(None, max_length=20)
+
+
+class TocItem(BaseModel):
+    """Пункт оглавления статьи."""
+    
+    level: int
+    id: str
+    title: str
 
 
 class PostResponse(BaseModel):
@@ -54,7 +71,10 @@ class PostResponse(BaseModel):
     excerpt: str | None
     cover_image: str | None
     status: PostStatus
+    publish_at: datetime | None = None
     view_count: int
+    unique_view_count: int = 0
+    reading_time: int = 0
     likes_count: int
     comments_count: int
     published_at: datetime | None
@@ -70,6 +90,9 @@ class PostDetailResponse(PostResponse):
     """Ответ с полными данными статьи."""
     
     content: str
+    content_html: str | None = None
+    word_count: int = 0
+    toc: list[TocItem] = []
     meta_title: str | None
     meta_description: str | None
     updated_at: datetime
@@ -88,6 +111,171 @@ class PostListResponse(BaseModel):
     pages: int
 
 
+class RelatedPostResponse(BaseModel):
+    """Похожая статья (облегчённая карточка)."""
+    
+    id: UUID
+    title: str
+    slug: str
+    excerpt: str | None
+    cover_image: str | None
+    published_at: datetime | None
+    score: float
+    
+    class Config:
+        from_attributes = True
+
+
+class PostDuplicateResponse(BaseModel):
+    """Статья, помеченная как почти-дубликат."""
+    
+    post_id: UUID
+    post_title: str
+    post_slug: str
+    post_status: PostStatus
+    duplicate_of_id: UUID
+    duplicate_of_title: str
+    duplicate_of_slug: str
+    similarity: float
+    detected_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class PostDuplicateListResponse(BaseModel):
+    """Пагинированный список почти-дубликатов."""
+    
+    items: list[PostDuplicateResponse]
+    total: int
+    page: int
+    per_page: int
+    pages: int
+
+
+class PostUniqueViewsResponse(BaseModel):
+    """Оценка уникальных читателей за период (HyperLogLog, ~1%)."""
+    
+    post_id: UUID
+    period: Literal["day", "week", "month", "all"]
+    unique_viewers: int
+
+
+class PostRevisionResponse(BaseModel):
+    """Ревизия статьи (без текста)."""
+    
+    number: int
+    title: str
+    editor_id: UUID | None
+    content_length: int
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class PostRevisionDetailResponse(PostRevisionResponse):
+    """Ревизия статьи с восстановленным текстом."""
+    
+    content: str
+
+
+class DraftOperation(BaseModel):
+    """
+    Правка текста: удалить delete символов с позиции pos и вставить insert.
+    
+    Операции применяются по очереди, позиции — в тексте после предыдущих операций.
+    """
+    
+    pos: int = Field(ge=0)
+    delete: int = Field(0, ge=0)
+    insert: str = ""
+
+
+class DraftPatch(BaseModel):
+    """Автосохранение черновика."""
+    
+    version: int = Field(ge=0, description="Версия, к которой применяются правки")
+    title: str | None = Field(None, min_length=1, max_length=255)
+    ops: list[DraftOperation] = Field(default=[], max_length=500)
+
+
+class DraftResponse(BaseModel):
+    """Состояние черновика."""
+    
+    post_id: UUID
+    version: int
+    saved_version: int = Field(description="Последняя версия, записанная в БД")
+    title: str
+    content: str | None = None
+    content_length: int
+
+
+class PostBulkFilter(BaseModel):
+    """Выбор статей фильтром (условия объединяются через AND)."""
+    
+    status: PostStatus | None = None
+    author_id: UUID | None = None
+    tag: str | None = Field(None, description="Slug тега")
+    created_after: datetime | None = None
+    created_before: datetime | None = None
+
+
+class PostBulkRequest(BaseModel):
+    """Массовое действие над статьями: по списку id или по фильтру."""
+    
+    action: Literal["publish", "unpublish", "retag", "delete"]
+    ids: list[UUID] | None = Field(None, min_length=1, max_length=10_000)
+    filter: PostBulkFilter | None = None
+    add_tags: list[str] = Field(default=[], max_length=50, description="Названия тегов (retag)")
+    remove_tags: list[str] = Field(default=[], max_length=50, description="Названия тегов (retag)")
+    dry_run: bool = Field(False, description="Только посчитать статьи, ничего не менять")
+
+
+class PostBulkResponse(BaseModel):
+    """Результат массового действия."""
+    
+    action: str
+    dry_run: bool
+    matched: int = Field(description="Статей под условие")
+    affected: int = Field(description="Статей изменено (или будет изменено при dry_run)")
+
+
+class PostImportRecord(BaseModel):
+    """
+    Строка NDJSON импорта — формат экспорта статей.
+    
+    Автор ищется по username, теги — по названию (недостающие создаются).
+    Лишние поля экспорта (счётчики лайков и т.п.) игнорируются.
+    """
+    
+    id: UUID | None = None
+    title: str = Field(min_length=1, max_length=255)
+    slug: str | None = Field(None, max_length=200)
+    content: str
+    excerpt: str | None = Field(None, max_length=500)
+    cover_image: str | None = Field(None, max_length=500)
+    status: PostStatus = PostStatus.DRAFT
+    published_at: datetime | None = None
+    publish_at: datetime | None = None
+    created_at: datetime | None = None
+    meta_title: str | None = Field(None, max_length=70)
+    meta_description: str | None = Field(None, max_length=160)
+    author: str | None = None
+    tags: list[str] = Field(default=[], max_length=50)
+    view_count: int = Field(0, ge=0)
+
+
+class PostImportResponse(BaseModel):
+    """Итог импорта."""
+    
+    imported: int
+    renamed: int = Field(description="Импортировано с изменённым slug")
+    skipped: int = Field(description="Статья с таким id уже есть или id повторён в файле")
+    conflicts: int = Field(0, description="Id или slug параллельно записан другим импортом")
+    errors: list[str] = Field(description="Первые ошибки разбора строк")
+
+
 class PostSEO(BaseModel):
     """SEO данные для статьи."""
     
@@ -44,3 +44,25 @@ class TagListResponse(BaseModel):
     
     items: list[TagResponse]
     total: int
+
+
+class TagCloudItem(BaseModel):
+    """Элемент облака тегов."""
+    
+    name: str
+    slug: str
+    color: str | None
+    posts_count: int
+    weight: int = Field(ge=1, le=5, description="Относительный размер 1-5")
+
+
+class TagCloudResponse(BaseModel):
+    """Облако тегов."""
+    
+    items: list[TagCloudItem]
+
+
+class TagBulkCreate(BaseModel):
+    """Получение или создание тегов по названиям."""
+    
+    names: list[str] = Field(min_length=1, max_length=100)
@@ -9,6 +9,7 @@ from uuid import UUID
 
 from pydantic import BaseModel, EmailStr, Field
 
+from app.models.account_job import AccountJobMode, AccountJobStatus
 from app.models.user import UserRole
 
 
@@ -74,3 +75,50 @@ class UserStats(BaseModel):
     comments_count: int = 0
     likes_received: int = 0
     total_views: int = 0
+
+
+class UserPostCard(BaseModel):
+    """Облегчённая карточка статьи для профиля автора."""
+    
+    id: UUID
+    title: str
+    slug: str
+    excerpt: str | None
+    cover_image: str | None
+    view_count: int
+    published_at: datetime | None
+    
+    class Config:
+        from_attributes = True
+
+
+class UserProfileResponse(UserResponse):
+    """Публичный профиль автора."""
+    
+    stats: UserStats
+    stats_refreshed_at: datetime | None = None
+    recent_posts: list[UserPostCard] = []
+
+
+class AccountJobCreate(BaseModel):
+    """Запрос на блокировку / удаление аккаунта."""
+    
+    mode: AccountJobMode = AccountJobMode.DEACTIVATE
+
+
+class AccountJobResponse(BaseModel):
+    """Задача обработки аккаунта с прогрессом."""
+    
+    id: UUID
+    user_id: UUID | None
+    mode: AccountJobMode
+    status: AccountJobStatus
+    posts_processed: int
+    comments_processed: int
+    likes_processed: int
+    created_at: datetime
+    finished_at: datetime | None
+    error: str | None
+    
+    class Config:
+        from_attributes = True
@@ -6,8 +6,24 @@ Services Package
 
 from app.services.auth_service import AuthService
 from app.services.post_service import PostService
+from app.services.tag_service import TagService
+from app.services.account_service import AccountService
+from app.services.user_service import UserService
+from app.services.media_service import MediaService
+from app.services.revision_service import RevisionService
+from app.services.draft_service import DraftService
+from app.services.bulk_post_service import BulkPostService
+from app.services.feed_service import FeedService
 
 __all__ = [
     "AuthService",
     "PostService",
+    "TagService",
+    "UserService",
+    "AccountService",
+    "MediaService",
+    "RevisionService",
+    "DraftService",
+    "BulkPostService",
+    "FeedService",
 ]
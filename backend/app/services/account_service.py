@@ -0,0 +1,103 @@
+"""
+Account Service
+===============
+Блокировка и удаление аккаунтов администратором.
+"""
+
+import time
+from uuid import UUID
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import noload
+
+from app.config import settings
+from app.core.exceptions import (
+    AlreadyExistsException,
+    NotFoundException,
+    ValidationException,
+)
+from app.db.redis import revoke_user_tokens
+from app.models.account_job import AccountJob, AccountJobMode, AccountJobStatus
+from app.models.user import User
+
+
+class AccountService:
+    """Сервис управления аккаунтами."""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def start_job(
+        self,
+        user_id: UUID,
+        mode: AccountJobMode,
+        admin: User,
+    ) -> AccountJob:
+        """
+        Заблокировать аккаунт и поставить задачу обработки контента.
+        
+        Сразу (в запросе):
+        1. is_active = False (и deleted_at для удаления) одним UPDATE
+        2. Отзыв всех выданных токенов пользователя
+        
+        Контент обрабатывается пачками в app.jobs.accounts.
+        """
+        if user_id == admin.id:
+            raise ValidationException("You cannot deactivate your own account")
+        
+        # Коллекции пользователя не загружаем
+        result = await self.db.execute(
+            select(User)
+            .options(noload(User.posts), noload(User.comments), noload(User.likes))
+            .where(User.id == user_id, User.deleted_at.is_(None))
+        )
+        if result.scalar_one_or_none() is None:
+            raise NotFoundException("User")
+        
+        active = await self.db.execute(
+            select(AccountJob.id).where(
+                AccountJob.user_id == user_id,
+                AccountJob.status.in_(
+                    [AccountJobStatus.PENDING, AccountJobStatus.RUNNING]
+                ),
+            )
+        )
+        if active.first() is not None:
+            raise AlreadyExistsException("Account job for this user")
+        
+        values = {"is_active": False}
+        if mode == AccountJobMode.DELETE:
+            values["deleted_at"] = func.now()
+        await self.db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        
+        job = AccountJob(
+            user_id=user_id,
+            requested_by_id=admin.id,
+            mode=mode,
+        )
+        self.db.add(job)
+        await self.db.flush()
+        await self.db.refresh(job)
+        
+        await revoke_user_tokens(
+            str(user_id),
+            time.time(),
+            ttl_seconds=settings.refresh_token_expire_days * 24 * 3600,
+        )
+        
+        return job
+    
+    async def get_job(self, job_id: UUID) -> AccountJob:
+        """Задача с текущим прогрессом."""
+        job = await self.db.get(AccountJob, job_id)
+        
+        if job is None:
+            raise NotFoundException("Account job")
+        
+        return job
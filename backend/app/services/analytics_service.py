@@ -0,0 +1,167 @@
+"""
+Analytics Service
+=================
+Статистика постов и авторов из предагрегированных таблиц.
+"""
+
+from datetime import date, datetime, time, timedelta, timezone
+from uuid import UUID
+
+from sqlalchemy import Date, cast, func, literal_column, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import NotFoundException, PermissionDeniedException
+from app.db.redis import record_stat_event
+from app.models.analytics import PostStatsDaily, PostStatsHourly, PostStatsMonthly
+from app.models.post import Post
+from app.models.user import User
+from app.schemas.analytics import StatsPoint
+from app.schemas.user import UserStats
+
+
+# Источники для каждой гранулярности: свёрнутые уровни + ещё не свёрнутые
+GRANULARITY_SOURCES = {
+    "hour": (PostStatsHourly,),
+    "day": (PostStatsDaily, PostStatsHourly),
+    "month": (PostStatsMonthly, PostStatsDaily, PostStatsHourly),
+}
+
+DEFAULT_RANGE = {
+    "hour": timedelta(days=2),
+    "day": timedelta(days=30),
+    "month": timedelta(days=365),
+}
+
+
+async def record_post_event(post_id: UUID, metric: str, amount: int = 1) -> None:
+    """
+    Учесть событие поста в текущем часовом bucket (Redis).
+    В БД попадает через компактор app.jobs.analytics.
+    """
+    hour = datetime.now(timezone.utc).strftime("%Y%m%d%H")
+    await record_stat_event(str(post_id), metric, hour, amount)
+
+
+class AnalyticsService:
+    """Сервис статистики."""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def get_user_stats(self, user_id: UUID) -> UserStats:
+        """
+        Статистика автора.
+        
+        - posts_count, total_views: по индексу posts.author_id
+        - likes_received, comments_count: лайки и комментарии к статьям
+          автора из таблиц агрегатов (по индексу author_id), без
+          сканирования likes/comments
+        """
+        posts_result = await self.db.execute(
+            select(
+                func.count(Post.id),
+                func.coalesce(func.sum(Post.view_count), 0),
+            ).where(Post.author_id == user_id, Post.deleted_at.is_(None))
+        )
+        posts_count, total_views = posts_result.one()
+        
+        rollups = union_all(*(
+            select(table.likes, table.comments).where(table.author_id == user_id)
+            for table in (PostStatsHourly, PostStatsDaily, PostStatsMonthly)
+        )).subquery()
+        
+        stats_result = await self.db.execute(
+            select(
+                func.coalesce(func.sum(rollups.c.likes), 0),
+                func.coalesce(func.sum(rollups.c.comments), 0),
+            )
+        )
+        likes_received, comments_count = stats_result.one()
+        
+        return UserStats(
+            posts_count=posts_count,
+            comments_count=comments_count,
+            likes_received=likes_received,
+            total_views=total_views,
+        )
+    
+    async def get_post_timeseries(
+        self,
+        slug: str,
+        user: User,
+        granularity: str = "day",
+        date_from: date | None = None,
+        date_to: date | None = None,
+    ) -> tuple[UUID, list[StatsPoint]]:
+        """
+        Временной ряд просмотров/лайков/комментариев поста.
+        Только автор или админ.
+        
+        Свёрнутые и ещё не свёрнутые уровни объединяются одним
+        UNION ALL запросом и группируются по bucket нужной гранулярности.
+        """
+        result = await self.db.execute(
+            select(Post.id, Post.author_id).where(
+                Post.slug == slug,
+                Post.deleted_at.is_(None),
+            )
+        )
+        post = result.one_or_none()
+        
+        if post is None:
+            raise NotFoundException("Post")
+        
+        post_id, author_id = post
+        if author_id != user.id and not user.is_admin:
+            raise PermissionDeniedException()
+        
+        today = datetime.now(timezone.utc).date()
+        date_to = date_to or today
+        date_from = date_from or date_to - DEFAULT_RANGE[granularity]
+        if granularity == "month":
+            date_from = date_from.replace(day=1)
+        
+        start = datetime.combine(date_from, time.min, tzinfo=timezone.utc)
+        end = datetime.combine(date_to + timedelta(days=1), time.min, tzinfo=timezone.utc)
+        
+        parts = []
+        for table in GRANULARITY_SOURCES[granularity]:
+            if granularity == "hour":
+                bucket = table.bucket
+            else:
+                bucket = cast(
+                    func.date_trunc(literal_column(f"'{granularity}'"), table.bucket),
+                    Date,
+                )
+            
+            lower, upper = (start, end) if table is PostStatsHourly else (date_from, end.date())
+            
+            parts.append(
+                select(
+                    bucket.label("bucket"),
+                    table.views,
+                    table.likes,
+                    table.comments,
+                ).where(
+                    table.post_id == post_id,
+                    table.bucket >= lower,
+                    table.bucket < upper,
+                )
+            )
+        
+        merged = union_all(*parts).subquery()
+        rows = await self.db.execute(
+            select(
+                merged.c.bucket,
+                func.sum(merged.c.views),
+                func.sum(merged.c.likes),
+                func.sum(merged.c.comments),
+            )
+            .group_by(merged.c.bucket)
+            .order_by(merged.c.bucket)
+        )
+        
+        return post_id, [
+            StatsPoint(bucket=bucket, views=views, likes=likes, comments=comments)
+            for bucket, views, likes, comments in rows
+        ]
@@ -25,7 +25,7 @@ from app.core.security import (
     hash_password,
     verify_password,
 )
-from app.db.redis import add_to_blacklist, is_blacklisted
+from app.db.redis import add_to_blacklist, get_tokens_revoked_at, is_blacklisted
 from app.models.user import User, UserRole
 from app.schemas.auth import TokenPair, UserLogin, UserRegister
 
@@ -130,6 +130,10 @@ class AuthService:
         if user_id is None:
             raise CredentialsException("Invalid token")
         
+        revoked_at = await get_tokens_revoked_at(user_id)
+        if revoked_at is not None and payload.get("iat", 0) <= revoked_at:
+            raise CredentialsException("Token has been revoked")
+        
         result = await self.db.execute(
             select(User).where(User.id == UUID(user_id))
         )
@@ -181,9 +185,10 @@ class AuthService:
         
         return user
     
-    async def resend_verification(self, email: str) -> str:
+    async def resend_verification(self, email: str) -> User:
         """
         Переотправить email verification.
+        Возвращает пользователя с новым токеном.
         """
         result = await self.db.execute(
             select(User).where(User.email == email)
@@ -199,7 +204,7 @@ class AuthService:
         user.verification_token = create_verification_token()
         await self.db.flush()
         
-        return user.verification_token
+        return user
     
     def _create_tokens(self, user: User) -> TokenPair:
         """Создать пару токенов для пользователя."""
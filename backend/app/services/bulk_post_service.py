@@ -0,0 +1,348 @@
+"""
+Bulk Post Service
+=================
+Массовые действия администратора над статьями.
+
+Статьи не загружаются в ORM: выбранные строки блокируются одним
+SELECT ... FOR UPDATE, действие — один-два UPDATE/DELETE/INSERT
+по списку id в транзакции запроса. Кэши и индексы тегов Redis
+обновляются одним pipeline на действие — только после commit
+(как в app.jobs.publisher): run() возвращает эти шаги, обработчик
+выполняет их после фиксации транзакции. Иначе откат оставил бы
+Redis расходящимся с БД, а читатель между сбросом кэша и commit
+закэшировал бы старое состояние.
+"""
+
+from collections.abc import Awaitable, Callable
+from functools import partial
+from uuid import UUID
+
+from slugify import slugify
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.exceptions import ValidationException
+from app.db.redis import (
+    discard_drafts,
+    index_posts_tags,
+    invalidate_post_caches,
+    invalidate_tags_cache,
+    unindex_posts_tags,
+)
+from app.models.post import Post, PostStatus
+from app.models.tag import Tag, post_tags
+from app.schemas.post import PostBulkRequest, PostBulkResponse
+from app.services.feed_service import invalidate_published_posts
+from app.services.tag_service import TagService
+
+
+AfterCommit = list[Callable[[], Awaitable[object]]]
+
+
+class BulkPostService:
+    """Сервис массовых действий над статьями."""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self._after_commit: AfterCommit = []
+    
+    @staticmethod
+    def _conditions(data: PostBulkRequest) -> list:
+        """Условия выбора статей: список id или фильтр."""
+        if (data.ids is None) == (data.filter is None):
+            raise ValidationException("Specify either ids or filter")
+        
+        conditions = [Post.deleted_at.is_(None)]
+        
+        if data.ids is not None:
+            conditions.append(Post.id.in_(data.ids))
+            return conditions
+        
+        criteria = data.filter
+        if not criteria.model_dump(exclude_none=True):
+            raise ValidationException("Filter must have at least one condition")
+        
+        if criteria.status is not None:
+            conditions.append(Post.status == criteria.status)
+        if criteria.author_id is not None:
+            conditions.append(Post.author_id == criteria.author_id)
+        if criteria.tag is not None:
+            conditions.append(
+                Post.id.in_(
+                    select(post_tags.c.post_id)
+                    .join(Tag, Tag.id == post_tags.c.tag_id)
+                    .where(Tag.slug == criteria.tag)
+                )
+            )
+        if criteria.created_after is not None:
+            conditions.append(Post.created_at >= criteria.created_after)
+        if criteria.created_before is not None:
+            conditions.append(Post.created_at < criteria.created_before)
+        
+        return conditions
+    
+    @staticmethod
+    def _action_condition(action: str):
+        """Какие из выбранных статей действие действительно меняет."""
+        if action == "publish":
+            return Post.status != PostStatus.PUBLISHED
+        if action == "unpublish":
+            return Post.status.in_([PostStatus.PUBLISHED, PostStatus.SCHEDULED])
+        return None
+    
+    async def _count(self, conditions: list) -> int:
+        result = await self.db.execute(
+            select(func.count()).select_from(Post).where(*conditions)
+        )
+        return result.scalar_one()
+    
+    async def _tag_slugs(self, post_ids: list[UUID]) -> dict[UUID, list[str]]:
+        """Теги статей одним запросом."""
+        result = await self.db.execute(
+            select(post_tags.c.post_id, Tag.slug)
+            .join(Tag, Tag.id == post_tags.c.tag_id)
+            .where(post_tags.c.post_id.in_(post_ids))
+        )
+        tag_slugs: dict[UUID, list[str]] = {}
+        for post_id, slug in result:
+            tag_slugs.setdefault(post_id, []).append(slug)
+        return tag_slugs
+    
+    async def run(self, data: PostBulkRequest) -> tuple[PostBulkResponse, list[UUID], AfterCommit]:
+        """
+        Выполнить действие (или только посчитать при dry_run).
+        
+        Returns:
+            (результат, id опубликованных статей, у которых сменились
+            статус или теги — для пересчёта похожих статей, обновления
+            Redis, которые выполняются по порядку после commit)
+        """
+        conditions = self._conditions(data)
+        if data.action == "retag" and not (data.add_tags or data.remove_tags):
+            raise ValidationException("Retag requires add_tags or remove_tags")
+        
+        action_condition = self._action_condition(data.action)
+        
+        if data.dry_run:
+            matched = await self._count(conditions)
+            affected = (
+                await self._count([*conditions, action_condition])
+                if action_condition is not None
+                else matched
+            )
+            return PostBulkResponse(
+                action=data.action, dry_run=True, matched=matched, affected=affected,
+            ), [], []
+        
+        limit = settings.admin_bulk_max_posts
+        result = await self.db.execute(
+            select(Post.id, Post.slug, Post.status, Post.published_at)
+            .where(*conditions)
+            .order_by(Post.id)
+            .limit(limit + 1)
+            .with_for_update()
+        )
+        rows = result.all()
+        if len(rows) > limit:
+            raise ValidationException(f"Too many posts selected (limit {limit})")
+        
+        if data.action == "publish":
+            affected, related = await self._publish(rows)
+        elif data.action == "unpublish":
+            affected, related = await self._unpublish(rows)
+        elif data.action == "retag":
+            affected, related = await self._retag(rows, data.add_tags, data.remove_tags)
+        else:
+            affected, related = await self._delete(rows)
+        
+        return PostBulkResponse(
+            action=data.action, dry_run=False, matched=len(rows), affected=affected,
+        ), related, self._after_commit
+    
+    def _defer(self, func: Callable[..., Awaitable[object]], *args) -> None:
+        """Отложить обновление Redis до commit."""
+        self._after_commit.append(partial(func, *args))
+    
+    async def _publish(self, rows: list) -> tuple[int, list[UUID]]:
+        """
+        Опубликовать черновики и отложенные статьи.
+        
+        Проверка почти-дубликатов не выполняется: действие администратора.
+        """
+        result = await self.db.execute(
+            update(Post)
+            .where(
+                Post.id.in_([row.id for row in rows]),
+                Post.status != PostStatus.PUBLISHED,
+            )
+            .values(
+                status=PostStatus.PUBLISHED,
+                published_at=func.coalesce(Post.published_at, func.now()),
+                publish_at=None,
+            )
+            .returning(Post.id, Post.slug, Post.published_at)
+            .execution_options(synchronize_session=False)
+        )
+        published = result.all()
+        if not published:
+            return 0, []
+        
+        post_ids = [row.id for row in published]
+        tag_slugs = await self._tag_slugs(post_ids)
+        
+        self._defer(index_posts_tags, [
+            (str(row.id), tag_slugs[row.id], row.published_at.timestamp())
+            for row in published
+            if row.id in tag_slugs
+        ])
+        self._defer(invalidate_post_caches, [row.slug for row in published])
+        self._defer(invalidate_tags_cache)
+        self._defer(discard_drafts, [str(post_id) for post_id in post_ids])
+        self._defer(
+            invalidate_published_posts,
+            min(row.published_at for row in published).timestamp(),
+            True,
+        )
+        
+        return len(published), post_ids
+    
+    async def _unpublish(self, rows: list) -> tuple[int, list[UUID]]:
+        """Вернуть опубликованные и отложенные статьи в черновики."""
+        result = await self.db.execute(
+            update(Post)
+            .where(
+                Post.id.in_([row.id for row in rows]),
+                Post.status.in_([PostStatus.PUBLISHED, PostStatus.SCHEDULED]),
+            )
+            .values(status=PostStatus.DRAFT, publish_at=None)
+            .returning(Post.id, Post.slug)
+            .execution_options(synchronize_session=False)
+        )
+        unpublished = result.all()
+        if not unpublished:
+            return 0, []
+        
+        was_published = [
+            row.published_at for row in rows
+            if row.status == PostStatus.PUBLISHED and row.published_at
+        ]
+        if was_published:
+            self._defer(invalidate_published_posts, min(was_published).timestamp(), True)
+        
+        tag_slugs = await self._tag_slugs([row.id for row in unpublished])
+        
+        self._defer(unindex_posts_tags, [(str(post_id), slugs) for post_id, slugs in tag_slugs.items()])
+        self._defer(invalidate_post_caches, [row.slug for row in unpublished])
+        self._defer(invalidate_tags_cache)
+        
+        return len(unpublished), []
+    
+    async def _retag(
+        self,
+        rows: list,
+        add_names: list[str],
+        remove_names: list[str],
+    ) -> tuple[int, list[UUID]]:
+        """
+        Добавить и убрать теги.
+        
+        Связи вставляются одним INSERT ... SELECT ... ON CONFLICT DO NOTHING
+        и удаляются одним DELETE; тег из обоих списков остаётся.
+        """
+        if not rows:
+            return 0, []
+        
+        post_ids = [row.id for row in rows]
+        
+        add_tags = await TagService(self.db).get_or_create_by_names(add_names) if add_names else []
+        add_ids = {tag.id for tag in add_tags}
+        
+        remove_tags = []
+        remove_slugs = {slugify(name, max_length=50) for name in remove_names} - {""}
+        if remove_slugs:
+            result = await self.db.execute(
+                select(Tag.id, Tag.slug).where(Tag.slug.in_(remove_slugs), Tag.id.not_in(list(add_ids)))
+            )
+            remove_tags = result.all()
+        
+        if remove_tags:
+            await self.db.execute(
+                delete(post_tags)
+                .where(
+                    post_tags.c.post_id.in_(post_ids),
+                    post_tags.c.tag_id.in_([tag.id for tag in remove_tags]),
+                )
+            )
+        
+        if add_ids:
+            await self.db.execute(
+                insert(post_tags)
+                .from_select(
+                    ["post_id", "tag_id"],
+                    select(Post.id, Tag.id).where(Post.id.in_(post_ids), Tag.id.in_(list(add_ids))),
+                )
+                .on_conflict_do_nothing()
+            )
+        
+        # Сайтмап и экспорт опираются на updated_at
+        await self.db.execute(
+            update(Post)
+            .where(Post.id.in_(post_ids))
+            .values(updated_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        
+        published = [row for row in rows if row.status == PostStatus.PUBLISHED and row.published_at]
+        if published:
+            add_slugs = [tag.slug for tag in add_tags]
+            remove_slugs = [tag.slug for tag in remove_tags]
+            self._defer(index_posts_tags, [
+                (str(row.id), add_slugs, row.published_at.timestamp()) for row in published
+            ])
+            self._defer(unindex_posts_tags, [(str(row.id), remove_slugs) for row in published])
+            self._defer(invalidate_tags_cache)
+            self._defer(
+                invalidate_published_posts,
+                min(row.published_at for row in published).timestamp(),
+                False,
+            )
+        self._defer(invalidate_post_caches, [row.slug for row in rows])
+        
+        return len(rows), [row.id for row in published]
+    
+    async def _delete(self, rows: list) -> tuple[int, list[UUID]]:
+        """Удалить статьи (мягко или сразу, как delete_post)."""
+        if not rows:
+            return 0, []
+        
+        post_ids = [row.id for row in rows]
+        tag_slugs = await self._tag_slugs(post_ids)
+        
+        if settings.soft_delete_enabled:
+            await self.db.execute(
+                update(Post)
+                .where(Post.id.in_(post_ids))
+                .values(deleted_at=func.now())
+                .execution_options(synchronize_session=False)
+            )
+        else:
+            await self.db.execute(
+                delete(Post)
+                .where(Post.id.in_(post_ids))
+                .execution_options(synchronize_session=False)
+            )
+        
+        self._defer(unindex_posts_tags, [(str(post_id), slugs) for post_id, slugs in tag_slugs.items()])
+        self._defer(invalidate_post_caches, [row.slug for row in rows])
+        self._defer(discard_drafts, [str(post_id) for post_id in post_ids])
+        published = [
+            row.published_at for row in rows
+            if row.status == PostStatus.PUBLISHED and row.published_at
+        ]
+        if published:
+            self._defer(invalidate_tags_cache)
+            self._defer(invalidate_published_posts, min(published).timestamp(), True)
+        
+        return len(rows), []
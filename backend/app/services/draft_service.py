@@ -0,0 +1,131 @@
+"""
+Draft Service
+=============
+Автосохранение черновиков.
+
+- Редактор присылает только правки (DraftOperation) к версии текста;
+  версия не совпала -> 409, клиент перечитывает черновик
+- Рабочая копия живёт в Redis (draft:{post_id}), проверка версии
+  и запись атомарны (Lua)
+- В Postgres черновик записывается фоновой задачей (app.jobs.drafts)
+  не чаще раза в DRAFT_PERSIST_INTERVAL секунд, одним UPDATE без
+  перезагрузки автора, тегов и пересчёта slug
+"""
+
+import time
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.exceptions import (
+    NotFoundException,
+    PermissionDeniedException,
+    ValidationException,
+    VersionConflictException,
+)
+from app.db.redis import get_draft, init_draft, save_draft
+from app.models.post import Post, PostStatus
+from app.models.user import User
+from app.schemas.post import DraftOperation, DraftPatch, DraftResponse
+
+
+def apply_operations(content: str, ops: list[DraftOperation]) -> str:
+    """Применить правки по очереди."""
+    for op in ops:
+        if op.pos + op.delete > len(content):
+            raise ValidationException("Draft operation is out of range")
+        content = content[:op.pos] + op.insert + content[op.pos + op.delete:]
+    return content
+
+
+class DraftService:
+    """Сервис автосохранения черновиков."""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def _load(self, post_id: UUID, user: User) -> dict[str, str]:
+        """Черновик из Redis; при первом обращении — загрузка из БД."""
+        draft = await get_draft(str(post_id))
+        
+        if not draft:
+            result = await self.db.execute(
+                select(
+                    Post.author_id,
+                    Post.status,
+                    Post.title,
+                    Post.content,
+                    Post.content_version,
+                )
+                .where(Post.id == post_id, Post.deleted_at.is_(None))
+            )
+            row = result.one_or_none()
+            
+            if row is None:
+                raise NotFoundException("Post")
+            
+            if row.author_id != user.id and not user.is_admin:
+                raise PermissionDeniedException()
+            
+            if row.status != PostStatus.DRAFT:
+                raise ValidationException("Autosave is only available for drafts")
+            
+            await init_draft(
+                str(post_id),
+                str(row.author_id),
+                row.title,
+                row.content,
+                row.content_version,
+                time.time(),
+            )
+            draft = await get_draft(str(post_id))
+        
+        if draft["author_id"] != str(user.id) and not user.is_admin:
+            raise PermissionDeniedException()
+        
+        return draft
+    
+    async def get_draft(self, post_id: UUID, user: User) -> DraftResponse:
+        """Текущая рабочая копия черновика с версией."""
+        draft = await self._load(post_id, user)
+        
+        return DraftResponse(
+            post_id=post_id,
+            version=int(draft["version"]),
+            saved_version=int(draft["saved_version"]),
+            title=draft["title"],
+            content=draft["content"],
+            content_length=len(draft["content"]),
+        )
+    
+    async def patch_draft(self, post_id: UUID, user: User, data: DraftPatch) -> DraftResponse:
+        """
+        Применить правки к версии data.version.
+        
+        Postgres не затрагивается (кроме первой загрузки черновика).
+        """
+        draft = await self._load(post_id, user)
+        
+        version = int(draft["version"])
+        if data.version != version:
+            raise VersionConflictException(version)
+        
+        content = apply_operations(draft["content"], data.ops)
+        if len(content) > settings.draft_max_length:
+            raise ValidationException("Draft is too long")
+        
+        title = data.title if data.title is not None else draft["title"]
+        
+        saved, version = await save_draft(str(post_id), data.version, title, content, time.time())
+        if not saved:
+            raise VersionConflictException(version)
+        
+        return DraftResponse(
+            post_id=post_id,
+            version=version,
+            saved_version=int(draft["saved_version"]),
+            title=title,
+            content_length=len(content),
+        )
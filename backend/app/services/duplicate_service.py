@@ -0,0 +1,166 @@
+"""
+Duplicate Service
+=================
+Поиск почти-дубликатов статей через MinHash + LSH.
+"""
+
+import asyncio
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import Row, delete, func, insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.config import settings
+from app.core.minhash import (
+    band_hashes,
+    compute_signature,
+    estimate_similarity,
+    signature_from_bytes,
+    signature_to_bytes,
+)
+from app.models.post import Post
+from app.models.post_fingerprint import PostFingerprint, PostLSHBand
+
+
+class DuplicateService:
+    """Сервис поиска почти-дубликатов."""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def find_duplicates(
+        self,
+        content: str,
+        exclude_post_id: UUID | None = None,
+    ) -> tuple[np.ndarray, list[tuple[UUID, float]]]:
+        """
+        Найти статьи, похожие на content.
+        
+        1. Сигнатура считается в пуле потоков (не блокирует event loop)
+        2. Кандидаты — статьи с совпавшей полосой LSH (индексный поиск)
+        3. Кандидаты проверяются по оценке сходства сигнатур
+        
+        Returns:
+            (signature, duplicates): сигнатура и [(post_id, similarity)] по убыванию
+        """
+        loop = asyncio.get_running_loop()
+        signature = await loop.run_in_executor(None, compute_signature, content)
+        
+        buckets = [(band, bucket) for band, bucket in enumerate(band_hashes(signature))]
+        
+        query = (
+            select(PostFingerprint.post_id, PostFingerprint.signature)
+            .join(Post, Post.id == PostFingerprint.post_id)
+            .where(
+                Post.deleted_at.is_(None),
+                PostFingerprint.post_id.in_(
+                    select(PostLSHBand.post_id).where(
+                        tuple_(PostLSHBand.band, PostLSHBand.bucket).in_(buckets)
+                    )
+                )
+            )
+        )
+        if exclude_post_id is not None:
+            query = query.where(PostFingerprint.post_id != exclude_post_id)
+        
+        result = await self.db.execute(query)
+        
+        duplicates = []
+        for post_id, candidate in result:
+            similarity = estimate_similarity(signature, signature_from_bytes(candidate))
+            if similarity >= settings.duplicate_similarity_threshold:
+                duplicates.append((post_id, similarity))
+        
+        duplicates.sort(key=lambda item: item[1], reverse=True)
+        
+        return signature, duplicates
+    
+    async def get_stored_duplicate(self, post_id: UUID) -> list[tuple[UUID, float]]:
+        """Дубликат, найденный при последнем сохранении статьи."""
+        result = await self.db.execute(
+            select(PostFingerprint.duplicate_of_id, PostFingerprint.similarity)
+            .where(
+                PostFingerprint.post_id == post_id,
+                PostFingerprint.duplicate_of_id.is_not(None),
+            )
+        )
+        return [(duplicate_of_id, similarity) for duplicate_of_id, similarity in result]
+    
+    async def save_fingerprint(
+        self,
+        post_id: UUID,
+        signature: np.ndarray,
+        duplicates: list[tuple[UUID, float]],
+    ) -> None:
+        """Сохранить сигнатуру и полосы LSH статьи (заменяя старые)."""
+        await self.db.execute(
+            delete(PostFingerprint).where(PostFingerprint.post_id == post_id)
+        )
+        await self.db.execute(
+            delete(PostLSHBand).where(PostLSHBand.post_id == post_id)
+        )
+        
+        duplicate_of_id, similarity = duplicates[0] if duplicates else (None, None)
+        
+        await self.db.execute(
+            insert(PostFingerprint).values(
+                post_id=post_id,
+                signature=signature_to_bytes(signature),
+                duplicate_of_id=duplicate_of_id,
+                similarity=similarity,
+            )
+        )
+        await self.db.execute(
+            insert(PostLSHBand),
+            [
+                {"post_id": post_id, "band": band, "bucket": bucket}
+                for band, bucket in enumerate(band_hashes(signature))
+            ],
+        )
+    
+    async def get_flagged(
+        self,
+        page: int = 1,
+        per_page: int = 20,
+    ) -> tuple[list[Row], int]:
+        """Статьи, помеченные как почти-дубликаты (для админов)."""
+        original = aliased(Post)
+        
+        total_result = await self.db.execute(
+            select(func.count())
+            .select_from(PostFingerprint)
+            .join(Post, Post.id == PostFingerprint.post_id)
+            .where(
+                PostFingerprint.duplicate_of_id.is_not(None),
+                Post.deleted_at.is_(None),
+            )
+        )
+        total = total_result.scalar() or 0
+        
+        result = await self.db.execute(
+            select(
+                Post.id.label("post_id"),
+                Post.title.label("post_title"),
+                Post.slug.label("post_slug"),
+                Post.status.label("post_status"),
+                original.id.label("duplicate_of_id"),
+                original.title.label("duplicate_of_title"),
+                original.slug.label("duplicate_of_slug"),
+                PostFingerprint.similarity,
+                PostFingerprint.updated_at.label("detected_at"),
+            )
+            .select_from(PostFingerprint)
+            .join(Post, Post.id == PostFingerprint.post_id)
+            .join(original, original.id == PostFingerprint.duplicate_of_id)
+            .where(
+                PostFingerprint.duplicate_of_id.is_not(None),
+                Post.deleted_at.is_(None),
+            )
+            .order_by(PostFingerprint.updated_at.desc())
+            .offset((page - 1) * per_page)
+            .limit(per_page)
+        )
+        
+        return list(result.all()), total
@@ -0,0 +1,135 @@
+"""
+Email Service
+=============
+Рендеринг писем из Jinja-шаблонов и отправка через пул SMTP.
+
+Шаблоны письма лежат в app/templates/email:
+- {name}.txt  — текстовая часть, задаёт тему: {% set subject = "..." %}
+- {name}.html — HTML-часть (наследует base.html)
+
+Шаблоны компилируются один раз при импорте модуля. Из обработчиков
+запросов письма только ставятся в очередь (app.jobs.tasks.send_email),
+рендеринг и SMTP выполняются воркером.
+"""
+
+import logging
+from dataclasses import dataclass
+from email.message import EmailMessage
+from email.utils import make_msgid
+from pathlib import Path
+from typing import Any
+
+import aiosmtplib
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, Template
+from markupsafe import Markup
+
+from app.config import settings
+from app.core.mailer import mailer
+
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
+
+
+@dataclass
+class RenderedEmail:
+    """Готовое к отправке письмо."""
+    
+    subject: str
+    text: str
+    html: str | None
+
+
+def _create_environment() -> Environment:
+    env = Environment(
+        loader=FileSystemLoader(TEMPLATES_DIR),
+        autoescape=lambda name: bool(name and name.endswith(".html")),
+        undefined=StrictUndefined,
+        auto_reload=False,
+        cache_size=-1,
+        trim_blocks=True,
+        lstrip_blocks=True,
+    )
+    env.globals["frontend_url"] = settings.frontend_url
+    return env
+
+
+templates = _create_environment()
+
+# Предкомпилированные шаблоны писем: "email/verify_email.txt" -> Template
+_compiled: dict[str, Template] = {
+    name: templates.get_template(name)
+    for name in templates.list_templates(filter_func=lambda name: name.startswith("email/"))
+}
+
+
+def get_template(name: str) -> Template:
+    try:
+        return _compiled[name]
+    except KeyError:
+        raise ValueError(f"Unknown email template {name!r}") from None
+
+
+def render_email(template: str, context: dict[str, Any]) -> RenderedEmail:
+    """
+    Отрендерить письмо.
+    
+    Args:
+        template: Имя письма без расширения (verify_email)
+        context: Переменные шаблона
+    """
+    module = get_template(f"email/{template}.txt").make_module(context)
+    subject = getattr(module, "subject", "")
+    
+    html = None
+    if f"email/{template}.html" in _compiled:
+        html = get_template(f"email/{template}.html").render(subject=subject, **context)
+    
+    return RenderedEmail(subject=subject, text=str(module), html=html)
+
+
+def render_fragment(name: str, context: dict[str, Any]) -> tuple[Markup, str]:
+    """
+    Общий фрагмент писем (email/_{name}.html и .txt).
+    
+    Рендерится один раз и подставляется во многие письма: HTML уже
+    экранирован и вставляется как есть.
+    """
+    html = get_template(f"email/_{name}.html").render(**context)
+    text = get_template(f"email/_{name}.txt").render(**context)
+    return Markup(html), text
+
+
+def build_message(to: str, email: RenderedEmail) -> EmailMessage:
+    """MIME-письмо: text/plain + text/html (multipart/alternative)."""
+    message = EmailMessage()
+    message["From"] = settings.email_from
+    message["To"] = to
+    message["Subject"] = email.subject
+    message["Message-ID"] = make_msgid(domain=settings.email_from.rpartition("@")[2] or None)
+    
+    message.set_content(email.text)
+    if email.html is not None:
+        message.add_alternative(email.html, subtype="html")
+    
+    return message
+
+
+async def deliver_email(to: str, template: str, context: dict[str, Any]) -> None:
+    """
+    Отрендерить и отправить письмо (выполняется воркером очереди).
+    
+    Временные ошибки SMTP пробрасываются — очередь повторит отправку
+    с backoff. Отказ сервера принять адрес не повторяется.
+    """
+    if not settings.email_enabled:
+        logger.info("Email disabled, skipping %s to %s", template, to)
+        return
+    
+    message = build_message(to, render_email(template, context))
+    
+    try:
+        await mailer.send(message)
+    except aiosmtplib.SMTPRecipientsRefused as exc:
+        logger.warning("Recipient refused %s: %s", to, exc.recipients)
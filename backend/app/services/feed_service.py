@@ -0,0 +1,238 @@
+"""
+Feed Service
+============
+sitemap.xml и ленты RSS/Atom.
+
+Готовые документы хранятся в Redis вместе с ETag и не пересобираются
+на каждый запрос краулера:
+- sitemap разбит на шарды по SITEMAP_SHARD_SIZE постов в порядке
+  (published_at, id); новые посты попадают в последний шард, поэтому
+  публикация или правка статьи сбрасывает один-два шарда
+  (invalidate_published_posts), остальные остаются в кэше
+- шард собирается потоковым чтением строк, без загрузки Post в ORM;
+  если предыдущий шард в кэше, выборка начинается с его последнего
+  ключа (keyset), иначе — OFFSET по частичному индексу
+- ленты (общая и по тегам) короткие и сбрасываются целиком
+"""
+
+import hashlib
+import math
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.exceptions import NotFoundException
+from app.core.feeds import (
+    SITEMAP_MAX_URLS,
+    SITEMAPINDEX_CLOSE,
+    SITEMAPINDEX_OPEN,
+    URLSET_CLOSE,
+    URLSET_OPEN,
+    XML_DECLARATION,
+    FeedItem,
+    atom_feed,
+    rss_feed,
+    sitemap_entry,
+    sitemap_url,
+)
+from app.db.redis import (
+    cache_feed,
+    cache_sitemap_index,
+    cache_sitemap_shard,
+    get_cached_feed,
+    get_sitemap_index,
+    get_sitemap_shard,
+    invalidate_feeds,
+    invalidate_sitemap,
+)
+from app.models.post import Post, PostStatus
+from app.models.tag import Tag, post_tags
+from app.models.user import User
+
+
+STREAM_CHUNK_SIZE = 1000
+
+_PUBLISHED = (Post.status == PostStatus.PUBLISHED, Post.deleted_at.is_(None))
+
+
+def post_url(slug: str) -> str:
+    return f"{settings.frontend_url}/blog/{slug}"
+
+
+def _document(xml: str, **extra: str) -> dict[str, str]:
+    """Документ для кэша: XML и ETag по содержимому."""
+    etag = '"' + hashlib.sha1(xml.encode()).hexdigest() + '"'
+    return {"xml": xml, "etag": etag, **extra}
+
+
+async def invalidate_published_posts(published_ts: float, shift: bool) -> None:
+    """
+    Сбросить sitemap и ленты после изменения опубликованных статей.
+    
+    published_ts — самый ранний published_at среди изменённых статей;
+    shift — статьи опубликованы, сняты с публикации или удалены.
+    """
+    await invalidate_sitemap(published_ts, shift)
+    await invalidate_feeds()
+
+
+class FeedService:
+    """Сервис sitemap и лент."""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    @property
+    def shard_size(self) -> int:
+        return min(settings.sitemap_shard_size, SITEMAP_MAX_URLS)
+    
+    # === Sitemap ===
+    
+    async def get_sitemap_index(self) -> dict[str, str]:
+        """Индекс sitemap: ссылки на шарды с lastmod."""
+        document = await get_sitemap_index()
+        if document:
+            return document
+        
+        result = await self.db.execute(
+            select(func.count()).select_from(Post).where(*_PUBLISHED)
+        )
+        shards = max(1, math.ceil(result.scalar_one() / self.shard_size))
+        
+        parts = [XML_DECLARATION, SITEMAPINDEX_OPEN]
+        for shard in range(shards):
+            shard_document = await self.get_sitemap_shard(shard)
+            lastmod = shard_document.get("lastmod")
+            parts.append(sitemap_entry(
+                f"{settings.public_url}/sitemaps/{shard}.xml",
+                datetime.fromisoformat(lastmod) if lastmod else None,
+            ))
+        parts.append(SITEMAPINDEX_CLOSE)
+        
+        document = _document("".join(parts))
+        await cache_sitemap_index(document)
+        return document
+    
+    async def get_sitemap_shard(self, shard: int) -> dict[str, str]:
+        """Шард sitemap из кэша или собранный заново."""
+        document = await get_sitemap_shard(shard)
+        if document:
+            return document
+        
+        query = (
+            select(Post.id, Post.slug, Post.published_at, Post.updated_at)
+            .where(*_PUBLISHED)
+            .order_by(Post.published_at, Post.id)
+            .limit(self.shard_size)
+            .execution_options(yield_per=STREAM_CHUNK_SIZE)
+        )
+        previous = await get_sitemap_shard(shard - 1) if shard > 0 else {}
+        if previous.get("last_published_at"):
+            query = query.where(
+                tuple_(Post.published_at, Post.id) > (
+                    datetime.fromisoformat(previous["last_published_at"]),
+                    UUID(previous["last_id"]),
+                )
+            )
+        else:
+            query = query.offset(shard * self.shard_size)
+        
+        parts = [XML_DECLARATION, URLSET_OPEN]
+        first = last = None
+        lastmod: datetime | None = None
+        
+        result = await self.db.stream(query)
+        async for rows in result.partitions():
+            for row in rows:
+                parts.append(sitemap_url(post_url(row.slug), row.updated_at))
+                if lastmod is None or row.updated_at > lastmod:
+                    lastmod = row.updated_at
+            first = first or rows[0]
+            last = rows[-1]
+        
+        parts.append(URLSET_CLOSE)
+        
+        if first is None:
+            # Пустым бывает только единственный шард пустого блога
+            if shard > 0:
+                raise NotFoundException("Sitemap")
+            return _document("".join(parts))
+        
+        document = _document(
+            "".join(parts),
+            lastmod=lastmod.isoformat(),
+            last_published_at=last.published_at.isoformat(),
+            last_id=str(last.id),
+        )
+        await cache_sitemap_shard(shard, document, first.published_at.timestamp())
+        return document
+    
+    # === Ленты ===
+    
+    async def get_feed(self, fmt: str, tag_slug: str | None = None) -> dict[str, str]:
+        """Последние FEED_MAX_ITEMS статей (все или с тегом) в RSS или Atom."""
+        key = f"{fmt}:{tag_slug or '*'}"
+        document = await get_cached_feed(key)
+        if document:
+            return document
+        
+        query = (
+            select(
+                Post.slug,
+                Post.title,
+                Post.excerpt,
+                Post.content_html,
+                Post.published_at,
+                Post.updated_at,
+                User.username,
+            )
+            .join(User, User.id == Post.author_id)
+            .where(*_PUBLISHED)
+            .order_by(Post.published_at.desc())
+            .limit(settings.feed_max_items)
+        )
+        
+        title, link = settings.site_title, f"{settings.frontend_url}/blog"
+        feed_url = f"{settings.public_url}/feed.xml"
+        
+        if tag_slug is not None:
+            result = await self.db.execute(select(Tag.id, Tag.name).where(Tag.slug == tag_slug))
+            tag = result.one_or_none()
+            if tag is None:
+                raise NotFoundException("Tag")
+            
+            query = query.join(post_tags, post_tags.c.post_id == Post.id).where(
+                post_tags.c.tag_id == tag.id
+            )
+            title = f"{settings.site_title}: {tag.name}"
+            link = f"{settings.frontend_url}/blog?tag={tag_slug}"
+            feed_url = f"{settings.public_url}/tags/{tag_slug}/feed.xml"
+        
+        if fmt == "atom":
+            feed_url += "?format=atom"
+        
+        result = await self.db.execute(query)
+        items = [
+            FeedItem(
+                title=row.title,
+                link=post_url(row.slug),
+                summary=row.excerpt or "",
+                content_html=row.content_html or "",
+                author=row.username,
+                published=row.published_at,
+                updated=row.updated_at,
+            )
+            for row in result
+        ]
+        
+        if fmt == "atom":
+            xml = atom_feed(title, link, feed_url, items)
+        else:
+            xml = rss_feed(title, link, settings.site_title, items)
+        
+        document = _document(xml)
+        await cache_feed(key, document, settings.feed_cache_ttl)
+        return document
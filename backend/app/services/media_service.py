@@ -0,0 +1,212 @@
+"""
+Media Service
+=============
+Загрузка изображений.
+
+- Тело загрузки копируется на диск кусками, хэш SHA-256
+  считается на лету — файл целиком в память не читается
+- Декодирование и ресайз выполняются в пуле процессов
+  (app.core.images), event loop занят только вводом-выводом
+- Одинаковые файлы хранятся один раз (адресация по содержимому)
+- Произвольные размеры генерируются по запросу и кэшируются на диске
+  (app.core.media_cache)
+"""
+
+import asyncio
+import hashlib
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import BinaryIO
+
+from fastapi import UploadFile
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.core.exceptions import NotFoundException, PayloadTooLargeException, ValidationException
+from app.core.images import ImageError, generate_variants, get_process_pool, render_derivative
+from app.core.media_cache import derivative_cache
+from app.models.media import Media
+from app.models.user import User
+from app.schemas.media import MediaResponse, MediaVariant
+
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class _TooLarge(Exception):
+    pass
+
+
+def _spool(source: BinaryIO, target: Path, max_bytes: int) -> tuple[str, int]:
+    """Скопировать загрузку в файл кусками, вернуть (sha256, размер)."""
+    digest = hashlib.sha256()
+    size = 0
+    
+    source.seek(0)
+    with open(target, "wb") as out:
+        while chunk := source.read(CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_bytes:
+                raise _TooLarge
+            digest.update(chunk)
+            out.write(chunk)
+    
+    return digest.hexdigest(), size
+
+
+def _remove(path: Path) -> None:
+    path.unlink(missing_ok=True)
+
+
+def original_path(sha256: str) -> Path:
+    return Path(settings.media_dir) / "originals" / sha256[:2] / sha256
+
+
+def variants_dir(sha256: str) -> Path:
+    return Path(settings.media_dir) / "variants" / sha256[:2] / sha256
+
+
+def variant_url(sha256: str, width: int, fmt: str) -> str:
+    return f"{settings.media_url_prefix}/variants/{sha256[:2]}/{sha256}/{width}.{fmt}"
+
+
+async def get_derivative(
+    sha256: str,
+    width: int | None,
+    height: int | None,
+    fmt: str,
+) -> Path:
+    """
+    Путь к изображению, вписанному в рамку width x height.
+    
+    Генерируется в пуле процессов при первом запросе, дальше
+    отдаётся из кэша. БД не используется: оригинал ищется по хэшу.
+    """
+    source = original_path(sha256)
+    if not await run_in_threadpool(source.is_file):
+        raise NotFoundException("Media")
+    
+    async def build(target: Path) -> int:
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                get_process_pool(),
+                render_derivative,
+                str(source),
+                str(target),
+                width,
+                height,
+                fmt,
+                settings.media_max_pixels,
+            )
+        except ImageError as exc:
+            raise ValidationException(str(exc))
+    
+    key = f"{sha256[:2]}/{sha256}/{width or 0}x{height or 0}.{fmt}"
+    return await derivative_cache.get(key, build)
+
+
+class MediaService:
+    """Сервис загруженных изображений."""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def upload(self, user: User, file: UploadFile) -> MediaResponse:
+        """
+        Сохранить изображение и сгенерировать варианты.
+        
+        1. Размер проверяется до чтения (Content-Length части) и при копировании
+        2. Файл с тем же SHA-256 уже есть -> возвращается существующая запись
+        3. Варианты генерируются в пуле процессов, оригинал переносится
+           в originals/ только после успешного декодирования
+        """
+        max_bytes = settings.media_max_upload_bytes
+        if file.size is not None and file.size > max_bytes:
+            raise PayloadTooLargeException(max_bytes)
+        
+        tmp_dir = Path(settings.media_dir) / "tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        tmp = tmp_dir / uuid.uuid4().hex
+        
+        try:
+            sha256, size = await run_in_threadpool(_spool, file.file, tmp, max_bytes)
+        except _TooLarge:
+            await run_in_threadpool(_remove, tmp)
+            raise PayloadTooLargeException(max_bytes)
+        
+        try:
+            media = await self._get_by_hash(sha256)
+            if media is None:
+                media = await self._process(user, tmp, sha256, size)
+        finally:
+            await run_in_threadpool(_remove, tmp)
+        
+        return self._to_response(media)
+    
+    async def _get_by_hash(self, sha256: str) -> Media | None:
+        result = await self.db.execute(select(Media).where(Media.sha256 == sha256))
+        return result.scalar_one_or_none()
+    
+    async def _process(self, user: User, tmp: Path, sha256: str, size: int) -> Media:
+        output_dir = variants_dir(sha256)
+        loop = asyncio.get_running_loop()
+        
+        try:
+            info = await loop.run_in_executor(
+                get_process_pool(),
+                generate_variants,
+                str(tmp),
+                str(output_dir),
+                settings.media_variant_widths,
+                settings.media_formats,
+                settings.media_max_pixels,
+            )
+        except ImageError as exc:
+            await run_in_threadpool(shutil.rmtree, output_dir, True)
+            raise ValidationException(str(exc))
+        except BaseException:
+            # Недописанные варианты не должны остаться без записи в БД
+            await run_in_threadpool(shutil.rmtree, output_dir, True)
+            raise
+        
+        original = original_path(sha256)
+        original.parent.mkdir(parents=True, exist_ok=True)
+        await run_in_threadpool(os.replace, tmp, original)
+        
+        # Параллельная загрузка того же файла могла успеть вставить запись
+        await self.db.execute(
+            insert(Media)
+            .values(
+                sha256=sha256,
+                uploader_id=user.id,
+                format=info["format"],
+                width=info["width"],
+                height=info["height"],
+                size_bytes=size,
+                variants=info["variants"],
+            )
+            .on_conflict_do_nothing(index_elements=["sha256"])
+        )
+        return await self._get_by_hash(sha256)
+    
+    def _to_response(self, media: Media) -> MediaResponse:
+        return MediaResponse(
+            hash=media.sha256,
+            format=media.format,
+            width=media.width,
+            height=media.height,
+            size_bytes=media.size_bytes,
+            variants=[
+                MediaVariant(
+                    url=variant_url(media.sha256, variant["width"], variant["format"]),
+                    **variant,
+                )
+                for variant in media.variants
+            ],
+        )
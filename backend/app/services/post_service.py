@@ -4,21 +4,76 @@ Post Service
 Бизнес-логика статей с полнотекстовым поиском.
 """
 
-from datetime import datetime
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta, timezone
+from functools import partial
 from uuid import UUID
 
 from slugify import slugify
-from sqlalchemy import func, select, or_
+from sqlalchemy import Row, delete, func, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, defer, selectinload
+from starlette.concurrency import run_in_threadpool
 
-from app.core.exceptions import NotFoundException, PermissionDeniedException
-from app.db.redis import cache_post, get_cached_post, invalidate_post_cache
+from app.config import settings
+from app.core.exceptions import (
+    DuplicateContentException,
+    NotFoundException,
+    PermissionDeniedException,
+    ValidationException,
+)
+from app.core.render import RenderedContent, render_content
+from app.db.events import event_buffer
+from app.db.redis import (
+    cache_post,
+    count_unique_views,
+    discard_draft,
+    fill_tag_index,
+    get_cached_post,
+    get_missing_tag_indexes,
+    get_tag_post_ids,
+    index_post_tags,
+    invalidate_post_cache,
+    invalidate_tags_cache,
+    record_unique_view,
+    unindex_post_tags,
+)
 from app.models.post import Post, PostStatus
-from app.models.tag import Tag
+from app.models.tag import Tag, post_tags
 from app.models.like import Like
+from app.models.related_post import RelatedPost
 from app.models.user import User
 from app.schemas.post import PostCreate, PostUpdate
+from app.services.analytics_service import record_post_event
+from app.services.duplicate_service import DuplicateService
+from app.services.feed_service import invalidate_published_posts
+from app.services.revision_service import RevisionService
+from app.services.tag_service import TagService
+
+
+# Статусы, при переходе в которые проверяются почти-дубликаты
+_PUBLISHING_STATUSES = (PostStatus.PUBLISHED, PostStatus.SCHEDULED)
+
+# Отрендеренный текст в списках не нужен
+_LIST_DEFERRED = (defer(Post.content_html), defer(Post.content_text), defer(Post.toc))
+
+
+def _check_publish_at(publish_at: datetime | None) -> datetime:
+    """Время отложенной публикации: обязательно и в будущем (naive считаем UTC)."""
+    if publish_at is None:
+        raise ValidationException("publish_at is required for scheduled posts")
+    if publish_at.tzinfo is None:
+        publish_at = publish_at.replace(tzinfo=timezone.utc)
+    if publish_at <= datetime.now(timezone.utc):
+        raise ValidationException("publish_at must be in the future")
+    return publish_at
+
+
+def _published_score(published_at: datetime) -> float:
+    """Score для индекса тегов (naive datetime считаем UTC)."""
+    if published_at.tzinfo is None:
+        published_at = published_at.replace(tzinfo=timezone.utc)
+    return published_at.timestamp()
 
 
 class PostService:
@@ -26,6 +81,18 @@ class PostService:
     
     def __init__(self, db: AsyncSession):
         self.db = db
+        self._after_commit: list[Callable[[], Awaitable[object]]] = []
+    
+    async def after_commit(self) -> None:
+        """
+        Сбросы, отложенные до commit транзакции запроса.
+        
+        Шард sitemap кэшируется на сутки: перестроенный до commit,
+        он надолго остался бы без изменения.
+        """
+        actions, self._after_commit = self._after_commit, []
+        for action in actions:
+            await action()
     
     async def get_posts(
         self,
@@ -33,28 +100,49 @@ class PostService:
         per_page: int = 10,
         status: PostStatus | None = PostStatus.PUBLISHED,
         author_id: UUID | None = None,
-        tag_slug: str | None = None,
+        tag_slugs: list[str] | None = None,
+        tag_match_all: bool = True,
         search: str | None = None,
     ) -> tuple[list[Post], int]:
         """
         Получить список статей с фильтрами и пагинацией.
+        
+        Опубликованные статьи по тегам читаются из Redis-индексов тегов,
+        остальные комбинации фильтров идут через SQL.
         """
+        if (
+            tag_slugs
+            and status == PostStatus.PUBLISHED
+            and author_id is None
+            and not search
+        ):
+            return await self._get_posts_by_tag_index(
+                tag_slugs, tag_match_all, page, per_page
+            )
+        
         query = select(Post).options(
             selectinload(Post.author),
             selectinload(Post.tags),
             selectinload(Post.likes),
             selectinload(Post.comments),
+            *_LIST_DEFERRED,
         )
         
         # Фильтры
+        query = query.where(Post.deleted_at.is_(None))
+        
         if status:
             query = query.where(Post.status == status)
         
         if author_id:
             query = query.where(Post.author_id == author_id)
         
-        if tag_slug:
-            query = query.join(Post.tags).where(Tag.slug == tag_slug)
+        if tag_slugs:
+            if tag_match_all:
+                for slug in tag_slugs:
+                    query = query.where(Post.tags.any(Tag.slug == slug))
+            else:
+                query = query.where(Post.tags.any(Tag.slug.in_(tag_slugs)))
         
         if search:
             # PostgreSQL Full-Text Search
@@ -76,6 +164,139 @@ class PostService:
         
         return list(posts), total
     
+    async def _get_posts_by_tag_index(
+        self,
+        tag_slugs: list[str],
+        match_all: bool,
+        page: int,
+        per_page: int,
+    ) -> tuple[list[Post], int]:
+        """
+        Опубликованные статьи по тегам через Redis sorted sets.
+        
+        1. Прогреваем индексы тегов, которых нет в Redis
+        2. Читаем диапазон ID (пересечение/объединение для нескольких тегов)
+        3. Загружаем статьи одним WHERE id IN (...)
+        """
+        for slug in await get_missing_tag_indexes(tag_slugs):
+            await self._rebuild_tag_index(slug)
+        
+        ids, total = await get_tag_post_ids(
+            tag_slugs,
+            offset=(page - 1) * per_page,
+            limit=per_page,
+            match_all=match_all,
+        )
+        
+        posts = await self._get_posts_by_ids([UUID(post_id) for post_id in ids])
+        
+        return posts, total
+    
+    async def _get_posts_by_ids(self, post_ids: list[UUID]) -> list[Post]:
+        """Батчевая загрузка статей с сохранением порядка ID."""
+        if not post_ids:
+            return []
+        
+        result = await self.db.execute(
+            select(Post)
+            .options(
+                selectinload(Post.author),
+                selectinload(Post.tags),
+                selectinload(Post.likes),
+                selectinload(Post.comments),
+                *_LIST_DEFERRED,
+            )
+            .where(Post.id.in_(post_ids), Post.deleted_at.is_(None))
+        )
+        by_id = {post.id: post for post in result.scalars().all()}
+        
+        return [by_id[post_id] for post_id in post_ids if post_id in by_id]
+    
+    async def _rebuild_tag_index(self, tag_slug: str) -> None:
+        """Построить индекс тега из БД (холодный старт или вытеснение)."""
+        result = await self.db.execute(
+            select(Post.id, Post.published_at)
+            .join(post_tags, post_tags.c.post_id == Post.id)
+            .join(Tag, Tag.id == post_tags.c.tag_id)
+            .where(
+                Tag.slug == tag_slug,
+                Post.status == PostStatus.PUBLISHED,
+                Post.published_at.is_not(None),
+                Post.deleted_at.is_(None),
+            )
+        )
+        await fill_tag_index(
+            tag_slug,
+            {str(post_id): _published_score(published_at) for post_id, published_at in result},
+        )
+    
+    async def _sync_tag_index(
+        self,
+        post: Post,
+        old_tag_slugs: set[str],
+        was_published: bool,
+    ) -> None:
+        """
+        Синхронизировать индексы тегов после изменения статьи.
+        
+        Убираем статью из тегов, где её больше не должно быть,
+        и добавляем в текущие теги, если она опубликована.
+        """
+        new_tag_slugs = (
+            {tag.slug for tag in post.tags}
+            if post.is_published and post.published_at
+            else set()
+        )
+        
+        stale = old_tag_slugs - new_tag_slugs if was_published else set()
+        if stale:
+            await unindex_post_tags(str(post.id), stale)
+        
+        if new_tag_slugs:
+            await index_post_tags(
+                str(post.id), new_tag_slugs, _published_score(post.published_at)
+            )
+        
+        # Счётчики тегов изменились
+        if stale or new_tag_slugs != (old_tag_slugs if was_published else set()):
+            await invalidate_tags_cache()
+    
+    async def _ensure_not_duplicate(
+        self,
+        duplicates: list[tuple[UUID, float]],
+    ) -> None:
+        """Запретить публикацию почти-дубликата (если включено в настройках)."""
+        if not duplicates or not settings.duplicate_block_publication:
+            return
+        
+        result = await self.db.execute(
+            select(Post.slug).where(Post.id == duplicates[0][0])
+        )
+        raise DuplicateContentException(result.scalar_one_or_none() or "unknown")
+    
+    async def _resolve_tags(
+        self,
+        tag_ids: list[UUID],
+        tag_names: list[str],
+    ) -> list[Tag]:
+        """
+        Теги статьи по ID и/или названиям.
+        Недостающие теги по названиям создаются одним запросом.
+        """
+        tags: dict[UUID, Tag] = {}
+        
+        if tag_ids:
+            result = await self.db.execute(
+                select(Tag).where(Tag.id.in_(tag_ids))
+            )
+            tags.update((tag.id, tag) for tag in result.scalars().all())
+        
+        if tag_names:
+            created = await TagService(self.db).get_or_create_by_names(tag_names)
+            tags.update((tag.id, tag) for tag in created)
+        
+        return list(tags.values())
+    
     async def get_post_by_slug(self, slug: str) -> Post:
         """
         Получить статью по slug.
@@ -91,7 +312,7 @@ class PostService:
                     # Загружаем пользователей комментариев
                 ),
             )
-            .where(Post.slug == slug)
+            .where(Post.slug == slug, Post.deleted_at.is_(None))
         )
         post = result.scalar_one_or_none()
         
@@ -100,6 +321,34 @@ class PostService:
         
         return post
     
+    async def get_related_posts(self, slug: str) -> list[Row]:
+        """
+        Похожие статьи из предрассчитанной таблицы related_posts.
+        Один запрос по индексу (post_id, rank).
+        """
+        source = aliased(Post)
+        result = await self.db.execute(
+            select(
+                Post.id,
+                Post.title,
+                Post.slug,
+                Post.excerpt,
+                Post.cover_image,
+                Post.published_at,
+                RelatedPost.score,
+            )
+            .join(RelatedPost, RelatedPost.related_post_id == Post.id)
+            .join(source, source.id == RelatedPost.post_id)
+            .where(
+                source.slug == slug,
+                Post.status == PostStatus.PUBLISHED,
+                Post.deleted_at.is_(None),
+            )
+            .order_by(RelatedPost.rank)
+        )
+        
+        return list(result.all())
+    
     async def get_post_by_id(self, post_id: UUID) -> Post:
         """Получить статью по ID."""
         result = await self.db.execute(
@@ -108,7 +357,7 @@ class PostService:
                 selectinload(Post.author),
                 selectinload(Post.tags),
             )
-            .where(Post.id == post_id)
+            .where(Post.id == post_id, Post.deleted_at.is_(None))
         )
         post = result.scalar_one_or_none()
         
@@ -121,37 +370,60 @@ class PostService:
         """
         Создать новую статью.
         """
+        # Поиск почти-дубликатов (MinHash + LSH)
+        duplicate_service = DuplicateService(self.db)
+        signature, duplicates = await duplicate_service.find_duplicates(data.content)
+        if data.status in _PUBLISHING_STATUSES:
+            await self._ensure_not_duplicate(duplicates)
+        
         # Генерируем уникальный slug
         slug = await self._generate_unique_slug(data.title)
         
+        rendered = await run_in_threadpool(render_content, data.content)
+        
         post = Post(
             author_id=user.id,
             title=data.title,
             slug=slug,
             content=data.content,
-            excerpt=data.excerpt or self._generate_excerpt(data.content),
+            excerpt=data.excerpt or rendered.excerpt(),
             cover_image=data.cover_image,
             status=data.status,
             meta_title=data.meta_title or data.title[:70],
-            meta_description=data.meta_description or self._generate_excerpt(data.content, 160),
+            meta_description=data.meta_description or rendered.excerpt(160),
         )
+        self._apply_rendered(post, rendered)
         
-        # Публикация
+        # Публикация (сразу или отложенная)
         if data.status == PostStatus.PUBLISHED:
             post.published_at = datetime.utcnow()
+        elif data.status == PostStatus.SCHEDULED:
+            post.publish_at = _check_publish_at(data.publish_at)
         
         # Добавляем теги
-        if data.tag_ids:
-            result = await self.db.execute(
-                select(Tag).where(Tag.id.in_(data.tag_ids))
-            )
-            tags = result.scalars().all()
-            post.tags = list(tags)
+        tags = await self._resolve_tags(data.tag_ids, data.tags)
+        post.tags = tags
         
         self.db.add(post)
         await self.db.flush()
         await self.db.refresh(post)
         
+        await duplicate_service.save_fingerprint(post.id, signature, duplicates)
+        await RevisionService(self.db).record_created(post, user)
+        
+        if post.published_at and tags:
+            await index_post_tags(
+                str(post.id),
+                [tag.slug for tag in tags],
+                _published_score(post.published_at),
+            )
+            await invalidate_tags_cache()
+        
+        if post.published_at:
+            self._after_commit.append(partial(
+                invalidate_published_posts, _published_score(post.published_at), True
+            ))
+        
         return post
     
     async def update_post(
@@ -170,10 +442,16 @@ class PostService:
         if post.author_id != user.id and not user.is_admin:
             raise PermissionDeniedException()
         
+        old_tag_slugs = {tag.slug for tag in post.tags}
+        old_status = post.status
+        old_published_at = post.published_at
+        was_published = post.is_published
+        old_text = (post.title, post.content)
+        
         # Обновляем поля
         update_data = data.model_dump(exclude_unset=True)
         
-        if "title" in update_data:
+        if "title" in update_data and update_data["title"] != post.title:
             post.title = update_data["title"]
             post.slug = await self._generate_unique_slug(
                 update_data["title"],
@@ -182,8 +460,16 @@ class PostService:
         
         if "content" in update_data:
             post.content = update_data["content"]
+            rendered = await run_in_threadpool(render_content, post.content)
+            self._apply_rendered(post, rendered)
             if not post.excerpt:
-                post.excerpt = self._generate_excerpt(update_data["content"])
+                post.excerpt = rendered.excerpt()
+        
+        text_changed = (post.title, post.content) != old_text
+        if text_changed:
+            # Ревизия пишется до flush, под блокировкой строки статьи
+            await RevisionService(self.db).record_updated(post, user)
+            post.content_version = Post.content_version + 1
         
         if "excerpt" in update_data:
             post.excerpt = update_data["excerpt"]
@@ -196,23 +482,61 @@ class PostService:
             if update_data["status"] == PostStatus.PUBLISHED and not post.published_at:
                 post.published_at = datetime.utcnow()
         
+        # Отложенная публикация: время задаётся вместе со статусом или отдельно
+        if post.status == PostStatus.SCHEDULED:
+            if "publish_at" in update_data or old_status != PostStatus.SCHEDULED:
+                post.publish_at = _check_publish_at(update_data.get("publish_at", post.publish_at))
+            post.published_at = None
+        else:
+            post.publish_at = None
+        
         if "meta_title" in update_data:
             post.meta_title = update_data["meta_title"]
         
         if "meta_description" in update_data:
             post.meta_description = update_data["meta_description"]
         
-        if "tag_ids" in update_data:
-            result = await self.db.execute(
-                select(Tag).where(Tag.id.in_(update_data["tag_ids"]))
+        if "tag_ids" in update_data or "tags" in update_data:
+            post.tags = await self._resolve_tags(
+                update_data.get("tag_ids") or [],
+                update_data.get("tags") or [],
+            )
+        
+        # Поиск почти-дубликатов: при смене текста — заново,
+        # при публикации без изменений текста — по сохранённому результату
+        duplicate_service = DuplicateService(self.db)
+        if "content" in update_data:
+            signature, duplicates = await duplicate_service.find_duplicates(
+                post.content, exclude_post_id=post.id
+            )
+            await duplicate_service.save_fingerprint(post.id, signature, duplicates)
+            if post.status in _PUBLISHING_STATUSES:
+                await self._ensure_not_duplicate(duplicates)
+        elif post.status in _PUBLISHING_STATUSES and old_status not in _PUBLISHING_STATUSES:
+            await self._ensure_not_duplicate(
+                await duplicate_service.get_stored_duplicate(post.id)
             )
-            tags = result.scalars().all()
-            post.tags = list(tags)
         
         await self.db.flush()
         
-        # Сбрасываем кэш
+        # Сбрасываем кэш и обновляем индексы тегов
         await invalidate_post_cache(post.slug)
+        await self._sync_tag_index(post, old_tag_slugs, was_published)
+        
+        # Sitemap и ленты: правка на месте или появление/исчезновение статьи
+        if was_published or post.is_published:
+            published_at = min(filter(None, (old_published_at, post.published_at)))
+            self._after_commit.append(partial(
+                invalidate_published_posts,
+                _published_score(published_at),
+                was_published != post.is_published,
+            ))
+        
+        # Сохранение целиком заменяет черновик автосохранения. При смене текста
+        # строка ещё заблокирована до commit: app.jobs.drafts перечитывает
+        # черновик под той же блокировкой и не перезапишет эту правку
+        if text_changed or "status" in update_data:
+            await discard_draft(str(post.id))
         
         return post
     
@@ -220,27 +544,118 @@ class PostService:
         """
         Удалить статью.
         Только автор или админ.
+        
+        Статья не загружается вместе с комментариями и лайками:
+        - мягкое удаление — один UPDATE deleted_at, строку позже
+          удалит фоновая задача очистки (app.jobs.purge)
+        - жёсткое удаление — один DELETE, зависимые строки удаляет
+          ON DELETE CASCADE в БД
         """
-        post = await self.get_post_by_id(post_id)
+        result = await self.db.execute(
+            select(Post.author_id, Post.slug, Post.status, Post.published_at)
+            .where(Post.id == post_id, Post.deleted_at.is_(None))
+        )
+        post = result.one_or_none()
+        
+        if post is None:
+            raise NotFoundException("Post")
         
         if post.author_id != user.id and not user.is_admin:
             raise PermissionDeniedException()
         
-        await invalidate_post_cache(post.slug)
-        await self.db.delete(post)
+        tags_result = await self.db.execute(
+            select(Tag.slug)
+            .join(post_tags, post_tags.c.tag_id == Tag.id)
+            .where(post_tags.c.post_id == post_id)
+        )
+        tag_slugs = list(tags_result.scalars().all())
+        
+        if settings.soft_delete_enabled:
+            await self.db.execute(
+                update(Post)
+                .where(Post.id == post_id)
+                .values(deleted_at=func.now())
+                .execution_options(synchronize_session=False)
+            )
+        else:
+            await self.db.execute(
+                delete(Post)
+                .where(Post.id == post_id)
+                .execution_options(synchronize_session=False)
+            )
         await self.db.flush()
+        
+        # Статья пропадает из кэша и индексов тегов сразу
+        await invalidate_post_cache(post.slug)
+        if tag_slugs:
+            await unindex_post_tags(str(post_id), tag_slugs)
+            if post.status == PostStatus.PUBLISHED:
+                await invalidate_tags_cache()
+        
+        if post.status == PostStatus.PUBLISHED and post.published_at:
+            self._after_commit.append(partial(
+                invalidate_published_posts, _published_score(post.published_at), True
+            ))
     
     async def increment_views(self, post_id: UUID) -> None:
-        """Увеличить счётчик просмотров."""
-        post = await self.get_post_by_id(post_id)
-        post.view_count += 1
-        await self.db.flush()
+        """
+        Увеличить счётчик просмотров.
+        
+        Один UPDATE без загрузки статьи; updated_at не меняется —
+        просмотр не правка (на него опираются sitemap и статический экспорт).
+        """
+        await self.db.execute(
+            update(Post)
+            .where(Post.id == post_id)
+            .values(view_count=Post.view_count + 1, updated_at=Post.updated_at)
+            .execution_options(synchronize_session="fetch")
+        )
+        await record_post_event(post_id, "views")
+        event_buffer.record("post_view", post_id=post_id)
+    
+    async def record_unique_view(self, post_id: UUID, viewer_key: str | None) -> None:
+        """Учесть уникального читателя в HyperLogLog (боты не учитываются)."""
+        if viewer_key is None:
+            return
+        
+        await record_unique_view(
+            str(post_id), viewer_key, datetime.now(timezone.utc).date()
+        )
+    
+    async def get_unique_views(self, slug: str, period: str) -> tuple[UUID, int]:
+        """
+        Оценка уникальных читателей за период.
+        Неделя и месяц — объединение дневных HLL (PFCOUNT по нескольким ключам).
+        """
+        result = await self.db.execute(
+            select(Post.id).where(Post.slug == slug, Post.deleted_at.is_(None))
+        )
+        post_id = result.scalar_one_or_none()
+        
+        if post_id is None:
+            raise NotFoundException("Post")
+        
+        if period == "all":
+            return post_id, await count_unique_views(str(post_id))
+        
+        span = {"day": 1, "week": 7, "month": 30}[period]
+        today = datetime.now(timezone.utc).date()
+        days = [today - timedelta(days=offset) for offset in range(span)]
+        
+        return post_id, await count_unique_views(str(post_id), days)
     
     async def toggle_like(self, post_id: UUID, user: User) -> bool:
         """
         Поставить/убрать лайк.
         Возвращает True если лайк добавлен, False если убран.
         """
+        # Удалённую статью лайкнуть нельзя
+        exists = await self.db.execute(
+            select(Post.id).where(Post.id == post_id, Post.deleted_at.is_(None))
+        )
+        if exists.scalar_one_or_none() is None:
+            raise NotFoundException("Post")
+        
         # Проверяем существующий лайк
         result = await self.db.execute(
             select(Like).where(
@@ -253,11 +668,15 @@ class PostService:
         if existing_like:
             await self.db.delete(existing_like)
             await self.db.flush()
+            await record_post_event(post_id, "likes", -1)
+            event_buffer.record("post_unlike", post_id=post_id, user_id=user.id)
             return False
         else:
             like = Like(post_id=post_id, user_id=user.id)
             self.db.add(like)
             await self.db.flush()
+            await record_post_event(post_id, "likes")
+            event_buffer.record("post_like", post_id=post_id, user_id=user.id)
             return True
     
     async def _generate_unique_slug(
@@ -282,14 +701,8 @@ class PostService:
             slug = f"{base_slug}-{counter}"
             counter += 1
     
-    def _generate_excerpt(self, content: str, max_length: int = 200) -> str:
-        """Генерация excerpt из content."""
-        # Убираем HTML теги (простая версия)
-        import re
-        clean = re.sub(r'<[^>]+>', '', content)
-        clean = clean.strip()
-        
-        if len(clean) <= max_length:
-            return clean
-        
-        return clean[:max_length].rsplit(' ', 1)[0] + '...'
+    @staticmethod
+    def _apply_rendered(post: Post, rendered: RenderedContent) -> None:
+        """Сохранить результат рендеринга в колонках статьи."""
+        for column, value in rendered.columns().items():
+            setattr(post, column, value)
@@ -0,0 +1,211 @@
+"""
+Revision Service
+================
+История правок статей.
+
+Каждое сохранение, меняющее заголовок или текст, пишет ревизию:
+построчную дельту к предыдущей ревизии или, каждые
+POST_REVISION_SNAPSHOT_EVERY ревизий, полный снимок. Рост хранилища
+пропорционален правкам, а не размеру статьи.
+"""
+
+from uuid import UUID
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.delta import (
+    apply_delta,
+    compress_delta,
+    compress_text,
+    decompress_delta,
+    decompress_text,
+    make_delta,
+)
+from app.core.exceptions import NotFoundException, PermissionDeniedException
+from app.models.post import Post
+from app.models.post_revision import PostRevision
+from app.models.user import User
+
+
+class RevisionService:
+    """Сервис ревизий статей."""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    # === Запись ===
+    
+    async def record_created(self, post: Post, editor: User) -> None:
+        """Первая ревизия новой статьи (снимок)."""
+        await self._write(post.id, 1, editor.id, post.title, post.content, previous=None)
+    
+    async def record_updated(self, post: Post, editor: User) -> None:
+        """
+        Ревизия после правки статьи.
+        
+        Вызывается до flush изменений: строка статьи блокируется
+        (FOR UPDATE), что упорядочивает параллельные правки одной статьи.
+        База дельты — текст последней ревизии: между ревизиями статья
+        могла меняться автосохранением черновика.
+        """
+        result = await self.db.execute(
+            select(Post.title, Post.content)
+            .where(Post.id == post.id)
+            .with_for_update()
+        )
+        old_title, old_content = result.one()
+        
+        last = await self._last_number(post.id)
+        if last is None:
+            # Статья создана до появления истории — сохраняем исходное состояние
+            await self._write(post.id, 1, post.author_id, old_title, old_content, previous=None)
+            last, base = 1, old_content
+        else:
+            _, base = await self._reconstruct(post.id, last)
+        
+        await self._write(post.id, last + 1, editor.id, post.title, post.content, previous=base)
+    
+    async def _last_number(self, post_id: UUID) -> int | None:
+        result = await self.db.execute(
+            select(func.max(PostRevision.number)).where(PostRevision.post_id == post_id)
+        )
+        return result.scalar()
+    
+    async def _write(
+        self,
+        post_id: UUID,
+        number: int,
+        editor_id: UUID | None,
+        title: str,
+        content: str,
+        previous: str | None,
+    ) -> None:
+        snapshot = compress_text(content)
+        data, is_snapshot = snapshot, True
+        
+        if previous is not None and (number - 1) % settings.post_revision_snapshot_every:
+            delta = compress_delta(make_delta(previous, content))
+            if len(delta) < len(snapshot):
+                data, is_snapshot = delta, False
+        
+        self.db.add(PostRevision(
+            post_id=post_id,
+            number=number,
+            editor_id=editor_id,
+            title=title,
+            is_snapshot=is_snapshot,
+            data=data,
+            content_length=len(content),
+        ))
+        
+        if is_snapshot:
+            await self._prune(post_id, number)
+    
+    async def _prune(self, post_id: UUID, last_number: int) -> None:
+        """
+        Удалить ревизии сверх POST_REVISION_MAX.
+        
+        Удаляются только целые цепочки до снимка, с которого
+        восстанавливаются оставшиеся ревизии.
+        """
+        keep_from = last_number - settings.post_revision_max + 1
+        if keep_from <= 1:
+            return
+        
+        base_snapshot = (
+            select(func.max(PostRevision.number))
+            .where(
+                PostRevision.post_id == post_id,
+                PostRevision.is_snapshot.is_(True),
+                PostRevision.number <= keep_from,
+            )
+            .scalar_subquery()
+        )
+        await self.db.execute(
+            delete(PostRevision)
+            .where(PostRevision.post_id == post_id, PostRevision.number < base_snapshot)
+            .execution_options(synchronize_session=False)
+        )
+    
+    # === Чтение ===
+    
+    async def _check_access(self, post_id: UUID, user: User) -> None:
+        """История доступна автору статьи и админу."""
+        result = await self.db.execute(
+            select(Post.author_id).where(Post.id == post_id, Post.deleted_at.is_(None))
+        )
+        author_id = result.scalar_one_or_none()
+        
+        if author_id is None:
+            raise NotFoundException("Post")
+        
+        if author_id != user.id and not user.is_admin:
+            raise PermissionDeniedException()
+    
+    async def list_revisions(self, post_id: UUID, user: User) -> list:
+        """Ревизии статьи, новые первыми (без содержимого)."""
+        await self._check_access(post_id, user)
+        
+        result = await self.db.execute(
+            select(
+                PostRevision.number,
+                PostRevision.title,
+                PostRevision.editor_id,
+                PostRevision.content_length,
+                PostRevision.created_at,
+            )
+            .where(PostRevision.post_id == post_id)
+            .order_by(PostRevision.number.desc())
+        )
+        return result.all()
+    
+    async def _reconstruct(self, post_id: UUID, number: int) -> tuple[PostRevision, str]:
+        """
+        Ревизия и её текст.
+        
+        Читается ближайший снимок не позже ревизии и дельты после него.
+        """
+        base_snapshot = (
+            select(func.max(PostRevision.number))
+            .where(
+                PostRevision.post_id == post_id,
+                PostRevision.is_snapshot.is_(True),
+                PostRevision.number <= number,
+            )
+            .scalar_subquery()
+        )
+        result = await self.db.execute(
+            select(PostRevision)
+            .where(
+                PostRevision.post_id == post_id,
+                PostRevision.number >= base_snapshot,
+                PostRevision.number <= number,
+            )
+            .order_by(PostRevision.number)
+        )
+        chain = result.scalars().all()
+        
+        if not chain or chain[-1].number != number:
+            raise NotFoundException("Revision")
+        
+        content = decompress_text(chain[0].data)
+        for revision in chain[1:]:
+            content = apply_delta(content, decompress_delta(revision.data))
+        
+        return chain[-1], content
+    
+    async def get_revision(self, post_id: UUID, number: int, user: User) -> dict:
+        """Ревизия с восстановленным текстом."""
+        await self._check_access(post_id, user)
+        
+        revision, content = await self._reconstruct(post_id, number)
+        return {
+            "number": revision.number,
+            "title": revision.title,
+            "editor_id": revision.editor_id,
+            "content_length": revision.content_length,
+            "created_at": revision.created_at,
+            "content": content,
+        }
@@ -0,0 +1,163 @@
+"""
+Tag Service
+===========
+Бизнес-логика тегов: счётчики, облако тегов, массовое создание.
+"""
+
+import json
+import math
+import uuid
+
+from slugify import slugify
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import AlreadyExistsException, ValidationException
+from app.db.redis import cache_tags, get_cached_tags, invalidate_tags_cache
+from app.models.post import Post, PostStatus
+from app.models.tag import Tag, post_tags
+from app.schemas.tag import TagCloudItem, TagCreate, TagResponse
+
+
+class TagService:
+    """Сервис для работы с тегами."""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def get_tags(self) -> list[TagResponse]:
+        """
+        Получить все теги с количеством опубликованных постов.
+        
+        Счётчики считаются одним GROUP BY запросом и кэшируются в Redis.
+        """
+        cached = await get_cached_tags()
+        if cached is not None:
+            return [TagResponse.model_validate(item) for item in json.loads(cached)]
+        
+        result = await self.db.execute(
+            select(Tag, func.count(Post.id))
+            .outerjoin(post_tags, post_tags.c.tag_id == Tag.id)
+            .outerjoin(
+                Post,
+                and_(
+                    Post.id == post_tags.c.post_id,
+                    Post.status == PostStatus.PUBLISHED,
+                    Post.deleted_at.is_(None),
+                ),
+            )
+            .group_by(Tag.id)
+            .order_by(Tag.name)
+        )
+        
+        tags = []
+        for tag, count in result:
+            tag.posts_count = count
+            tags.append(TagResponse.model_validate(tag))
+        
+        await cache_tags(json.dumps([tag.model_dump(mode="json") for tag in tags]))
+        
+        return tags
+    
+    async def get_tag_cloud(self, limit: int = 50) -> list[TagCloudItem]:
+        """
+        Облако тегов: самые популярные теги с весом 1-5.
+        
+        Вес считается по логарифмической шкале, чтобы один
+        очень популярный тег не «сплющивал» остальные.
+        """
+        tags = [tag for tag in await self.get_tags() if tag.posts_count > 0]
+        tags.sort(key=lambda tag: tag.posts_count, reverse=True)
+        tags = tags[:limit]
+        
+        if not tags:
+            return []
+        
+        low = math.log(tags[-1].posts_count)
+        high = math.log(tags[0].posts_count)
+        spread = (high - low) or 1.0
+        
+        items = [
+            TagCloudItem(
+                name=tag.name,
+                slug=tag.slug,
+                color=tag.color,
+                posts_count=tag.posts_count,
+                weight=1 + round(4 * (math.log(tag.posts_count) - low) / spread),
+            )
+            for tag in tags
+        ]
+        items.sort(key=lambda item: item.name)
+        
+        return items
+    
+    async def create_tag(self, data: TagCreate) -> Tag:
+        """
+        Создать тег.
+        """
+        slug = slugify(data.name, max_length=50)
+        if not slug:
+            raise ValidationException("Tag name must contain letters or digits")
+        
+        existing = await self.db.execute(
+            select(Tag.id).where(or_(Tag.name == data.name, Tag.slug == slug))
+        )
+        if existing.first() is not None:
+            raise AlreadyExistsException("Tag")
+        
+        tag = Tag(
+            name=data.name,
+            slug=slug,
+            description=data.description,
+            color=data.color,
+        )
+        
+        self.db.add(tag)
+        await self.db.flush()
+        await invalidate_tags_cache()
+        
+        return tag
+    
+    async def get_or_create_by_names(self, names: list[str]) -> list[Tag]:
+        """
+        Получить теги по названиям, создав недостающие.
+        
+        Все недостающие теги вставляются одним
+        INSERT ... ON CONFLICT DO NOTHING, затем читаются одним SELECT.
+        """
+        by_slug: dict[str, str] = {}
+        for name in names:
+            name = name.strip()[:50]
+            slug = slugify(name, max_length=50)
+            if len(name) >= 2 and slug and slug not in by_slug:
+                by_slug[slug] = name
+        
+        if not by_slug:
+            return []
+        
+        inserted = await self.db.execute(
+            insert(Tag)
+            .values([
+                {"id": uuid.uuid4(), "name": name, "slug": slug}
+                for slug, name in by_slug.items()
+            ])
+            .on_conflict_do_nothing()
+            .returning(Tag.id)
+        )
+        created = inserted.first() is not None
+        
+        result = await self.db.execute(
+            select(Tag).where(
+                or_(
+                    Tag.slug.in_(by_slug.keys()),
+                    Tag.name.in_(by_slug.values()),
+                )
+            )
+        )
+        tags = list(result.scalars().all())
+        
+        if created:
+            await invalidate_tags_cache()
+        
+        return tags
@@ -0,0 +1,85 @@
+"""
+User Service
+============
+Бизнес-логика пользователей и публичных профилей.
+"""
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import noload
+
+from app.core.exceptions import NotFoundException
+from app.models.post import Post, PostStatus
+from app.models.user import User
+from app.models.user_stats import user_stats_mv
+from app.schemas.user import UserPostCard, UserProfileResponse, UserResponse, UserStats
+
+
+class UserService:
+    """Сервис пользователей."""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def get_profile(
+        self,
+        username: str,
+        recent_limit: int = 5,
+    ) -> UserProfileResponse:
+        """
+        Публичный профиль автора.
+        
+        1. Пользователь + статистика из user_stats_mv (один индексный запрос,
+           коллекции posts/comments/likes не загружаются)
+        2. Последние статьи по индексу (author_id, published_at)
+        """
+        result = await self.db.execute(
+            select(User, user_stats_mv)
+            .outerjoin(user_stats_mv, user_stats_mv.c.user_id == User.id)
+            .options(noload(User.posts), noload(User.comments), noload(User.likes))
+            .where(
+                User.username == username.lower(),
+                User.is_active.is_(True),
+                User.deleted_at.is_(None),
+            )
+        )
+        row = result.one_or_none()
+        
+        if row is None:
+            raise NotFoundException("User")
+        
+        user = row.User
+        stats = UserStats(
+            posts_count=row.posts_count or 0,
+            comments_count=row.comments_count or 0,
+            likes_received=row.likes_received or 0,
+            total_views=row.total_views or 0,
+        )
+        
+        posts_result = await self.db.execute(
+            select(
+                Post.id,
+                Post.title,
+                Post.slug,
+                Post.excerpt,
+                Post.cover_image,
+                Post.view_count,
+                Post.published_at,
+            )
+            .where(
+                Post.author_id == user.id,
+                Post.status == PostStatus.PUBLISHED,
+                Post.deleted_at.is_(None),
+            )
+            .order_by(Post.published_at.desc())
+            .limit(recent_limit)
+        )
+        
+        return UserProfileResponse(
+            **UserResponse.model_validate(user).model_dump(),
+            stats=stats,
+            stats_refreshed_at=row.refreshed_at,
+            recent_posts=[
+                UserPostCard.model_validate(post) for post in posts_result.all()
+            ],
+        )
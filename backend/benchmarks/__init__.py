@@ -0,0 +1,5 @@
+"""
+Benchmarks
+==========
+Нагрузочные замеры API (запуск из каталога backend).
+"""
@@ -0,0 +1,548 @@
+"""
+HTTP Load Benchmark
+===================
+Нагрузочный замер API: конкурентные клиенты выполняют заданную смесь
+запросов, по каждому сценарию считаются пропускная способность,
+задержки p50/p95/p99 и число SQL-запросов на HTTP-запрос.
+
+По умолчанию app.main:app поднимается в этом же процессе (с lifespan)
+и вызывается через httpx.ASGITransport, без сети: задержка — время
+обработки приложением. SQL-запросы считает слушатель
+before_cursor_execute движка, запрос привязывается к HTTP-запросу
+через contextvar. С --base-url нагружается уже запущенный сервер
+(uvicorn), тогда queries_per_request не считаются.
+
+Статьи, теги, авторы и пользователи для запросов берутся из той же
+базы (DATABASE_URL). Рассчитано на набор app.jobs.seed: логины —
+пользователи с email по --email-like и паролем --password.
+
+Сценарии (--mix имя=вес,...):
+    list            GET  /posts
+    list_tag        GET  /posts?tag=...
+    list_search     GET  /posts?search=...
+    list_author     GET  /posts?author_id=...
+    detail          GET  /posts/{slug}
+    login           POST /auth/login
+    me              GET  /auth/me
+    like            POST /posts/{id}/like
+    create          POST /posts (черновик)
+like и create меняют данные; для повторяемых сравнений на одной
+базе их можно выключить весом 0.
+
+Результат — JSON (--output), сравнимый между коммитами:
+с --compare печатается разница с прошлым отчётом.
+
+Запуск:
+    SCHEDULER_ENABLED=false python -m benchmarks.http_load --clients 32 --duration 60
+    python -m benchmarks.http_load --mix detail=1 --compare benchmark.json --output new.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from collections.abc import Callable
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import httpx
+from sqlalchemy import event, func, select
+
+from app.config import settings
+from app.db.session import async_session_maker, engine
+from app.jobs.seed import VOCABULARY
+from app.main import app
+from app.models.post import Post, PostStatus
+from app.models.tag import Tag, post_tags
+from app.models.user import User
+
+
+logger = logging.getLogger(__name__)
+
+REPORT_VERSION = 1
+API_PREFIX = "/api/v1"
+
+DEFAULT_MIX = "list=30,list_tag=10,list_search=5,list_author=5,detail=30,login=2,me=10,like=5,create=3"
+
+# Размер выборок статей, тегов и авторов для запросов
+SAMPLE_SIZE = 1000
+TAG_SAMPLE_SIZE = 50
+AUTHOR_SAMPLE_SIZE = 200
+
+# Стоп-слова в начале словаря для поиска не годятся
+SEARCH_WORDS = VOCABULARY[20:]
+
+# Токен обновляется заранее, чтобы долгий прогон не упёрся в 401
+TOKEN_REFRESH_SECONDS = max(60, settings.access_token_expire_minutes * 60 - 60)
+
+
+# === Подсчёт SQL-запросов ===
+
+_queries: ContextVar[list[int] | None] = ContextVar("benchmark_queries", default=None)
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    counter = _queries.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+# === Данные для запросов ===
+
+@dataclass
+class Fixtures:
+    """Выборка существующих данных, к которым обращаются сценарии."""
+    
+    posts: list[tuple[str, str]]  # (id, slug)
+    tags: list[str]
+    authors: list[str]
+    emails: list[str]
+    password: str
+    totals: dict[str, int]
+
+
+async def load_fixtures(email_like: str, password: str, clients: int) -> Fixtures:
+    async with async_session_maker() as db:
+        published = (Post.status == PostStatus.PUBLISHED, Post.deleted_at.is_(None))
+        
+        result = await db.execute(
+            select(Post.id, Post.slug).where(*published).order_by(func.random()).limit(SAMPLE_SIZE)
+        )
+        posts = [(str(post_id), slug) for post_id, slug in result]
+        
+        # Популярные теги и авторы: на них приходится основная нагрузка
+        result = await db.execute(
+            select(Tag.slug)
+            .join(post_tags, post_tags.c.tag_id == Tag.id)
+            .group_by(Tag.slug)
+            .order_by(func.count().desc())
+            .limit(TAG_SAMPLE_SIZE)
+        )
+        tags = list(result.scalars())
+        
+        result = await db.execute(
+            select(Post.author_id)
+            .where(*published)
+            .group_by(Post.author_id)
+            .order_by(func.count().desc())
+            .limit(AUTHOR_SAMPLE_SIZE)
+        )
+        authors = [str(author_id) for author_id in result.scalars()]
+        
+        result = await db.execute(
+            select(User.email)
+            .where(User.email.like(email_like), User.is_active, User.deleted_at.is_(None))
+            .order_by(User.email)
+            .limit(clients)
+        )
+        emails = list(result.scalars())
+        
+        totals = {
+            "posts": (await db.execute(select(func.count()).select_from(Post))).scalar_one(),
+            "users": (await db.execute(select(func.count()).select_from(User))).scalar_one(),
+            "tags": (await db.execute(select(func.count()).select_from(Tag))).scalar_one(),
+        }
+    
+    if not posts:
+        raise SystemExit("No published posts: load a dataset first (python -m app.jobs.seed)")
+    if not emails:
+        raise SystemExit(f"No active users with email like {email_like!r}")
+    
+    return Fixtures(
+        posts=posts, tags=tags, authors=authors, emails=emails, password=password, totals=totals,
+    )
+
+
+# === Сценарии ===
+
+@dataclass
+class Call:
+    """HTTP-запрос сценария."""
+    
+    method: str
+    path: str
+    params: dict[str, Any] | None = None
+    json: dict[str, Any] | None = None
+    auth: bool = False
+
+
+def _page(rng: random.Random) -> int:
+    """Чаще всего читают первые страницы."""
+    return min(int(rng.expovariate(0.7)) + 1, 20)
+
+
+def _list(rng: random.Random, fixtures: Fixtures) -> Call:
+    return Call("GET", "/posts", {"page": _page(rng)})
+
+
+def _list_tag(rng: random.Random, fixtures: Fixtures) -> Call:
+    if not fixtures.tags:
+        return _list(rng, fixtures)
+    return Call("GET", "/posts", {"tag": rng.choice(fixtures.tags), "page": _page(rng)})
+
+
+def _list_search(rng: random.Random, fixtures: Fixtures) -> Call:
+    query = " ".join(rng.sample(SEARCH_WORDS, rng.randint(1, 2)))
+    return Call("GET", "/posts", {"search": query})
+
+
+def _list_author(rng: random.Random, fixtures: Fixtures) -> Call:
+    return Call("GET", "/posts", {"author_id": rng.choice(fixtures.authors)})
+
+
+def _detail(rng: random.Random, fixtures: Fixtures) -> Call:
+    return Call("GET", f"/posts/{rng.choice(fixtures.posts)[1]}")
+
+
+def _login(rng: random.Random, fixtures: Fixtures) -> Call:
+    return Call(
+        "POST", "/auth/login",
+        json={"email": rng.choice(fixtures.emails), "password": fixtures.password},
+    )
+
+
+def _me(rng: random.Random, fixtures: Fixtures) -> Call:
+    return Call("GET", "/auth/me", auth=True)
+
+
+def _like(rng: random.Random, fixtures: Fixtures) -> Call:
+    return Call("POST", f"/posts/{rng.choice(fixtures.posts)[0]}/like", auth=True)
+
+
+def _create(rng: random.Random, fixtures: Fixtures) -> Call:
+    title = " ".join(rng.choices(SEARCH_WORDS, k=rng.randint(3, 8))).capitalize()
+    paragraphs = [
+        " ".join(rng.choices(VOCABULARY, k=rng.randint(40, 120))).capitalize() + "."
+        for _ in range(rng.randint(3, 12))
+    ]
+    return Call(
+        "POST", "/posts",
+        json={
+            "title": f"{title} {rng.getrandbits(32):08x}",
+            "content": "\n\n".join(paragraphs),
+            "tags": rng.sample(fixtures.tags, min(len(fixtures.tags), rng.randint(0, 3))),
+        },
+        auth=True,
+    )
+
+
+SCENARIOS: dict[str, Callable[[random.Random, Fixtures], Call]] = {
+    "list": _list,
+    "list_tag": _list_tag,
+    "list_search": _list_search,
+    "list_author": _list_author,
+    "detail": _detail,
+    "login": _login,
+    "me": _me,
+    "like": _like,
+    "create": _create,
+}
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    mix: dict[str, float] = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"unknown scenario {name!r}")
+        try:
+            mix[name] = float(weight or 1)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"bad weight for {name!r}: {weight!r}") from None
+    mix = {name: weight for name, weight in mix.items() if weight > 0}
+    if not mix:
+        raise argparse.ArgumentTypeError("mix has no scenarios with positive weight")
+    return mix
+
+
+# === Прогон ===
+
+@dataclass
+class Samples:
+    """Замеры одного сценария."""
+    
+    latencies: list[float] = field(default_factory=list)  # секунды
+    queries: list[int] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    errors: int = 0
+
+
+class VirtualClient:
+    """Клиент со своим пользователем, токеном и генератором."""
+    
+    def __init__(self, number: int, http: httpx.AsyncClient, fixtures: Fixtures, seed: int):
+        self.http = http
+        self.fixtures = fixtures
+        self.email = fixtures.emails[number % len(fixtures.emails)]
+        self.rng = random.Random(f"{seed}:{number}")
+        self.token: str | None = None
+        self.token_time = 0.0
+    
+    async def authenticate(self) -> None:
+        """Получить токен (вне замеров)."""
+        response = await self.http.post(
+            f"{API_PREFIX}/auth/login",
+            json={"email": self.email, "password": self.fixtures.password},
+        )
+        if response.status_code != 200:
+            raise SystemExit(f"Login failed for {self.email}: {response.status_code} {response.text}")
+        self.token = response.json()["access_token"]
+        self.token_time = time.monotonic()
+    
+    async def request(self, call: Call, count_queries: bool) -> tuple[httpx.Response, float, int | None]:
+        if call.auth and time.monotonic() - self.token_time > TOKEN_REFRESH_SECONDS:
+            await self.authenticate()
+        
+        headers = {"Authorization": f"Bearer {self.token}"} if call.auth else None
+        counter = [0]
+        token = _queries.set(counter) if count_queries else None
+        try:
+            started = time.perf_counter()
+            response = await self.http.request(
+                call.method, API_PREFIX + call.path,
+                params=call.params, json=call.json, headers=headers,
+            )
+            elapsed = time.perf_counter() - started
+        finally:
+            if token is not None:
+                _queries.reset(token)
+        
+        return response, elapsed, counter[0] if count_queries else None
+
+
+async def run(
+    http: httpx.AsyncClient,
+    fixtures: Fixtures,
+    mix: dict[str, float],
+    clients: int,
+    duration: float,
+    warmup: float,
+    seed: int,
+    count_queries: bool,
+) -> tuple[dict[str, Samples], float]:
+    """
+    Нагрузить API.
+    
+    Returns:
+        (замеры по сценариям, длительность окна замеров в секундах)
+    """
+    names = list(mix)
+    weights = list(mix.values())
+    samples: dict[str, Samples] = defaultdict(Samples)
+    
+    virtual_clients = [VirtualClient(number, http, fixtures, seed) for number in range(clients)]
+    await asyncio.gather(*(client.authenticate() for client in virtual_clients))
+    
+    started = time.monotonic()
+    measure_from = started + warmup
+    deadline = measure_from + duration
+    
+    async def loop(client: VirtualClient) -> None:
+        while (now := time.monotonic()) < deadline:
+            name = client.rng.choices(names, weights=weights)[0]
+            call = SCENARIOS[name](client.rng, fixtures)
+            try:
+                response, elapsed, queries = await client.request(call, count_queries)
+                status = response.status_code
+            except httpx.HTTPError as exc:
+                logger.debug("%s failed: %r", name, exc)
+                status, elapsed, queries = "transport_error", None, None
+            
+            if now < measure_from:
+                continue
+            
+            sample = samples[name]
+            sample.statuses[str(status)] += 1
+            if elapsed is not None:
+                sample.latencies.append(elapsed)
+            if queries is not None:
+                sample.queries.append(queries)
+            if not isinstance(status, int) or status >= 400:
+                sample.errors += 1
+    
+    await asyncio.gather(*(loop(client) for client in virtual_clients))
+    return samples, time.monotonic() - measure_from
+
+
+# === Отчёт ===
+
+def _percentile(values: list[float], q: float) -> float:
+    """Перцентиль по ближайшему рангу (values отсортирован)."""
+    return values[max(0, math.ceil(q * len(values)) - 1)]
+
+
+def _summary(sample: Samples, elapsed: float) -> dict[str, Any]:
+    latencies = sorted(sample.latencies)
+    queries = sorted(sample.queries)
+    requests = sum(sample.statuses.values())
+    
+    summary: dict[str, Any] = {
+        "requests": requests,
+        "errors": sample.errors,
+        "rps": round(requests / elapsed, 2) if elapsed > 0 else None,
+        "statuses": dict(sorted(sample.statuses.items())),
+        "latency_ms": None,
+        "queries_per_request": None,
+    }
+    if latencies:
+        summary["latency_ms"] = {
+            "mean": round(sum(latencies) / len(latencies) * 1000, 3),
+            "p50": round(_percentile(latencies, 0.50) * 1000, 3),
+            "p95": round(_percentile(latencies, 0.95) * 1000, 3),
+            "p99": round(_percentile(latencies, 0.99) * 1000, 3),
+            "max": round(latencies[-1] * 1000, 3),
+        }
+    if queries:
+        summary["queries_per_request"] = {
+            "mean": round(sum(queries) / len(queries), 2),
+            "p50": _percentile(queries, 0.50),
+            "max": queries[-1],
+        }
+    return summary
+
+
+def _git_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True, timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip()
+
+
+def build_report(
+    samples: dict[str, Samples],
+    elapsed: float,
+    fixtures: Fixtures,
+    config: dict[str, Any],
+) -> dict[str, Any]:
+    total = Samples()
+    for sample in samples.values():
+        total.latencies.extend(sample.latencies)
+        total.queries.extend(sample.queries)
+        total.statuses.update(sample.statuses)
+        total.errors += sample.errors
+    
+    return {
+        "version": REPORT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "config": config,
+        "dataset": fixtures.totals,
+        "elapsed_seconds": round(elapsed, 3),
+        "total": _summary(total, elapsed),
+        "endpoints": {name: _summary(samples[name], elapsed) for name in sorted(samples)},
+    }
+
+
+def _metric(summary: dict[str, Any] | None, key: str) -> float | None:
+    if not summary:
+        return None
+    if key == "rps":
+        return summary["rps"]
+    if key == "queries":
+        return (summary["queries_per_request"] or {}).get("mean")
+    return (summary["latency_ms"] or {}).get(key)
+
+
+def _format(value: float | None, baseline: float | None = None) -> str:
+    if value is None:
+        return "-"
+    text = f"{value:.1f}" if isinstance(value, float) else str(value)
+    if baseline:
+        text += f" ({(value - baseline) / baseline:+.0%})"
+    return text
+
+
+def print_report(report: dict[str, Any], baseline: dict[str, Any] | None = None) -> None:
+    """Таблица по сценариям; с baseline — изменение относительно него."""
+    columns = ["rps", "p50", "p95", "p99", "queries"]
+    rows = [("total", report["total"])] + list(report["endpoints"].items())
+    old = {"total": baseline["total"], **baseline["endpoints"]} if baseline else {}
+    
+    print(f"{'endpoint':<14}{'requests':>10}{'errors':>8}" + "".join(f"{c:>18}" for c in columns))
+    for name, summary in rows:
+        print(
+            f"{name:<14}{summary['requests']:>10}{summary['errors']:>8}"
+            + "".join(
+                f"{_format(_metric(summary, c), _metric(old.get(name), c)):>18}" for c in columns
+            )
+        )
+
+
+async def main(args: argparse.Namespace) -> dict[str, Any]:
+    fixtures = await load_fixtures(args.email_like, args.password, args.clients)
+    count_queries = args.base_url is None
+    limits = httpx.Limits(max_connections=args.clients, max_keepalive_connections=args.clients)
+    
+    config = {
+        "clients": args.clients,
+        "duration": args.duration,
+        "warmup": args.warmup,
+        "seed": args.seed,
+        "mix": args.mix,
+        "target": args.base_url or "asgi",
+    }
+    logger.info("Benchmark %s on dataset %s", config, fixtures.totals)
+    
+    if count_queries:
+        # Необработанное исключение приложения — ответ 500, а не падение клиента
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        event.listen(engine.sync_engine, "before_cursor_execute", _count_query)
+        try:
+            async with app.router.lifespan_context(app):
+                async with httpx.AsyncClient(
+                    transport=transport, base_url="http://benchmark", limits=limits, timeout=args.timeout,
+                ) as http:
+                    samples, elapsed = await run(
+                        http, fixtures, args.mix, args.clients, args.duration, args.warmup, args.seed, True,
+                    )
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", _count_query)
+    else:
+        async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as http:
+            samples, elapsed = await run(
+                http, fixtures, args.mix, args.clients, args.duration, args.warmup, args.seed, False,
+            )
+    
+    return build_report(samples, elapsed, fixtures, config)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HTTP load benchmark for the API")
+    parser.add_argument("--clients", type=int, default=16, help="Конкурентных клиентов")
+    parser.add_argument("--duration", type=float, default=30.0, help="Окно замеров, секунд")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Прогрев без замеров, секунд")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX), help="имя=вес,...")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--base-url", default=None, help="Запущенный сервер вместо app в процессе")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--email-like", default="user%@example.com", help="Шаблон LIKE для логинов")
+    parser.add_argument("--password", default="password123")
+    parser.add_argument("--output", type=Path, default=Path("benchmark.json"))
+    parser.add_argument("--compare", type=Path, default=None, help="Прошлый отчёт для сравнения")
+    args = parser.parse_args()
+    
+    if args.clients < 1:
+        parser.error("--clients must be at least 1")
+    
+    logging.basicConfig(level=logging.INFO)
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    
+    report = asyncio.run(main(args))
+    args.output.write_text(json.dumps(report, indent=2) + "\n")
+    print_report(report, baseline)
+    print(f"Report written to {args.output}", file=sys.stderr)
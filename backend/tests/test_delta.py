@@ -0,0 +1,47 @@
+"""Построчные дельты ревизий (app.core.delta)."""
+
+import pytest
+
+from app.core.delta import (
+    COPY,
+    apply_delta,
+    compress_delta,
+    compress_text,
+    decompress_delta,
+    decompress_text,
+    make_delta,
+)
+
+
+PAIRS = [
+    ("", ""),
+    ("", "first line\nsecond line\n"),
+    ("first line\nsecond line\n", ""),
+    ("a\nb\nc\n", "a\nb\nc\n"),
+    ("a\nb\nc\n", "a\nB\nc\nd\n"),
+    ("a\nb\nc", "a\nb\nc\n"),
+    ("one\ntwo\nthree\n", "zero\none\nthree"),
+    ("строка\r\nещё\r\n", "строка\r\nновая\r\nещё\r\n"),
+]
+
+
+@pytest.mark.parametrize("old, new", PAIRS)
+def test_round_trip(old, new):
+    assert apply_delta(old, make_delta(old, new)) == new
+
+
+@pytest.mark.parametrize("old, new", PAIRS)
+def test_round_trip_compressed(old, new):
+    ops = decompress_delta(compress_delta(make_delta(old, new)))
+    assert apply_delta(old, ops) == new
+    assert decompress_text(compress_text(new)) == new
+
+
+def test_unchanged_text_is_single_copy():
+    text = "a\nb\nc\n"
+    assert make_delta(text, text) == [[COPY, 3]]
+
+
+def test_unknown_operation():
+    with pytest.raises(ValueError):
+        apply_delta("a\n", [[7, 1]])
@@ -0,0 +1,40 @@
+"""Применение правок автосохранения (draft_service.apply_operations)."""
+
+import pytest
+
+from app.core.exceptions import ValidationException
+from app.schemas.post import DraftOperation
+from app.services.draft_service import apply_operations
+
+
+def op(pos: int, delete: int = 0, insert: str = "") -> DraftOperation:
+    return DraftOperation(pos=pos, delete=delete, insert=insert)
+
+
+def test_insert_delete_replace():
+    assert apply_operations("hello world", [op(5, insert=",")]) == "hello, world"
+    assert apply_operations("hello world", [op(5, delete=6)]) == "hello"
+    assert apply_operations("hello world", [op(6, delete=5, insert="there")]) == "hello there"
+
+
+def test_operations_apply_to_result_of_previous():
+    # Позиции второй правки — в тексте после первой
+    ops = [op(0, insert=">> "), op(3, delete=5, insert="HELLO"), op(14, insert="!")]
+    assert apply_operations("hello world", ops) == ">> HELLO world!"
+
+
+def test_edges_of_text():
+    assert apply_operations("abc", [op(3, insert="d")]) == "abcd"
+    assert apply_operations("abc", [op(0, delete=3)]) == ""
+    assert apply_operations("", [op(0, insert="new")]) == "new"
+    assert apply_operations("abc", []) == "abc"
+
+
+@pytest.mark.parametrize("ops", [
+    [op(4, insert="x")],
+    [op(2, delete=2)],
+    [op(0, delete=3), op(1, insert="x")],
+])
+def test_out_of_range(ops):
+    with pytest.raises(ValidationException):
+        apply_operations("abc", ops)
@@ -0,0 +1,113 @@
+"""Буфер событий: пачка не теряется при ошибке COPY и при остановке."""
+
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from app.db import events
+from app.db.events import EventBuffer
+
+
+class FakeEngine:
+    """engine.connect() с записью COPY в список вместо PostgreSQL."""
+    
+    def __init__(self):
+        self.written: list[tuple] = []
+        self.fail = False
+        self.gate: asyncio.Event | None = None
+    
+    async def copy_records_to_table(self, table, records, columns):
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.fail:
+            raise ConnectionError("database is down")
+        self.written.extend(records)
+    
+    @asynccontextmanager
+    async def connect(self):
+        raw = SimpleNamespace(driver_connection=self)
+        
+        async def get_raw_connection():
+            return raw
+        
+        yield SimpleNamespace(get_raw_connection=get_raw_connection)
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    fake = FakeEngine()
+    monkeypatch.setattr(events, "engine", fake)
+    return fake
+
+
+def event_types(records) -> list[str]:
+    return [record[1] for record in records]
+
+
+async def test_failed_flush_requeues_batch_in_order(engine):
+    buffer = EventBuffer(max_size=10, batch_size=2, flush_interval_ms=60_000)
+    engine.fail = True
+    buffer.start()
+    
+    for name in "abc":
+        buffer.record(name)
+    await asyncio.sleep(0.01)
+    
+    assert buffer.metrics["flush_errors"] == 1
+    assert event_types(buffer._records) == ["a", "b", "c"]
+    
+    engine.fail = False
+    await buffer.stop()
+    assert event_types(engine.written) == ["a", "b", "c"]
+    assert buffer.metrics["dropped"] == 0
+
+
+async def test_not_started_buffer_ignores_events(engine):
+    buffer = EventBuffer(max_size=2, batch_size=2, flush_interval_ms=60_000)
+    
+    # EVENTS_ENABLED=false: сброс не запущен, события не копятся и не «теряются»
+    for name in "abc":
+        assert not buffer.record(name)
+    await buffer.record_wait("d")
+    
+    metrics = buffer.metrics
+    assert (metrics["enabled"], metrics["buffered"], metrics["dropped"]) == (False, 0, 0)
+
+
+async def test_stop_waits_for_running_flush(engine):
+    buffer = EventBuffer(max_size=10, batch_size=2, flush_interval_ms=1000)
+    engine.gate = asyncio.Event()
+    buffer.start()
+    
+    for name in "abc":
+        buffer.record(name)
+    await asyncio.sleep(0)
+    
+    # COPY первой пачки ещё идёт, когда приходит остановка
+    stopping = asyncio.create_task(buffer.stop())
+    await asyncio.sleep(0.01)
+    engine.gate.set()
+    await stopping
+    
+    assert event_types(engine.written) == ["a", "b", "c"]
+    assert not buffer._records
+
+
+async def test_cancelled_flush_keeps_batch(engine):
+    buffer = EventBuffer(max_size=10, batch_size=5, flush_interval_ms=60_000)
+    engine.gate = asyncio.Event()
+    buffer.start()
+    buffer.record("a")
+    
+    task = asyncio.create_task(buffer.flush())
+    await asyncio.sleep(0)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    
+    assert event_types(buffer._records) == ["a"]
+    
+    engine.gate.set()
+    await buffer.stop()
+    assert event_types(engine.written) == ["a"]
@@ -0,0 +1,48 @@
+"""Обработка изображений: повреждённый файл — ImageError, а не OSError."""
+
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from app.core.images import ImageError, generate_variants, render_derivative
+
+
+MAX_PIXELS = 10_000_000
+
+
+@pytest.fixture
+def jpeg(tmp_path):
+    buffer = BytesIO()
+    Image.new("RGB", (640, 480), (200, 80, 40)).save(buffer, "JPEG")
+    path = tmp_path / "source.jpg"
+    path.write_bytes(buffer.getvalue())
+    return path
+
+
+@pytest.fixture
+def truncated(jpeg):
+    # Заголовок цел, данные обрываются — ошибка только при load()
+    data = jpeg.read_bytes()
+    jpeg.write_bytes(data[:len(data) // 2])
+    return jpeg
+
+
+def test_generate_variants(jpeg, tmp_path):
+    info = generate_variants(str(jpeg), str(tmp_path / "out"), [320, 1280], ["webp"], MAX_PIXELS)
+    
+    assert (info["format"], info["width"], info["height"]) == ("JPEG", 640, 480)
+    assert [variant["width"] for variant in info["variants"]] == [320, 640]
+    assert (tmp_path / "out" / "320.webp").is_file()
+
+
+def test_truncated_image_in_variants(truncated, tmp_path):
+    with pytest.raises(ImageError):
+        generate_variants(str(truncated), str(tmp_path / "out"), [320], ["webp"], MAX_PIXELS)
+    
+    assert not (tmp_path / "out").exists()
+
+
+def test_truncated_image_in_derivative(truncated, tmp_path):
+    with pytest.raises(ImageError):
+        render_derivative(str(truncated), str(tmp_path / "d" / "x.webp"), 100, None, "webp", MAX_PIXELS)
@@ -0,0 +1,63 @@
+"""Кэш производных: размер и давность по файлам каталога, общего для процессов."""
+
+import os
+import time
+
+from app.core.media_cache import SWEEP_GRACE, DerivativeCache, _sweep
+
+
+def write(path, size: int, age: float = 0) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+
+
+async def test_missing_file_is_rebuilt(tmp_path):
+    cache = DerivativeCache(tmp_path, max_bytes=1000, sweep_interval=3600)
+    builds = []
+    
+    async def build(path):
+        builds.append(path)
+        write(path, 10)
+        return 10
+    
+    path = await cache.get("ab/x.webp", build)
+    assert await cache.get("ab/x.webp", build) == path
+    assert len(builds) == 1
+    
+    # Другой процесс удалил файл — это промах, а не ошибка
+    path.unlink()
+    assert await cache.get("ab/x.webp", build) == path
+    assert len(builds) == 2 and path.is_file()
+
+
+async def test_hit_refreshes_mtime(tmp_path):
+    cache = DerivativeCache(tmp_path, max_bytes=1000, sweep_interval=3600)
+    write(tmp_path / "old.webp", 10, age=3600)
+    
+    async def build(path):
+        raise AssertionError("cached file must not be rebuilt")
+    
+    path = await cache.get("old.webp", build)
+    assert time.time() - path.stat().st_mtime < 60
+
+
+def test_sweep_removes_least_recently_used(tmp_path):
+    write(tmp_path / "a" / "oldest", 100, age=3 * SWEEP_GRACE)
+    write(tmp_path / "b" / "older", 100, age=2 * SWEEP_GRACE)
+    write(tmp_path / "b" / "recent", 100, age=1.5 * SWEEP_GRACE)
+    write(tmp_path / "young", 100)
+    
+    assert _sweep(tmp_path, max_bytes=250) == 2
+    assert sorted(p.name for p in tmp_path.rglob("*") if p.is_file()) == ["recent", "young"]
+
+
+def test_sweep_keeps_files_in_grace_period(tmp_path):
+    write(tmp_path / "old", 100, age=2 * SWEEP_GRACE)
+    write(tmp_path / "new-1", 100)
+    write(tmp_path / "new-2", 100)
+    
+    # Лимит превышен, но недавно отданные файлы не удаляются
+    assert _sweep(tmp_path, max_bytes=50) == 1
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["new-1", "new-2"]
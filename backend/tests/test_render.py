@@ -0,0 +1,50 @@
+"""Рендеринг статей: очистка HTML и оглавление (app.core.render)."""
+
+import re
+
+from app.core.render import render_content
+
+
+def test_script_is_removed():
+    rendered = render_content("Text\n\n<script>alert(1)</script>\n\nafter")
+    assert "<script" not in rendered.html
+    assert "alert(1)" not in rendered.html
+    assert "after" in rendered.html
+
+
+def test_event_handlers_are_removed():
+    rendered = render_content('<p onclick="steal()">hi</p>\n\n<img src="https://x/a.png" onerror="steal()">')
+    assert "onclick" not in rendered.html
+    assert "onerror" not in rendered.html
+    assert "steal" not in rendered.html
+    assert 'src="https://x/a.png"' in rendered.html
+
+
+def test_javascript_links_are_removed():
+    rendered = render_content(
+        '[markdown](javascript:alert(1)) <a href="javascript:alert(2)">html</a> [ok](https://example.com)'
+    )
+    # Markdown-ссылка остаётся текстом, у HTML-ссылки снимается href
+    assert not re.search(r"href=\S*javascript", rendered.html)
+    assert "<a>html</a>" in re.sub(r' rel="[^"]*"', "", rendered.html)
+    assert 'href="https://example.com"' in rendered.html
+
+
+def test_toc_ids_are_unique():
+    content = "## Intro\n\ntext\n\n## Intro\n\n### Intro\n\n#### Intro\n\n## Intro-1\n\n## !!!\n\n## ???"
+    rendered = render_content(content)
+    
+    ids = re.findall(r'<h\d id="([^"]+)"', rendered.html)
+    assert len(ids) == 7
+    assert len(set(ids)) == len(ids)
+    
+    # В оглавлении только h2 и h3, с теми же якорями, что в HTML
+    assert [item["level"] for item in rendered.toc] == [2, 2, 3, 2, 2, 2]
+    assert [item["id"] for item in rendered.toc] == [ids[0], ids[1], ids[2], ids[4], ids[5], ids[6]]
+
+
+def test_text_and_counters():
+    rendered = render_content("# Title\n\nOne two three.\n\n- four\n- five")
+    assert "<" not in rendered.text
+    assert rendered.word_count == 6
+    assert rendered.reading_time == 1
@@ -0,0 +1,70 @@
+"""Частота полных снимков в истории правок (RevisionService._write)."""
+
+from app.config import settings
+from app.core.delta import apply_delta, decompress_delta, decompress_text
+from app.services.revision_service import RevisionService
+
+
+class RecordingSession:
+    """Сессия, которая только запоминает добавленные объекты."""
+    
+    def __init__(self):
+        self.added = []
+    
+    def add(self, obj):
+        self.added.append(obj)
+
+
+async def _write_history(versions: list[str]) -> list:
+    db = RecordingSession()
+    service = RevisionService(db)
+    previous = None
+    for number, content in enumerate(versions, start=1):
+        await service._write("post", number, None, "title", content, previous=previous)
+        previous = content
+    return db.added
+
+
+def _versions(count: int) -> list[str]:
+    base = [f"line {n} with some text to make snapshots larger than deltas\n" for n in range(200)]
+    versions = []
+    for number in range(count):
+        base[number] = f"edited line {number}\n"
+        versions.append("".join(base))
+    return versions
+
+
+async def test_snapshot_every_n_revisions(monkeypatch):
+    monkeypatch.setattr(settings, "post_revision_snapshot_every", 5)
+    monkeypatch.setattr(settings, "post_revision_max", 1000)
+    
+    revisions = await _write_history(_versions(12))
+    
+    snapshots = [revision.number for revision in revisions if revision.is_snapshot]
+    assert snapshots == [1, 6, 11]
+
+
+async def test_chain_reconstructs_every_revision(monkeypatch):
+    monkeypatch.setattr(settings, "post_revision_snapshot_every", 4)
+    monkeypatch.setattr(settings, "post_revision_max", 1000)
+    
+    versions = _versions(10)
+    revisions = await _write_history(versions)
+    
+    content = ""
+    for revision, expected in zip(revisions, versions):
+        if revision.is_snapshot:
+            content = decompress_text(revision.data)
+        else:
+            content = apply_delta(content, decompress_delta(revision.data))
+        assert content == expected
+        assert revision.content_length == len(expected)
+
+
+async def test_snapshot_when_delta_is_not_smaller(monkeypatch):
+    monkeypatch.setattr(settings, "post_revision_snapshot_every", 100)
+    monkeypatch.setattr(settings, "post_revision_max", 1000)
+    
+    revisions = await _write_history(["short\n", "completely different\n"])
+    
+    assert [revision.is_snapshot for revision in revisions] == [True, True]
@@ -0,0 +1,84 @@
+"""Сброс шардов sitemap: только затронутые изменением поста."""
+
+import pytest
+
+from app.db.redis import (
+    SITEMAP_BOUNDS_KEY,
+    SITEMAP_INDEX_KEY,
+    cache_sitemap_index,
+    cache_sitemap_shard,
+    invalidate_sitemap,
+)
+
+
+async def cache_shards(bounds: dict[int, float]) -> None:
+    """Закэшировать шарды с published_at их первых постов."""
+    for shard, first_ts in bounds.items():
+        await cache_sitemap_shard(shard, {"xml": f"<urlset>{shard}</urlset>"}, first_ts)
+    await cache_sitemap_index({"xml": "<sitemapindex/>"})
+
+
+async def cached_shards(redis) -> list[int]:
+    return sorted(int(shard) for shard in await redis.zrange(SITEMAP_BOUNDS_KEY, 0, -1))
+
+
+@pytest.fixture
+async def three_shards(redis):
+    await cache_shards({0: 100.0, 1: 200.0, 2: 300.0})
+
+
+async def test_in_place_edit_drops_its_shard(redis, three_shards):
+    await invalidate_sitemap(250.0, shift=False)
+    
+    assert await cached_shards(redis) == [0, 2]
+    assert not await redis.exists("sitemap:shard:1")
+    assert not await redis.exists(SITEMAP_INDEX_KEY)
+
+
+async def test_publish_in_middle_shard_shifts_later_ones(redis, three_shards):
+    await invalidate_sitemap(250.0, shift=True)
+    
+    assert await cached_shards(redis) == [0]
+    assert await redis.exists("sitemap:shard:0")
+
+
+async def test_post_on_shard_boundary_drops_previous_shard(redis, three_shards):
+    # Посты с тем же published_at могут быть и в конце предыдущего шарда
+    await invalidate_sitemap(200.0, shift=False)
+    
+    assert await cached_shards(redis) == [2]
+
+
+async def test_boundary_keeps_non_adjacent_shard(redis):
+    await cache_shards({0: 100.0, 2: 300.0})
+    
+    # Предыдущий шард 1 не закэширован, шард 0 поста содержать не может
+    await invalidate_sitemap(300.0, shift=False)
+    
+    assert await cached_shards(redis) == [0]
+
+
+async def test_boundary_of_first_shard(redis, three_shards):
+    await invalidate_sitemap(100.0, shift=False)
+    
+    assert await cached_shards(redis) == [1, 2]
+
+
+async def test_only_later_shard_cached(redis):
+    await cache_shards({2: 300.0})
+    
+    # Пост в незакэшированном шарде: сдвиг затрагивает закэшированный после него
+    await invalidate_sitemap(150.0, shift=True)
+    
+    assert await cached_shards(redis) == []
+    assert not await redis.exists("sitemap:shard:2")
+
+
+async def test_only_later_shard_cached_in_place_edit(redis):
+    await cache_shards({2: 300.0})
+    
+    # Шард поста не закэширован; ближайший закэшированный сбрасывается с запасом
+    await invalidate_sitemap(150.0, shift=False)
+    
+    assert await cached_shards(redis) == []
+    assert not await redis.exists(SITEMAP_INDEX_KEY)
@@ -0,0 +1,35 @@
+"""Почасовые счётчики в Redis: повторный сброс пачки узнаётся по её id."""
+
+from app.db.redis import (
+    finish_stat_hour,
+    get_pending_stat_hours,
+    record_stat_event,
+    take_stat_hour,
+)
+
+
+async def test_retry_returns_same_batch(redis):
+    await record_stat_event("post-1", "views", "2026101912", 3)
+    
+    batch_id, counters = await take_stat_hour("2026101912")
+    assert batch_id.startswith("2026101912:")
+    assert counters
+    
+    # Запуск упал до finish_stat_hour: события после сбоя идут в новый hash,
+    # а повтор получает прежнюю пачку с прежним id
+    await record_stat_event("post-1", "views", "2026101912", 5)
+    assert await take_stat_hour("2026101912") == (batch_id, counters)
+    
+    await finish_stat_hour("2026101912")
+    next_id, next_counters = await take_stat_hour("2026101912")
+    assert next_id and next_id != batch_id
+    assert next_counters != counters
+
+
+async def test_taken_hour_leaves_pending_set(redis):
+    await record_stat_event("post-1", "likes", "2026101913")
+    await take_stat_hour("2026101913")
+    await finish_stat_hour("2026101913")
+    
+    assert await take_stat_hour("2026101913") == ("", {})
+    assert "2026101913" not in await get_pending_stat_hours()
@@ -0,0 +1,48 @@
+"""Индексы постов по тегам в Redis: публикация не создаёт частичных индексов."""
+
+from app.db.redis import (
+    fill_tag_index,
+    get_missing_tag_indexes,
+    get_tag_post_ids,
+    index_post_tags,
+    index_posts_tags,
+)
+
+
+async def test_publish_into_cold_index_keeps_it_missing(redis):
+    await index_post_tags("new-post", ["python"], 100.0)
+    
+    # Индекс по-прежнему не построен: при чтении его соберут из БД целиком
+    assert await get_missing_tag_indexes(["python"]) == ["python"]
+    assert not await redis.exists("tag_posts:python")
+
+
+async def test_publish_into_warm_index(redis):
+    await fill_tag_index("python", {"old-1": 10.0, "old-2": 20.0})
+    
+    await index_post_tags("new-post", ["python"], 30.0)
+    
+    assert await get_missing_tag_indexes(["python"]) == []
+    assert await get_tag_post_ids(["python"], 0, 10) == (["new-post", "old-2", "old-1"], 3)
+
+
+async def test_batch_adds_only_to_built_indexes(redis):
+    await fill_tag_index("warm", {"old": 1.0})
+    
+    await index_posts_tags([
+        ("post-1", ["warm", "cold"], 2.0),
+        ("post-2", ["cold"], 3.0),
+        ("post-3", [], 4.0),
+    ])
+    
+    assert await get_missing_tag_indexes(["warm", "cold"]) == ["cold"]
+    assert await redis.zrange("tag_posts:warm", 0, -1, withscores=True) == [("old", 1.0), ("post-1", 2.0)]
+
+
+async def test_evicted_index_is_rebuilt_not_patched(redis):
+    await fill_tag_index("python", {"old": 1.0})
+    await redis.delete("tag_posts:python")  # вытеснение LRU
+    
+    await index_posts_tags([("new-post", ["python"], 2.0)])
+    
+    assert await get_missing_tag_indexes(["python"]) == ["python"]
@@ -0,0 +1,47 @@
+"""Уникальные читатели: отметки по дням и IP клиента за прокси."""
+
+from datetime import date
+
+from starlette.requests import Request
+
+from app.api.deps import client_ip
+from app.config import settings
+from app.db.redis import (
+    count_unique_views_batch,
+    pop_dirty_unique_views,
+    record_unique_view,
+)
+
+
+async def test_dirty_marks_keep_the_day(redis):
+    yesterday, today = date(2026, 1, 1), date(2026, 1, 2)
+    await record_unique_view("post", "reader-1", yesterday)
+    await record_unique_view("post", "reader-2", yesterday)
+    await record_unique_view("post", "reader-3", today)
+    
+    entries = sorted(await pop_dirty_unique_views(10))
+    assert entries == [("post", yesterday), ("post", today)]
+    
+    # Итог вчерашнего дня записывается и после полуночи
+    counts = await count_unique_views_batch(entries)
+    assert counts == [(3, 2), (3, 1)]
+    assert await pop_dirty_unique_views(10) == []
+
+
+def _request(peer: str, forwarded: str | None = None) -> Request:
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+    return Request({"type": "http", "headers": headers, "client": (peer, 1234)})
+
+
+def test_forwarded_for_ignored_from_untrusted_peer(monkeypatch):
+    monkeypatch.setattr(settings, "trusted_proxies", [])
+    assert client_ip(_request("203.0.113.7", "1.2.3.4")) == "203.0.113.7"
+
+
+def test_forwarded_for_from_trusted_proxy(monkeypatch):
+    monkeypatch.setattr(settings, "trusted_proxies", ["10.0.0.0/8"])
+    
+    assert client_ip(_request("10.0.0.2", "198.51.100.9")) == "198.51.100.9"
+    # Клиент подставил свой адрес в начало цепочки — берётся правый недоверенный
+    assert client_ip(_request("10.0.0.2", "1.2.3.4, 198.51.100.9, 10.0.0.5")) == "198.51.100.9"
+    assert client_ip(_request("10.0.0.2")) == "10.0.0.2"
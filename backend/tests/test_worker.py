@@ -0,0 +1,90 @@
+"""Воркер очередей: сообщение упавшего воркера выполняется другим."""
+
+import asyncio
+
+from app.config import settings
+from app.jobs.queue import GROUP, job, stream_key
+from app.jobs.worker import Worker
+
+
+QUEUE = "tests"
+
+calls: list[str] = []
+finished = asyncio.Event()
+
+
+@job("tests.hang_once", queue=QUEUE, timeout=None)
+async def hang_once(marker: str) -> None:
+    calls.append(marker)
+    if len(calls) == 1:
+        # Первый воркер «умирает» посреди задачи
+        await asyncio.Event().wait()
+    finished.set()
+
+
+async def crash(worker: Worker) -> None:
+    """Остановить воркер без ack и продлений, как при падении процесса."""
+    tasks = [*worker._loops, *worker._tasks]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def test_message_of_crashed_worker_is_reclaimed(redis, monkeypatch):
+    # Блокирующий XREADGROUP в fakeredis не видит уже лежащих сообщений,
+    # а расширенный XPENDING не возвращает число доставок
+    monkeypatch.setattr(settings, "job_block_ms", None)
+    xpending_range = redis.xpending_range
+    
+    async def xpending_with_deliveries(*args, **kwargs):
+        return [{"times_delivered": 1, **entry} for entry in await xpending_range(*args, **kwargs)]
+    
+    monkeypatch.setattr(redis, "xpending_range", xpending_with_deliveries)
+    calls.clear()
+    finished.clear()
+    
+    first = Worker({QUEUE: 2}, consumer="first")
+    await first.start()
+    await hang_once.enqueue("payload")
+    
+    for _ in range(100):
+        if calls:
+            break
+        await asyncio.sleep(0.02)
+    assert calls == ["payload"]
+    await crash(first)
+    
+    second = Worker({QUEUE: 2}, consumer="second")
+    second.visibility_ms = 100
+    await asyncio.sleep(0.15)
+    await second.start()
+    
+    try:
+        await asyncio.wait_for(finished.wait(), timeout=5)
+    finally:
+        await second.stop(grace=1)
+    
+    assert calls == ["payload", "payload"]
+    assert await redis.xlen(stream_key(QUEUE)) == 0
+    assert (await redis.xpending(stream_key(QUEUE), GROUP))["pending"] == 0
+
+
+async def test_stop_cancels_jobs_after_grace(redis, monkeypatch):
+    monkeypatch.setattr(settings, "job_block_ms", None)
+    calls.clear()
+    finished.clear()
+    
+    worker = Worker({QUEUE: 1}, consumer="stopping")
+    await worker.start()
+    await hang_once.enqueue("payload")
+    
+    for _ in range(100):
+        if calls:
+            break
+        await asyncio.sleep(0.02)
+    
+    await worker.stop(grace=0.05)
+    
+    # Задача отменена, сообщение осталось в PEL для другого воркера
+    assert not worker._tasks
+    assert (await redis.xpending(stream_key(QUEUE), GROUP))["pending"] == 1